@@ -23,7 +23,24 @@ class Settings(BaseSettings):
     MYSQL_PASSWORD: str = "1234"
     MYSQL_DATABASE: str = "metal_welding"
     MYSQL_POOL_SIZE: int = 5
-    MYSQL_MAX_OVERFLOW: int = 10
+    MYSQL_MAX_OVERFLOW: int = 18      # 含导入预检、覆盖率汇总的并行连接（heavy × 各自的 WORKERS）和覆盖率后台刷新
+    MYSQL_POOL_TIMEOUT: int = 30      # 等待空闲连接的最长秒数
+    MYSQL_POOL_RECYCLE: int = 3600    # 连接最长存活秒数（需小于MySQL wait_timeout）
+    
+    # 阻塞调用线程池配置（按路由类别限流，与导入工作线程数之和不超过连接池容量）
+    THREADPOOL_LIMITS: dict = {
+        "auth": 4,    # 登录、用户管理
+        "read": 6,    # 列表、搜索、详情
+        "write": 3,   # 增删改
+        "heavy": 2    # 覆盖率统计、导入文件预检（导入本身由导入工作线程执行）
+    }
+    
+    # 响应缓存配置（列表/搜索/结构查询，写操作后按数据集失效）
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024   # 缓存响应体总大小上限
+    RESPONSE_CACHE_TTL: int = 300                      # 秒（兜底其他进程写入导入脚本等情况）
+    SCHEMA_REGISTRY_TTL: int = 300                     # 秒，表结构注册表定期重新加载（兜底其他进程执行的迁移）
+    SEARCH_NGRAM_TOKEN_SIZE: int = 2                   # 全文检索的 ngram 分词长度（须与MySQL服务器参数 ngram_token_size 一致）
     
     # MongoDB配置（可选）
     MONGODB_HOST: str = "localhost"
@@ -31,7 +48,18 @@ class Settings(BaseSettings):
     MONGODB_DATABASE: str = "welding"
     
     # 文件配置
-    MAX_UPLOAD_SIZE: int = 52428800
+    MAX_UPLOAD_SIZE: int = 1024 * 1024 * 1024   # 上传落盘后分块解析，不再整体读入内存
+    IMPORT_CHUNK_SIZE: int = 1000    # 批量导入每块行数（每块一条多行INSERT、一次提交）
+    IMPORT_PARSE_CHUNK_ROWS: int = 20000         # 导入文件每次解析的行数（决定导入的峰值内存）
+    IMPORT_SNIFF_BYTES: int = 1024 * 1024        # CSV编码探测读取的字节数
+    IMPORT_WORKERS: int = 2                      # 后台导入任务工作线程数（同时执行的导入数）
+    IMPORT_TASK_STALE_SECONDS: int = 600         # 执行中任务的心跳超过该秒数视为中断，可被重新认领
+    IMPORT_TASK_SWEEP_SECONDS: int = 60          # 中断任务巡检间隔（秒）
+    IMPORT_TASK_HEARTBEAT_SECONDS: int = 30      # 执行中任务的心跳刷新间隔（秒，需远小于 IMPORT_TASK_STALE_SECONDS）
+    IMPORT_TASK_MAX_ATTEMPTS: int = 3            # 任务最多执行次数（含续传）
+    IMPORT_LOAD_DATA_SEGMENT_ROWS: int = 50000   # LOAD DATA 导入时每个 INSERT ... SELECT 事务的行数
+    IMPORT_PREVIEW_PROBE_WORKERS: int = 3        # 导入预检时并行探测已有指纹的连接数
+    IMPORT_PREVIEW_SAMPLE_ROWS: int = 20         # 导入预检返回的问题行样本数
     UPLOAD_DIR: str = "./uploads"
     
     # CORS配置
@@ -77,6 +105,12 @@ class Settings(BaseSettings):
     
     # 覆盖率阈值
     COVERAGE_THRESHOLD: float = 0.90
+    COVERAGE_ALL_WORKERS: int = 4      # 汇总所有数据集覆盖率时并行计算的数据集数（每个占用一个连接）
+    
+    # 覆盖率结果缓存（按数据集版本失效，见 services/experimental/coverage_cache.py）
+    COVERAGE_CACHE_TTL: int = 60               # 秒，版本未变时结果的新鲜期（兜底其他进程的写入）
+    COVERAGE_CACHE_MAX_STALE: int = 900        # 秒，超过新鲜期后仍可先返回、后台刷新的最长时间
+    COVERAGE_CACHE_REFRESH_WORKERS: int = 2    # 后台刷新线程数（每个占用一个连接）
     
     # 空值列表
     NULL_VALUES: List[str] = [
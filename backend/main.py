@@ -155,6 +155,46 @@ app.include_router(data_routes.router)
 
 logger.info("✓ 所有路由注册完成")
 
+# ==================== 生命周期事件 ====================
+
+@app.on_event("startup")
+async def startup_event():
+    """应用启动时加载数据表结构注册表，确保数据集统计表、导入任务表存在，并续传中断的导入任务"""
+    from backend.utils.schema_registry import schema_registry
+    from backend.services.experimental.count_service import row_counter
+    from backend.services.experimental.coverage_state import coverage_state
+    from backend.services.experimental.import_tasks import ensure_tasks_table, import_task_manager
+    from backend.utils.db_pool import get_connection
+    try:
+        schema_registry.load()
+        conn = get_connection()
+        try:
+            row_counter.ensure_stats_table(conn.cursor())
+            coverage_state.ensure_stats_tables(conn.cursor())
+            ensure_tasks_table(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        # 数据库暂不可用时不阻止启动，首次访问时会自动重试加载
+        logger.error(f"✗ 启动时初始化数据库结构失败: {str(e)}")
+    # 续传上次关闭或崩溃时中断的导入任务，并定期巡检（数据库暂不可用时由巡检线程重试）
+    import_task_manager.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时停止导入工作线程并释放数据库连接池"""
+    from backend.services.experimental.import_tasks import import_task_manager
+    from backend.utils.db_pool import dispose_pool
+    try:
+        import_task_manager.shutdown()
+    except Exception as e:
+        logger.error(f"✗ 停止导入任务失败: {str(e)}")
+    dispose_pool()
+    logger.info("✓ 数据库连接池已释放")
+
+
 # ==================== API端点定义 ====================
 
 @app.get("/", tags=["根路径"])
@@ -206,15 +246,18 @@ async def health_check():
     try:
         logger.debug("健康检查请求")
         
-        # 检查数据库连接
-        from backend.utils.database import get_db_connection
+        # 检查数据库连接（从共享连接池借出）
+        from backend.utils.db_pool import get_connection, get_pool_stats
+        from backend.utils.concurrency import get_limiter_stats
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            cursor.close()
-            conn.close()
+            conn = get_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                cursor.close()
+            finally:
+                conn.close()
             db_status = "connected"
             logger.debug("数据库连接正常")
         except Exception as db_error:
@@ -229,6 +272,8 @@ async def health_check():
             "service": settings.APP_NAME,
             "version": settings.APP_VERSION,
             "database": db_status,
+            "db_pool": get_pool_stats(),
+            "threadpools": get_limiter_stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -5,6 +5,14 @@ from typing import List, Dict, Optional, Tuple
 from functools import lru_cache
 
 
+class FieldSelectionError(ValueError):
+    """字段投影参数无效（未知字段或未知投影名称）"""
+
+
+# 投影结果中始终包含的系统字段（游标分页需要 created_at 和 id）
+PROJECTION_KEY_FIELDS = ["id", "created_at"]
+
+
 class DatasetMetadata:
     """数据集元数据管理器 - 零硬编码，完全配置驱动"""
     
@@ -139,6 +147,74 @@ class DatasetMetadata:
         """获取审计字段"""
         return self.config['fields'].get('audit_fields', [])
     
+    # ========== 字段投影 ==========
+    
+    def get_projections(self) -> Dict[str, List[str]]:
+        """
+        获取命名投影（列表页等只需要部分字段的场景）
+        
+        配置格式（可选）：
+            "projections": {
+                "summary": {"fields": ["编号"], "categories": ["工艺"]}
+            }
+        未配置 summary 时默认提供：编号 + 工艺分类字段
+        
+        Returns:
+            {投影名称: 字段列表}
+        """
+        all_fields = self.get_all_field_names()
+        configured = dict(self.config.get('projections', {}))
+        configured.setdefault('summary', {
+            "fields": [f for f in ["编号"] if f in all_fields],
+            "categories": ["工艺"]
+        })
+        
+        projections = {}
+        for name, spec in configured.items():
+            fields = list(spec.get('fields', []))
+            for category in spec.get('categories', []):
+                fields.extend(self.get_fields_by_category(category))
+            projections[name] = list(dict.fromkeys(fields))
+        return projections
+    
+    def resolve_fields(
+        self,
+        fields: Optional[List[str]] = None,
+        view: Optional[str] = None
+    ) -> Optional[List[str]]:
+        """
+        解析字段投影参数
+        
+        Args:
+            fields: 指定的字段列表（数据字段或审计字段）
+            view: 命名投影名称（见 get_projections）
+            
+        Returns:
+            需要返回的字段（始终包含 id 和 created_at）；两个参数都为空时返回None（全部字段）
+            
+        Raises:
+            FieldSelectionError: 未知字段或投影名称
+        """
+        if not fields and not view:
+            return None
+        
+        selected = list(PROJECTION_KEY_FIELDS)
+        if view:
+            projections = self.get_projections()
+            if view not in projections:
+                raise FieldSelectionError(
+                    f"投影 '{view}' 不存在。可用的投影: {', '.join(projections.keys())}"
+                )
+            selected.extend(projections[view])
+        if fields:
+            allowed = set(self.get_all_field_names()) | set(self.get_audit_fields()) | set(PROJECTION_KEY_FIELDS)
+            unknown = [f for f in fields if f not in allowed]
+            if unknown:
+                raise FieldSelectionError(f"未定义的字段: {', '.join(unknown)}")
+            selected.extend(fields)
+        
+        return list(dict.fromkeys(selected))
+    
     # ========== 覆盖率配置 ==========
     
     def get_coverage_threshold(self) -> float:
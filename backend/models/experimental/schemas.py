@@ -9,6 +9,9 @@ class DataQueryParams(BaseModel):
     page: int = 1
     page_size: int = 20
     filters: Optional[Dict[str, Any]] = None
+    cursor: Optional[str] = None
+    count: str = "exact"
+    filter: Optional[str] = None  # 过滤表达式（语法见 services/experimental/filter_compiler.py）
 
 
 class DataSearchParams(BaseModel):
@@ -16,15 +19,19 @@ class DataSearchParams(BaseModel):
     keyword: str
     page: int = 1
     page_size: int = 20
+    cursor: Optional[str] = None
+    count: str = "exact"
+    order: str = "relevance"
 
 
 class DataResponse(BaseModel):
     """通用数据响应"""
     data: List[Dict[str, Any]]
-    total: int
+    total: Optional[int] = None  # count=none 时不计数
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class DataCreateResponse(BaseModel):
@@ -49,15 +56,79 @@ class BatchImportResponse(BaseModel):
     dataset_id: str
     filename: str
     success: int
-    duplicates: int
+    duplicates: int                 # 与数据库中已有记录重复
     failed: int
     total: int
+    file_duplicates: int = 0        # 文件内重复（导入前剔除，未与数据库比较）
     errors: Optional[List[str]] = None
     # 新增字段（支持自动创建数据集）
     dataset_created: Optional[bool] = None
     table_name: Optional[str] = None
     fields_count: Optional[int] = None
     creation_message: Optional[str] = None
+    engine: Optional[str] = None            # 实际使用的导入引擎 rows / load_data
+    engine_note: Optional[str] = None       # 请求 load_data 但回退到 rows 的原因
+    warnings: Optional[int] = None          # load_data：LOAD DATA 的警告数（对应的行已写入）
+
+
+class ImportTaskResponse(BaseModel):
+    """导入任务响应（上传后立即返回，之后轮询或订阅任务状态）"""
+    task_id: str
+    dataset_id: str
+    filename: str
+    mode: str = "append"            # append 追加 / replace 影子表导入后原子替换
+    engine: str = "rows"            # rows 分块INSERT / load_data LOAD DATA 快速导入
+    status: str                     # pending / processing / completed / failed / cancelled
+    progress: int = 0               # 百分比（按文件行数估算）
+    total_rows: Optional[int] = None
+    current_row: Optional[int] = None
+    success_count: Optional[int] = None
+    failed_count: Optional[int] = None
+    attempts: Optional[int] = None  # 执行次数（中断后续传会增加）
+    errors: Optional[List[str]] = None
+    error_message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None   # 完成后的导入结果（BatchImportResponse 的字段）
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_by: Optional[str] = None
+
+
+class ImportPreviewColumn(BaseModel):
+    """导入预检的逐列统计"""
+    name: str
+    type: Optional[str] = None              # 数据集字段类型（数据集不存在时为空）
+    inferred_type: str                      # 按文件内容推断的类型
+    non_null: int
+    nulls: int
+    null_ratio: float
+    type_errors: int = 0                    # 无法转换为字段类型的值
+
+
+class ImportPreviewProblemRow(BaseModel):
+    """导入预检的问题行样本"""
+    row: int                                # 数据行号（从1开始，不含表头）
+    issue: str                              # file_duplicate / existing_duplicate / type_error
+    detail: str
+    data: Dict[str, Any]
+
+
+class ImportPreviewResponse(BaseModel):
+    """导入预检响应（只分析，不写入数据）"""
+    dataset_id: str
+    filename: str
+    dataset_exists: bool
+    columns_valid: bool
+    column_error: Optional[str] = None
+    total_rows: int
+    file_duplicates: int                    # 文件内重复（导入时剔除）
+    existing_duplicates: int                # 与数据库中已有记录重复
+    type_error_rows: int                    # 含无法转换为字段类型的值的行（导入时写入失败）
+    new_rows: int                           # 预计新增的行数
+    columns: List[ImportPreviewColumn] = []
+    problem_rows: List[ImportPreviewProblemRow] = []
+    notes: List[str] = []
+    elapsed_ms: float
 
 
 class DatasetSchemaResponse(BaseModel):
@@ -69,6 +140,7 @@ class DatasetSchemaResponse(BaseModel):
     categories: Dict[str, List[str]]
     searchable_fields: List[str]
     required_fields: List[str]
+    projections: Dict[str, List[str]] = {}  # 命名投影（可用于 view 参数）
     total_fields: int
 
 
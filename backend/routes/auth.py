@@ -17,6 +17,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from backend.models.user import UserLogin, TokenResponse, UserCreate, UserResponse, UserUpdate
 from backend.services.auth_service import AuthService
+from backend.utils.concurrency import run_blocking
 from backend.utils.logger import get_logger
 
 # ==================== 初始化 ====================
@@ -188,7 +189,7 @@ async def login(credentials: UserLogin):
     
     try:
         # 调用认证服务验证用户名和密码
-        user = auth_service.authenticate(credentials.username, credentials.password)
+        user = await run_blocking("auth", auth_service.authenticate, credentials.username, credentials.password)
         
         if not user:
             logger.warning(f"登录失败: 用户名或密码错误 - username={credentials.username}")
@@ -290,7 +291,7 @@ async def create_user(user: UserCreate, current_user: dict = Depends(require_adm
         logger.info(f"{current_role} {current_user['username']} 尝试创建用户: {user.username} (角色: {target_role})")
         
         # 检查用户名是否已存在
-        existing_user = auth_service.get_user_by_username(user.username)
+        existing_user = await run_blocking("auth", auth_service.get_user_by_username, user.username)
         if existing_user:
             logger.warning(f"用户名已存在: {user.username}")
             raise HTTPException(
@@ -298,7 +299,9 @@ async def create_user(user: UserCreate, current_user: dict = Depends(require_adm
                 detail="用户名已存在"
             )
         
-        user_id = auth_service.create_user(
+        user_id = await run_blocking(
+            "auth",
+            auth_service.create_user,
             username=user.username,
             password=user.password,
             role=user.role,
@@ -351,7 +354,7 @@ async def list_users(
                 detail="每页数量不能超过100"
             )
         
-        users, total = auth_service.list_users(page, page_size)
+        users, total = await run_blocking("auth", auth_service.list_users, page, page_size)
         
         logger.debug(f"查询到 {len(users)} 个用户，总数: {total}")
         
@@ -408,7 +411,7 @@ async def update_user(
         
         logger.debug(f"更新字段: {list(updates.keys())}")
         
-        success = auth_service.update_user(user_id, **updates)
+        success = await run_blocking("auth", auth_service.update_user, user_id, **updates)
         
         if not success:
             logger.warning(f"用户不存在: ID={user_id}")
@@ -465,7 +468,7 @@ async def delete_user(
             )
         
         # 获取目标用户信息
-        target_user = auth_service.get_user_by_id(user_id)
+        target_user = await run_blocking("auth", auth_service.get_user_by_id, user_id)
         if not target_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -482,7 +485,7 @@ async def delete_user(
                 detail="管理员只能删除普通用户"
             )
         
-        success = auth_service.delete_user(user_id)
+        success = await run_blocking("auth", auth_service.delete_user, user_id)
         
         if not success:
             logger.warning(f"用户不存在: ID={user_id}")
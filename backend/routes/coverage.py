@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from backend.services.coverage_service import CoverageService
 from backend.routes.auth import get_current_user
+from backend.utils.concurrency import run_blocking
 from backend.utils.logger import get_logger
 
 
@@ -36,7 +37,7 @@ async def get_batch_coverage(
     try:
         logger.info(f"用户 {current_user['username']} 请求批次{batch_id}的覆盖率统计")
         
-        result = coverage_service.calculate_batch_coverage(batch_id)
+        result = await run_blocking("heavy", coverage_service.calculate_batch_coverage, batch_id)
         
         # 添加提示信息
         if not result["meets_threshold"]:
@@ -82,7 +83,7 @@ async def get_all_batches_coverage(
     try:
         logger.info(f"用户 {current_user['username']} 请求所有批次的覆盖率汇总")
         
-        result = coverage_service.calculate_all_batches_coverage()
+        result = await run_blocking("heavy", coverage_service.calculate_all_batches_coverage)
         
         # 添加提示信息
         if not result["meets_threshold"]:
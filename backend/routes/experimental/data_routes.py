@@ -1,39 +1,162 @@
 """实验数据统一路由 - 支持所有数据集"""
-from fastapi import APIRouter, HTTPException, Depends, Query, status, UploadFile, File
-from typing import List, Optional, Dict, Any
-import pandas as pd
-import io
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status, UploadFile, File
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
+import json
+import time
 
-from backend.models.experimental.metadata import DatasetMetadata
+from backend.config import settings
+from backend.models.experimental.metadata import DatasetMetadata, FieldSelectionError
 from backend.models.experimental.schemas import (
     DataResponse, DataCreateResponse, DataUpdateResponse, DataDeleteResponse,
-    BatchImportResponse, DatasetSchemaResponse, DatasetListResponse
+    ImportTaskResponse, ImportPreviewResponse, DatasetSchemaResponse, DatasetListResponse
+)
+from backend.services.experimental.base_service import BaseExperimentalDataService, decode_cursor
+from backend.services.experimental.count_service import row_counter
+from backend.services.experimental.coverage_cache import coverage_cache
+from backend.services.experimental.coverage_service import (
+    CoverageService, cached_dataset_coverage, calculate_all_datasets_coverage, dataset_coverage
 )
-from backend.services.experimental.base_service import BaseExperimentalDataService
-from backend.services.experimental.coverage_service import CoverageService, calculate_all_datasets_coverage
 from backend.services.experimental.dataset_creator import DatasetCreator
+from backend.services.experimental.filter_compiler import FilterError
+from backend.services.experimental.search_index import ENGINE_FULLTEXT
+from backend.services.experimental.import_preview import preview_import
+from backend.services.experimental.import_tasks import MODE_APPEND, TERMINAL_STATUSES, import_task_manager
+from backend.services.experimental.load_data import ENGINE_ROWS
+from backend.services.experimental.upload_reader import (
+    FileParseError, UploadReader, UploadTooLargeError, remove_spooled, spool_upload
+)
 from backend.routes.auth import get_current_user, require_admin
+from backend.utils.concurrency import run_blocking
 from backend.utils.logger import get_logger
+from backend.utils.response_cache import data_versions, response_cache
+from backend.utils.schema_registry import schema_registry
 
 
 router = APIRouter(prefix="/api/experimental-data", tags=["实验数据"])
 logger = get_logger(__name__)
 
 
+# ========== 响应缓存 ==========
+
+def _cache_lookup(request: Request, dataset_id: str, endpoint: str) -> Tuple[Tuple, str, Optional[Response]]:
+    """
+    查询响应缓存
+    
+    Returns:
+        (缓存键, ETag, 可直接返回的响应)；If-None-Match 匹配时返回304，
+        缓存命中时返回缓存的响应体，否则响应为None；
+        请求带 Cache-Control: no-cache 时跳过缓存重新计算（结果仍会写入缓存）
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    key = response_cache.make_key(dataset_id, data_versions.get(dataset_id), endpoint, query)
+    etag = response_cache.make_etag(key)
+    
+    if "no-cache" in request.headers.get("cache-control", "").lower():
+        return key, etag, None
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip() for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            response_cache.record_not_modified()
+            return key, etag, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+    
+    entry = response_cache.get(key)
+    if entry is not None:
+        return key, etag, Response(
+            content=entry.body, media_type="application/json",
+            headers={**_cache_headers(etag), "X-Cache": "HIT"}
+        )
+    return key, etag, None
+
+
+def _cache_store(key: Tuple, etag: str, payload: Any) -> Response:
+    """序列化响应并写入缓存（计算期间数据被修改则不缓存）"""
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    dataset_id, version = key[0], key[1]
+    if data_versions.get(dataset_id) == version:
+        response_cache.put(key, body, etag)
+    return Response(
+        content=body, media_type="application/json",
+        headers={**_cache_headers(etag), "X-Cache": "MISS"}
+    )
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    # 数据需要鉴权：只允许浏览器私有缓存，且每次使用前用ETag向服务端确认
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+@router.get("/cache/stats", summary="查看响应缓存状态（仅管理员）")
+async def get_cache_stats(
+    limit: int = Query(100, ge=0, le=1000, description="返回的缓存条目数"),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    查看响应缓存的命中/未命中/淘汰统计、各数据集版本号、最近使用的缓存条目和覆盖率缓存状态
+    
+    错误码：
+    - 401: Token无效
+    - 403: 非管理员
+    """
+    return {
+        "stats": response_cache.stats(),
+        "versions": data_versions.snapshot(),
+        "entries": response_cache.inspect(limit),
+        "coverage": coverage_cache.stats()
+    }
+
+
+@router.delete("/cache", summary="清空响应缓存（仅管理员）")
+async def flush_cache(
+    dataset_id: Optional[str] = Query(None, description="只清空指定数据集，默认全部"),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    清空响应缓存、计数缓存和覆盖率缓存（例如用脚本直接修改了数据库之后）
+    
+    同时重新加载表结构注册表和元数据（scripts/migrate_datasets.py 补齐的列、转换的列类型立即生效），
+    并递增数据集版本号，使客户端持有的ETag失效。
+    
+    错误码：
+    - 401: Token无效
+    - 403: 非管理员
+    """
+    dataset_ids = [dataset_id] if dataset_id else [d["id"] for d in DatasetMetadata.list_all_datasets()]
+    removed = response_cache.invalidate(dataset_id)
+    coverage_cache.invalidate(dataset_id)
+    schema_registry.invalidate()
+    DatasetMetadata.reload_metadata()
+    for target in dataset_ids:
+        data_versions.bump(target)
+        row_counter.invalidate(target)
+    logger.info(f"管理员 {current_user['username']} 清空响应缓存: {dataset_id or '全部'}")
+    return {"message": "缓存已清空", "dataset_id": dataset_id, "removed": removed}
+
+
 # ========== 覆盖率统计（必须在/{dataset_id}之前）==========
 
 @router.get("/coverage/all", summary="获取所有数据集的覆盖率汇总")
-async def get_all_coverage(current_user: dict = Depends(get_current_user)):
+async def get_all_coverage(
+    refresh: bool = Query(False, description="忽略缓存，等待重新计算的结果"),
+    current_user: dict = Depends(get_current_user)
+):
     """
     获取所有数据集的覆盖率汇总统计
     
+    各数据集的结果经覆盖率缓存读取（见 /{dataset_id}/coverage）；stale 为是否有数据集使用了旧结果，
+    cache_age_seconds 为最旧结果的缓存秒数
+    
     错误码：
     - 401: Token无效
     - 500: 计算失败
     """
     try:
         logger.info(f"用户 {current_user['username']} 请求所有数据集覆盖率汇总")
-        result = calculate_all_datasets_coverage()
+        result = await run_blocking("heavy", calculate_all_datasets_coverage, None, refresh)
         
         if not result["meets_threshold"]:
             result["warning"] = f"⚠️ 总体数据覆盖率未达到90%阈值！当前总体覆盖率: {result['overall_coverage']}%"
@@ -51,17 +174,186 @@ async def get_all_coverage(current_user: dict = Depends(get_current_user)):
         )
 
 
+# ========== 导入任务 ==========
+# 固定前缀的路由需注册在 /{dataset_id}/{data_id} 之前
+
+async def _get_task_or_404(task_id: str) -> Dict[str, Any]:
+    task = await run_blocking("read", import_task_manager.get, task_id)
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"导入任务不存在: {task_id}"
+        )
+    return task
+
+
+@router.get("/import-tasks", response_model=List[ImportTaskResponse], summary="列出导入任务（仅管理员）")
+async def list_import_tasks(
+    dataset_id: Optional[str] = Query(None, description="只返回该数据集的任务"),
+    task_status: Optional[str] = Query(None, alias="status", description="pending/processing/completed/failed/cancelled"),
+    limit: int = Query(20, ge=1, le=200, description="返回数量"),
+    current_user: dict = Depends(require_admin)
+):
+    """按创建时间倒序列出导入任务（不含失败行详情与导入结果）"""
+    return await run_blocking("read", import_task_manager.list, dataset_id, task_status, limit)
+
+
+@router.get("/import-tasks/{task_id}", response_model=ImportTaskResponse, summary="查询导入任务（仅管理员）")
+async def get_import_task(task_id: str, current_user: dict = Depends(require_admin)):
+    """
+    查询导入任务状态与进度
+    
+    - **progress**: 百分比（按文件行数估算，完成时为100）
+    - **result**: 任务完成后的导入统计（成功、重复、文件内重复、失败、新建数据集信息）
+    """
+    return await _get_task_or_404(task_id)
+
+
+@router.get("/import-tasks/{task_id}/events", summary="订阅导入任务进度（SSE，仅管理员）")
+async def stream_import_task(
+    task_id: str,
+    request: Request,
+    interval: float = Query(1.0, ge=0.2, le=10, description="检查间隔（秒）"),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    以 Server-Sent Events 推送任务状态：状态或进度变化时推送一条 `data: {任务JSON}`，
+    任务结束（completed/failed/cancelled）后推送最后一条并关闭连接
+    """
+    task = await _get_task_or_404(task_id)
+    
+    async def events():
+        current, last_payload = task, None
+        while True:
+            payload = json.dumps(jsonable_encoder(current), ensure_ascii=False)
+            if payload != last_payload:
+                yield f"data: {payload}\n\n"
+                last_payload = payload
+            if current["status"] in TERMINAL_STATUSES or await request.is_disconnected():
+                return
+            await asyncio.sleep(interval)
+            current = await run_blocking("read", import_task_manager.get, task_id)
+            if current is None:
+                return
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/import-tasks/{task_id}/cancel", response_model=ImportTaskResponse, summary="取消导入任务（仅管理员）")
+async def cancel_import_task(task_id: str, current_user: dict = Depends(require_admin)):
+    """
+    取消排队中或执行中的导入任务
+    
+    执行中的任务在当前块写入完成后停止，已写入的数据保留。
+    
+    错误码：
+    - 404: 任务不存在
+    - 409: 任务已结束
+    """
+    try:
+        task = await run_blocking("write", import_task_manager.cancel, task_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"导入任务不存在: {task_id}"
+        )
+    logger.info(f"管理员 {current_user['username']} 取消导入任务: {task_id}")
+    return task
+
+
+@router.post(
+    "/{dataset_id}/import/preview",
+    response_model=ImportPreviewResponse,
+    summary="导入预检：分析CSV/Excel文件，不写入数据（仅管理员）"
+)
+async def preview_import_file(
+    dataset_id: str,
+    file: UploadFile = File(..., description="CSV或Excel文件"),
+    sample: int = Query(settings.IMPORT_PREVIEW_SAMPLE_ROWS, ge=0, le=200, description="返回的问题行样本数"),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    按导入的同一流程分析上传文件，但不写入任何数据（dry run）
+    
+    - 列名与数据集字段是否一致（数据集不存在时给出推断的列类型）
+    - 文件内重复、与已有数据重复（指纹分批并行探测）的行数
+    - 逐列的空值数、空值比例，以及无法转换为字段类型的值的数量
+    - 预计新增的行数和问题行样本
+    
+    列名不一致时返回 columns_valid=false 和原因，不继续分析数据。
+    """
+    if not file.filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="文件名不能为空"
+        )
+    
+    file_ext = file.filename.lower().split('.')[-1]
+    if file_ext not in ['csv', 'xlsx', 'xls']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="仅支持CSV和Excel格式文件（.csv, .xlsx, .xls）"
+        )
+    
+    try:
+        upload_path = await spool_upload(file, file_ext)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    
+    try:
+        result = await run_blocking("heavy", preview_import, dataset_id, upload_path, file_ext, sample)
+    except FileParseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"文件解析失败: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"✗ 导入预检失败: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"导入预检失败: {str(e)}"
+        )
+    finally:
+        remove_spooled(upload_path)
+    
+    logger.info(
+        f"管理员 {current_user['username']} 导入预检: dataset={dataset_id}, rows={result['total_rows']}, "
+        f"new={result['new_rows']}, elapsed={result['elapsed_ms']}ms"
+    )
+    return {**result, "filename": file.filename}
+
+
 # ========== 覆盖率统计 ==========
 
 @router.get("/{dataset_id}/coverage", summary="获取指定数据集的覆盖率")
 async def get_dataset_coverage(
     dataset_id: str,
+    refresh: bool = Query(False, description="忽略缓存，等待重新计算的结果"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     获取指定数据集的覆盖率统计
     
     - **dataset_id**: 数据集ID
+    - **refresh**: 忽略缓存重新计算
+    
+    只返回低覆盖率记录数 low_coverage_count，记录本身通过 /{dataset_id}/coverage/low-records 分页获取
+    
+    结果会被缓存直到数据集被修改；修改后的一段时间内先返回旧结果并在后台重新计算。
+    响应中的 cache_status 为 hit / stale / miss / shared，stale 为是否是旧结果，
+    cache_age_seconds 为结果已缓存的秒数，computed_at 为计算时间
     
     错误码：
     - 401: Token无效
@@ -70,8 +362,9 @@ async def get_dataset_coverage(
     """
     try:
         logger.info(f"用户 {current_user['username']} 请求数据集 '{dataset_id}' 的覆盖率")
-        coverage_service = CoverageService(dataset_id)
-        result = coverage_service.calculate_batch_coverage()
+        result = None if refresh else cached_dataset_coverage(dataset_id)
+        if result is None:
+            result = await run_blocking("heavy", dataset_coverage, dataset_id, refresh)
         
         if not result["meets_threshold"]:
             result["warning"] = f"⚠️ 数据集覆盖率未达到90%阈值！当前覆盖率: {result['comprehensive_coverage']}%"
@@ -81,6 +374,8 @@ async def get_dataset_coverage(
             logger.info(f"✓ 数据集 '{dataset_id}' 覆盖率达标: {result['comprehensive_coverage']}%")
         
         return result
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.warning(f"数据集不存在: {dataset_id}")
         raise HTTPException(
@@ -95,6 +390,60 @@ async def get_dataset_coverage(
         )
 
 
+@router.get("/{dataset_id}/coverage/low-records", summary="分页获取低覆盖率记录")
+async def list_low_coverage_records(
+    dataset_id: str,
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    fields: Optional[str] = Query(None, description="只返回这些字段（逗号分隔）"),
+    view: Optional[str] = Query(None, description="命名投影，如 summary（编号 + 工艺字段）"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    分页获取覆盖率低于阈值的记录（覆盖率最低的排在前面）
+    
+    - **dataset_id**: 数据集ID
+    - **page** / **page_size**: 分页，每页只读取 page_size 行（按非空字段数索引）
+    - **fields** / **view**: full_data 中返回的字段
+    
+    total 为低覆盖率记录总数（与覆盖率统计中的 low_coverage_count 一致）
+    
+    错误码：
+    - 400: 字段投影无效
+    - 401: Token无效
+    - 404: 数据集不存在
+    - 500: 查询失败
+    """
+    try:
+        coverage_service = CoverageService(dataset_id)
+        full_data_fields = _resolve_fields(coverage_service.metadata, fields, view)
+        records, total = await run_blocking(
+            "heavy", coverage_service.list_low_coverage_records, page, page_size, full_data_fields
+        )
+        return {
+            "data": records,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": _total_pages(total, page_size),
+            "threshold": coverage_service.threshold * 100
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"数据集不存在: {dataset_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"✗ 获取数据集 '{dataset_id}' 低覆盖率记录失败: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取低覆盖率记录失败: {str(e)}"
+        )
+
+
 # ========== 数据集管理 ==========
 
 @router.get("/datasets", response_model=DatasetListResponse, summary="列出所有数据集")
@@ -127,6 +476,7 @@ async def list_datasets(current_user: dict = Depends(get_current_user)):
 @router.get("/{dataset_id}/schema", response_model=DatasetSchemaResponse, summary="获取数据集结构")
 async def get_dataset_schema(
     dataset_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -147,6 +497,10 @@ async def get_dataset_schema(
     """
     try:
         logger.info(f"用户 {current_user['username']} 请求数据集 '{dataset_id}' 的结构")
+        cache_key, etag, cached = _cache_lookup(request, dataset_id, "schema")
+        if cached is not None:
+            return cached
+        
         metadata = DatasetMetadata(dataset_id)
         
         result = {
@@ -157,10 +511,11 @@ async def get_dataset_schema(
             "categories": metadata.get_all_categories(),
             "searchable_fields": metadata.get_searchable_fields(),
             "required_fields": metadata.get_required_fields(),
+            "projections": metadata.get_projections(),
             "total_fields": len(metadata.get_all_field_names())
         }
         logger.debug(f"数据集 '{dataset_id}' 结构: {result['total_fields']} 个字段")
-        return result
+        return _cache_store(cache_key, etag, result)
         
     except ValueError as e:
         logger.warning(f"数据集不存在: {dataset_id}")
@@ -178,40 +533,107 @@ async def get_dataset_schema(
 
 # ========== 数据查询 ==========
 
+def _validate_cursor(cursor: Optional[str]):
+    """校验分页游标，无效时返回400"""
+    if not cursor:
+        return
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _resolve_fields(metadata: DatasetMetadata, fields: Optional[str], view: Optional[str]) -> Optional[List[str]]:
+    """解析字段投影参数（fields 逗号分隔），无效时返回400"""
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        return metadata.resolve_fields(field_list, view)
+    except FieldSelectionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _total_pages(total: Optional[int], page_size: int) -> Optional[int]:
+    """计算总页数（未计数时返回None）"""
+    if total is None:
+        return None
+    return (total + page_size - 1) // page_size
+
+
 @router.get("/{dataset_id}/search", summary="搜索数据")
 async def search_data(
     dataset_id: str,
+    request: Request,
     keyword: str = Query(..., min_length=1, description="搜索关键词"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的next_cursor），传入后忽略page"),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$", description="计数模式: exact/estimate/none"),
+    order: str = Query("relevance", pattern="^(relevance|recent)$", description="排序: relevance 相关度 / recent 时间倒序"),
+    fields: Optional[str] = Query(None, description="只返回这些字段（逗号分隔）"),
+    view: Optional[str] = Query(None, description="命名投影，如 summary（编号 + 工艺字段）"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     在指定数据集中进行关键词搜索
     
-    自动在可搜索字段中查找（可搜索字段从元数据配置获取）
+    使用全文索引在所有数据字段中查找（以空格分隔的多个词需同时出现）
+    
+    - **count**: exact 精确计数；estimate 优先使用缓存，否则返回估算值；none 不计数（total为null）
+    - **order**: relevance 按相关度排序（只能按页码翻页）；recent 按时间倒序（支持游标）
+    - **fields** / **view**: 字段投影，只返回指定字段或命名投影中的字段（始终包含 id、created_at）
+    
+    响应中的 hits 为命中数，took_ms 为搜索耗时（毫秒），engine 为查询方式
+    （fulltext 全文索引 / like 关键词过短时的检索列匹配 / scan 表未迁移时的逐字段匹配）
+    
+    结果会被缓存直到数据集被修改（响应头 X-Cache: HIT 时 took_ms 为首次搜索的耗时），
+    支持 ETag / If-None-Match
     
     错误码：
+    - 400: 分页游标或字段投影无效
     - 401: Token无效
     - 404: 数据集不存在
     - 500: 搜索失败
     """
     try:
         logger.info(f"用户 {current_user['username']} 在数据集 '{dataset_id}' 中搜索: '{keyword}'")
+        cache_key, etag, cached = _cache_lookup(request, dataset_id, "search")
+        if cached is not None:
+            return cached
+        _validate_cursor(cursor)
         
         service = BaseExperimentalDataService(dataset_id)
-        data_list, total = service.search(keyword, page, page_size)
+        selected_fields = _resolve_fields(service.metadata, fields, view)
+        started = time.perf_counter()
+        data_list, total, engine = await run_blocking(
+            "read", service.search, keyword, page, page_size,
+            page_cursor=cursor, count_mode=count, order=order, fields=selected_fields
+        )
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
         
-        logger.info(f"搜索到 {total} 条结果，返回第 {page} 页 ({len(data_list)} 条)")
+        logger.info(f"搜索到 {total} 条结果（{engine}, {took_ms}ms），返回第 {page} 页 ({len(data_list)} 条)")
         
-        return {
+        # 按相关度排序的结果没有时间顺序，不提供游标
+        ranked = engine == ENGINE_FULLTEXT and order == "relevance" and not cursor
+        return _cache_store(cache_key, etag, {
             "data": data_list,
             "total": total,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
-            "keyword": keyword
-        }
+            "total_pages": _total_pages(total, page_size),
+            "next_cursor": None if ranked else service.build_next_cursor(data_list, page_size),
+            "keyword": keyword,
+            "hits": total,
+            "took_ms": took_ms,
+            "engine": engine
+        })
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.warning(f"数据集不存在: {dataset_id}")
         raise HTTPException(
@@ -229,37 +651,75 @@ async def search_data(
 @router.get("/{dataset_id}", summary="获取数据列表")
 async def list_data(
     dataset_id: str,
+    request: Request,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的next_cursor），传入后忽略page"),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$", description="计数模式: exact/estimate/none"),
+    filter_expr: Optional[str] = Query(
+        None, alias="filter", max_length=8000,
+        description="过滤条件，如: 工艺_激光功率>=2000 AND 物性_材料 IN (304, 316)"
+    ),
+    fields: Optional[str] = Query(None, description="只返回这些字段（逗号分隔）"),
+    view: Optional[str] = Query(None, description="命名投影，如 summary（编号 + 工艺字段）"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     分页查询指定数据集的数据
     
     - **dataset_id**: 数据集ID
-    - **page**: 页码
+    - **page**: 页码（OFFSET分页，翻页越深越慢）
     - **page_size**: 每页数量
+    - **cursor**: 分页游标；每页响应都会返回 next_cursor，传回即可获取下一页，耗时与页深无关
+    - **count**: exact 精确计数；estimate 优先使用缓存，否则返回估算值；none 不计数（total为null）
+    - **filter**: 过滤条件，在数据库端筛选（翻页时需保持不变）
+        - 比较 `=` `!=` `>` `>=` `<` `<=`，列表 `IN (...)` / `NOT IN (...)`，前缀 `^= "A1"`
+        - 空值 `IS NULL` / `IS NOT NULL`（N/A 等空值标记视为空）
+        - `AND` / `OR` / `NOT` 和括号；含特殊字符的字段名用反引号包裹
+        - 也可以传JSON条件树，如 {"and": [{"field": "编号", "op": "prefix", "value": "A1"}]}
+    - **fields** / **view**: 字段投影，只返回指定字段或命名投影中的字段（始终包含 id、created_at）
+    
+    结果会被缓存直到数据集被修改，支持 ETag / If-None-Match（未修改时返回304）
     
     错误码：
+    - 400: 分页游标、过滤条件或字段投影无效
     - 401: Token无效
     - 404: 数据集不存在
     - 500: 查询失败
     """
     try:
         logger.debug(f"用户 {current_user['username']} 查询数据集 '{dataset_id}': page={page}, page_size={page_size}")
+        cache_key, etag, cached = _cache_lookup(request, dataset_id, "list")
+        if cached is not None:
+            return cached
+        
+        _validate_cursor(cursor)
         
         service = BaseExperimentalDataService(dataset_id)
-        data_list, total = service.list_data(page, page_size, filters=None)
+        selected_fields = _resolve_fields(service.metadata, fields, view)
+        data_list, total = await run_blocking(
+            "read", service.list_data, page, page_size,
+            filters=None, page_cursor=cursor, count_mode=count,
+            filter_expr=filter_expr, fields=selected_fields
+        )
         
         logger.debug(f"查询到 {len(data_list)} 条数据，总数: {total}")
         
-        return {
+        return _cache_store(cache_key, etag, {
             "data": data_list,
             "total": total,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size
-        }
+            "total_pages": _total_pages(total, page_size),
+            "next_cursor": service.build_next_cursor(data_list, page_size)
+        })
+    except HTTPException:
+        raise
+    except FilterError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"过滤条件无效: {str(e)}"
+        )
     except ValueError as e:
         logger.warning(f"数据集不存在: {dataset_id}")
         raise HTTPException(
@@ -280,6 +740,8 @@ async def list_data(
 async def get_data_by_id(
     dataset_id: str,
     data_id: int,
+    fields: Optional[str] = Query(None, description="只返回这些字段（逗号分隔）"),
+    view: Optional[str] = Query(None, description="命名投影，如 summary（编号 + 工艺字段）"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -287,8 +749,10 @@ async def get_data_by_id(
     
     - **dataset_id**: 数据集ID（如 1, 2
     - **data_id**: 数据记录ID
+    - **fields** / **view**: 字段投影，只返回指定字段或命名投影中的字段
     
     错误码：
+    - 400: 字段投影无效
     - 401: Token无效
     - 404: 数据不存在
     - 500: 查询失败
@@ -297,7 +761,8 @@ async def get_data_by_id(
         logger.debug(f"用户 {current_user['username']} 请求数据: dataset={dataset_id}, id={data_id}")
         
         service = BaseExperimentalDataService(dataset_id)
-        data = service.get_by_id(data_id)
+        selected_fields = _resolve_fields(service.metadata, fields, view)
+        data = await run_blocking("read", service.get_by_id, data_id, selected_fields)
         
         if not data:
             logger.warning(f"数据不存在: dataset={dataset_id}, id={data_id}")
@@ -332,7 +797,7 @@ async def create_data(
     - **data**: 实验数据（JSON对象）
     
     错误码：
-    - 400: 数据验证失败
+    - 400: 数据验证失败（未定义的字段、缺少必填字段、字段值与类型不符）
     - 401: Token无效
     - 403: 非管理员权限
     - 500: 创建失败
@@ -342,7 +807,9 @@ async def create_data(
         logger.debug(f"数据字段: {list(data.keys())}")
         
         service = BaseExperimentalDataService(dataset_id)
-        data_id = service.create(
+        data_id = await run_blocking(
+            "write",
+            service.create,
             data=data,
             created_by=current_user['username']
         )
@@ -382,7 +849,7 @@ async def update_data(
     - **data**: 更新的字段（JSON对象）
     
     错误码：
-    - 400: 没有提供更新字段
+    - 400: 没有提供更新字段、字段值与类型不符，或更新后与已有记录完全相同
     - 401: Token无效
     - 403: 非管理员权限
     - 404: 数据不存在
@@ -400,7 +867,9 @@ async def update_data(
         logger.debug(f"更新字段: {list(data.keys())}")
         
         service = BaseExperimentalDataService(dataset_id)
-        success = service.update(
+        success = await run_blocking(
+            "write",
+            service.update,
             data_id=data_id,
             data=data,
             updated_by=current_user['username']
@@ -415,9 +884,15 @@ async def update_data(
         
         logger.info(f"✓ 数据更新成功: id={data_id}")
         return {"message": "数据更新成功"}
-        
+
     except HTTPException:
         raise
+    except ValueError as e:
+        logger.warning(f"数据验证失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"✗ 更新失败: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -448,7 +923,7 @@ async def delete_data(
         logger.info(f"管理员 {current_user['username']} 删除数据: dataset={dataset_id}, id={data_id}")
         
         service = BaseExperimentalDataService(dataset_id)
-        success = service.delete(data_id)
+        success = await run_blocking("write", service.delete, data_id)
         
         if not success:
             logger.warning(f"数据不存在: dataset={dataset_id}, id={data_id}")
@@ -496,7 +971,7 @@ async def batch_delete_data(
         logger.info(f"管理员 {current_user['username']} 批量删除数据: dataset={dataset_id}, count={len(data_ids)}")
         
         service = BaseExperimentalDataService(dataset_id)
-        deleted_count = service.batch_delete(data_ids)
+        deleted_count = await run_blocking("write", service.batch_delete, data_ids)
         
         logger.info(f"✓ 批量删除成功: {deleted_count} 条")
         return {
@@ -522,28 +997,48 @@ async def batch_delete_data(
 
 # ========== 数据导入 ==========
 
-@router.post("/{dataset_id}/import", response_model=BatchImportResponse, summary="导入CSV/Excel文件（支持新数据集自动创建）")
+@router.post(
+    "/{dataset_id}/import",
+    response_model=ImportTaskResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="导入CSV/Excel文件（后台任务，支持新数据集自动创建）"
+)
 async def import_file(
     dataset_id: str,
     file: UploadFile = File(..., description="CSV或Excel文件"),
+    mode: str = Query(MODE_APPEND, pattern="^(append|replace)$", description="append 追加 / replace 替换全部数据"),
+    engine: str = Query(ENGINE_ROWS, pattern="^(rows|load_data)$", description="rows 分块INSERT / load_data 大CSV快速导入"),
     current_user: dict = Depends(require_admin)
 ):
     """
     批量导入CSV或Excel文件（仅管理员）
     
+    - **mode=append**（默认）: 追加到数据集
+    - **mode=replace**: 导入到影子表，完成后原子替换数据集的全部数据；
+      导入期间查询仍返回旧数据，取消或失败时旧数据不受影响
+    - **engine=load_data**: 列与数据集字段完全一致的CSV经 LOAD DATA LOCAL INFILE
+      写入暂存表，再用一条 INSERT ... SELECT 按指纹去重写入；前提不满足时
+      （Excel、列不一致、服务器未开启 local_infile）回退到分块INSERT，原因见结果中的 engine_note
+    
+    导入按块提交并保存检查点，服务重启后任务从最后提交的块继续。
+    
+    上传完成并通过预检后立即返回导入任务（202），导入在后台执行；
+    通过 `GET /import-tasks/{task_id}` 轮询或 `GET /import-tasks/{task_id}/events`
+    订阅进度，`POST /import-tasks/{task_id}/cancel` 取消。
+    
     **智能特性**:
     - ✅ **自动创建新数据集**: 上传 batch_5 时自动创建表和配置，无需预先存在
     - ✅ 支持CSV和Excel格式（.csv, .xlsx）
     - ✅ 自动推断字段分类（物性/工艺/状态/性能）
     - ✅ 自动验证文件列名与数据库表结构一致性
-    - ✅ 导入前检查重复数据，避免重复插入
-    - ✅ 返回导入统计：成功、重复、失败数量
+    - ✅ 导入前剔除文件内重复的行，并检查与已有数据重复，避免重复插入
+    - ✅ 任务结果包含导入统计：成功、重复（数据库已有 / 文件内）、失败数量
     
     **工作流程**:
-    1. 检查数据集是否存在
-    2. 如果不存在：读取CSV表头 → 创建数据库表 → 生成元数据配置
-    3. 验证列名一致性
-    4. 批量导入数据
+    1. 上传内容落盘，读取表头（编码只根据文件开头判断）
+    2. 数据集已存在时验证列名一致性（不一致直接返回400）
+    3. 创建导入任务并返回
+    4. 后台：数据集不存在时推断列类型并创建 → 分块导入数据
     """
     try:
         # 验证文件类型
@@ -560,106 +1055,63 @@ async def import_file(
                 detail="仅支持CSV和Excel格式文件（.csv, .xlsx, .xls）"
             )
         
-        # 读取文件内容
-        contents = await file.read()
-        
-        # 根据文件类型解析
+        # 上传内容按块落盘（超过 MAX_UPLOAD_SIZE 时中止），之后分块解析，不整体读入内存
         try:
-            if file_ext == 'csv':
-                # 尝试不同编码
-                try:
-                    df = pd.read_csv(io.BytesIO(contents), encoding='utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        df = pd.read_csv(io.BytesIO(contents), encoding='gbk')
-                    except UnicodeDecodeError:
-                        df = pd.read_csv(io.BytesIO(contents), encoding='gb2312')
-            else:
-                df = pd.read_excel(io.BytesIO(contents))
-        except Exception as e:
+            upload_path = await spool_upload(file, file_ext)
+        except UploadTooLargeError as e:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"文件解析失败: {str(e)}"
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
             )
         
-        if df.empty:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="文件为空，没有数据"
-            )
-        
-        # 获取CSV列名
-        file_columns = df.columns.tolist()
-        
-        # 检查数据集是否存在
-        creator = DatasetCreator()
-        metadata_exists, table_exists = creator.check_dataset_exists(dataset_id)
-        
-        dataset_created = False
-        creation_info = None
-        
-        # 如果数据集不存在，自动创建
-        if not metadata_exists or not table_exists:
-            creation_info = creator.create_new_dataset(dataset_id, file_columns)
-            dataset_created = creation_info.get("created", False)
+        # 落盘文件交给导入任务后由任务负责删除
+        submitted = False
+        try:
+            # 探测编码（只读取文件开头）并读取表头
+            try:
+                reader = await run_blocking("heavy", UploadReader.open, upload_path, file_ext)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"文件解析失败: {str(e)}"
+                )
             
-            if not creation_info.get("created", False) and not (metadata_exists and table_exists):
+            if reader.empty:
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"数据集创建失败: {creation_info.get('message', '未知错误')}"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="文件为空，没有数据"
                 )
             
-            # 强制重新加载元数据缓存
-            DatasetMetadata.reload_metadata()
-        
-        # 重新加载元数据（如果是新创建的）
-        try:
-            metadata = DatasetMetadata(dataset_id)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"数据集 '{dataset_id}' 不存在且创建失败: {str(e)}"
-            )
-        
-        # 验证列名（对于新创建的数据集，应该完全匹配）
-        valid, error_msg = metadata.validate_import_columns(file_columns)
-        
-        if not valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=error_msg
+            # 数据集已存在时先验证列名，不一致的文件不创建任务
+            creator = DatasetCreator()
+            metadata_exists, table_exists = await run_blocking("heavy", creator.check_dataset_exists, dataset_id)
+            if metadata_exists and table_exists:
+                valid, error_msg = DatasetMetadata(dataset_id).validate_import_columns(reader.columns)
+                if not valid:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=error_msg
+                    )
+            
+            task = await run_blocking(
+                "write",
+                import_task_manager.submit,
+                dataset_id,
+                file.filename,
+                upload_path,
+                current_user['username'],
+                mode,
+                engine
             )
+            submitted = True
+        finally:
+            if not submitted:
+                remove_spooled(upload_path)
         
-        # 将 NaN 替换为 None（MySQL 的 NULL）
-        df = df.replace({pd.NA: None, float('nan'): None})
-        df = df.where(pd.notna(df), None)
-        
-        # 转换DataFrame为字典列表
-        data_list = df.to_dict('records')
-        
-        # 批量导入
-        service = BaseExperimentalDataService(dataset_id)
-        import_result = service.batch_import(
-            data_list=data_list,
-            created_by=current_user['username']
+        logger.info(
+            f"管理员 {current_user['username']} 提交导入任务: dataset={dataset_id}, mode={mode}, engine={engine}, task={task['task_id']}"
         )
-        
-        # 构建响应
-        response = {
-            "message": "导入完成",
-            "dataset_id": dataset_id,
-            "filename": file.filename,
-            **import_result
-        }
-        
-        # 如果是新创建的数据集，添加创建信息
-        if dataset_created and creation_info:
-            response["dataset_created"] = True
-            response["table_name"] = creation_info.get("table_name")
-            response["fields_count"] = creation_info.get("fields_count")
-            response["creation_message"] = f"✨ 新数据集 '{dataset_id}' 已自动创建！表名: {creation_info.get('table_name')}, 字段数: {creation_info.get('fields_count')}"
-        
-        return response
+        return task
         
     except ValueError as e:
         raise HTTPException(
@@ -673,72 +1125,3 @@ async def import_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"导入失败: {str(e)}"
         )
-
-
-# ========== 覆盖率统计 ==========
-
-@router.get("/{dataset_id}/coverage", summary="获取数据集覆盖率统计")
-async def get_dataset_coverage(
-    dataset_id: str,
-    current_user: dict = Depends(get_current_user)
-):
-    """
-    获取指定数据集的覆盖率统计
-    
-    - 综合覆盖率: 整个数据集所有数据项的填充率
-    - 平均覆盖率: 所有记录覆盖率的平均值
-    - 覆盖率分布: 不同覆盖率区间的记录数量
-    - 低覆盖率记录: 覆盖率低于阈值的记录列表
-    - 字段覆盖率: 每个字段的填充率
-    - 达标提示: 是否达到阈值要求
-    """
-    try:
-        coverage_service = CoverageService(dataset_id)
-        result = coverage_service.calculate_batch_coverage()
-        
-        # 添加提示信息
-        if not result["meets_threshold"]:
-            result["warning"] = f"⚠️ 数据覆盖率未达到{result['threshold']}%阈值！当前覆盖率: {result['comprehensive_coverage']}%"
-        else:
-            result["message"] = f"✓ 数据覆盖率达标！当前覆盖率: {result['comprehensive_coverage']}%"
-        
-        return result
-    
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"覆盖率计算失败: {str(e)}"
-        )
-
-
-@router.get("/coverage/all", summary="获取所有数据集的覆盖率汇总")
-async def get_all_coverage(current_user: dict = Depends(get_current_user)):
-    """
-    获取所有数据集的覆盖率汇总统计
-    
-    返回:
-    - 总体覆盖率: 所有数据集综合计算的覆盖率
-    - 各数据集统计: 每个数据集的详细覆盖率信息
-    - 是否达标: 是否满足阈值要求
-    """
-    try:
-        result = calculate_all_datasets_coverage()
-        
-        # 添加提示信息
-        if not result["meets_threshold"]:
-            result["warning"] = f"⚠️ 总体数据覆盖率未达到90%阈值！当前总体覆盖率: {result['overall_coverage']}%"
-        else:
-            result["message"] = f"✓ 总体数据覆盖率达标！当前总体覆盖率: {result['overall_coverage']}%"
-        
-        return result
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"覆盖率汇总计算失败: {str(e)}"
-        )
@@ -0,0 +1,209 @@
+"""
+批量导入基准测试
+
+在同一个临时数据集上对比 BaseExperimentalDataService.batch_import 的两种写入方式（端到端，
+包含类型检查、指纹计算、IN 探测已有指纹、检索文本、审计字段、行数和覆盖率统计）：
+1. 逐行写入：原 batch_import 的循环，每行执行一条INSERT，最后一次提交
+2. 分块写入：现在的 batch_import，BulkWriter 每块一条多行INSERT、一次提交（可指定多个块大小）
+
+临时数据集经 DatasetCreator 创建（表结构和元数据与导入新文件时自动创建的数据集一致），
+数据为随机生成的数字和文本。测试结束后删除数据表、元数据配置和统计记录。
+
+使用方式：
+    cd backend/scripts
+    python bench_bulk_insert.py                                  # 10万行，块大小 500/1000/5000
+    python bench_bulk_insert.py --rows 100000 --columns 30 --chunk-sizes 1000 2000
+    python bench_bulk_insert.py --rowwise-rows 10000             # 逐行写入只测1万行（按比例估算10万行耗时）
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pymysql
+
+# 添加项目根目录到Python路径，以便导入backend包
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from backend.models.experimental.metadata import DatasetMetadata
+from backend.services.experimental.base_service import BaseExperimentalDataService
+from backend.services.experimental.count_service import row_counter
+from backend.services.experimental.coverage_state import coverage_state
+from backend.services.experimental.dataset_creator import DatasetCreator
+from backend.services.experimental.fingerprint import (
+    FINGERPRINT_COLUMN, find_existing, is_duplicate_key_error
+)
+from backend.utils.logger import get_logger
+from backend.utils.schema_registry import schema_registry
+
+# 初始化日志记录器
+logger = get_logger(__name__)
+
+BENCH_DATASET = "bench_bulk_insert"
+
+
+def create_dataset(columns: List[str]) -> BaseExperimentalDataService:
+    """创建临时数据集（已存在时报错，避免误删同名数据集）"""
+    creator = DatasetCreator()
+    if any(creator.check_dataset_exists(BENCH_DATASET)):
+        raise RuntimeError(f"数据集 '{BENCH_DATASET}' 已存在，请先确认后手动删除")
+    creator.create_new_dataset(BENCH_DATASET, columns)
+    return BaseExperimentalDataService(BENCH_DATASET)
+
+
+def drop_dataset(service: BaseExperimentalDataService):
+    """删除临时数据集的数据表、元数据配置和统计记录"""
+    conn = service.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS `{service.table_name}`")
+        row_counter.reset(cursor, BENCH_DATASET)
+        coverage_state.reset(cursor, BENCH_DATASET)
+        conn.commit()
+    finally:
+        conn.close()
+    schema_registry.invalidate(service.table_name)
+    DatasetCreator().remove_metadata_config(BENCH_DATASET)
+    DatasetMetadata.reload_metadata()
+
+
+def generate_rows(count: int, columns: List[str]) -> List[Dict]:
+    """生成测试数据：一半列为数字，一半为短文本，约5%为空值标记"""
+    rng = random.Random(42)
+    rows = []
+    for _ in range(count):
+        data = {}
+        for i, col in enumerate(columns):
+            if rng.random() < 0.05:
+                data[col] = "N/A"
+            elif i % 2 == 0:
+                data[col] = str(round(rng.uniform(0, 5000), 2))
+            else:
+                data[col] = "".join(rng.choices(string.ascii_letters, k=8))
+        rows.append(data)
+    return rows
+
+
+def rowwise_batch_import(service: BaseExperimentalDataService, data_list: List[Dict], created_by: str) -> Dict:
+    """原 batch_import 的逐行循环：指纹探测后每行一条INSERT（及检索文本的UPDATE），全部写完后一次提交"""
+    conn = service.get_connection()
+    success_count = duplicate_count = 0
+    try:
+        cursor = conn.cursor()
+
+        for data in data_list:
+            service._normalize_values(data)
+            data[FINGERPRINT_COLUMN] = service._fingerprint(data)
+        seen_fingerprints = find_existing(
+            cursor, service.table_name, [data[FINGERPRINT_COLUMN] for data in data_list]
+        )
+
+        for data in data_list:
+            if data[FINGERPRINT_COLUMN] in seen_fingerprints:
+                duplicate_count += 1
+                continue
+            seen_fingerprints.add(data[FINGERPRINT_COLUMN])
+            data['created_by'] = created_by
+            data['updated_by'] = created_by
+
+            columns = list(data.keys())
+            placeholders = ', '.join(['%s'] * len(columns))
+            columns_str = ', '.join(f'`{service._escape_field_name(col)}`' for col in columns)
+            try:
+                cursor.execute(
+                    f"INSERT INTO `{service.table_name}` ({columns_str}) VALUES ({placeholders})",
+                    tuple(data.values())
+                )
+                service._refresh_search_text(cursor, cursor.lastrowid)
+                success_count += 1
+            except pymysql.err.IntegrityError as e:
+                if not is_duplicate_key_error(e):
+                    raise
+                duplicate_count += 1
+
+        service._record_row_delta(cursor, success_count)
+        conn.commit()
+    finally:
+        conn.close()
+        service._after_write()
+    return {"success": success_count, "duplicates": duplicate_count, "failed": 0}
+
+
+def truncate(service: BaseExperimentalDataService):
+    """清空数据表和统计记录"""
+    conn = service.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"TRUNCATE TABLE `{service.table_name}`")
+        row_counter.reset(cursor, BENCH_DATASET)
+        coverage_state.reset(cursor, BENCH_DATASET)
+        conn.commit()
+    finally:
+        conn.close()
+    service._after_write()
+
+
+def timed(func, rows: List[Dict], *args) -> Tuple[float, Dict]:
+    """在行数据的副本上执行导入（导入会改写行字典），返回 (耗时, 导入结果)"""
+    data_list = [dict(data) for data in rows]
+    started = time.perf_counter()
+    result = func(data_list, "bench", *args)
+    return time.perf_counter() - started, result
+
+
+def report(label: str, rows: int, seconds: float, result: Dict, baseline: float = None):
+    speedup = f"  {baseline / seconds:6.1f}x" if baseline else ""
+    logger.info(
+        f"{label:<24} {rows:>8} 行  {seconds:8.2f} 秒  {rows / seconds:10.0f} 行/秒{speedup}"
+        f"  (新增 {result['success']}, 重复 {result['duplicates']}, 失败 {result['failed']})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入基准测试（逐行INSERT vs 分块多行INSERT）")
+    parser.add_argument("--rows", type=int, default=100000, help="测试行数")
+    parser.add_argument("--columns", type=int, default=20, help="数据列数")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 1000, 5000], help="分块写入的块大小")
+    parser.add_argument("--rowwise-rows", type=int, default=None,
+                        help="逐行写入只测试前N行并按比例估算（默认全部行），0表示跳过")
+    parser.add_argument("--keep-dataset", action="store_true", help="测试结束后保留临时数据集")
+    args = parser.parse_args()
+
+    columns = [f"字段_{i}" for i in range(1, args.columns + 1)]
+    logger.info(f"生成测试数据: {args.rows} 行 × {args.columns} 列")
+    rows = generate_rows(args.rows, columns)
+
+    service = create_dataset(columns)
+    try:
+        logger.info("=" * 90)
+        baseline = None
+        rowwise_rows = args.rows if args.rowwise_rows is None else min(args.rowwise_rows, args.rows)
+        if rowwise_rows:
+            seconds, result = timed(
+                lambda data_list, created_by: rowwise_batch_import(service, data_list, created_by),
+                rows[:rowwise_rows]
+            )
+            baseline = seconds * args.rows / rowwise_rows
+            report("逐行INSERT", rowwise_rows, seconds, result)
+            if rowwise_rows < args.rows:
+                logger.info(f"  按比例估算 {args.rows} 行耗时: {baseline:.2f} 秒")
+            truncate(service)
+
+        for chunk_size in args.chunk_sizes:
+            seconds, result = timed(service.batch_import, rows, chunk_size)
+            report(f"batch_import chunk={chunk_size}", args.rows, seconds, result, baseline)
+            if result["failed"]:
+                logger.warning(f"⚠ 失败 {result['failed']} 行: {result['errors'][:3]}")
+            truncate(service)
+        logger.info("=" * 90)
+
+    finally:
+        if not args.keep_dataset:
+            drop_dataset(service)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+LOAD DATA 快速导入基准测试
+
+对比同一个CSV文件经两种导入引擎写入同一张临时表的耗时：
+1. 分块INSERT（engine=rows）：与 stream_import/batch_import 相同的流程——
+   逐块文件内去重、计算指纹、IN 探测已有指纹、BulkWriter 多行INSERT
+2. LOAD DATA（engine=load_data）：LoadDataImporter，规范化为临时文件 →
+   LOAD DATA LOCAL INFILE 写入暂存表 → INSERT ... SELECT ... WHERE NOT EXISTS
+
+每种引擎执行两轮：第一轮写入空表（全部为新行），第二轮重复导入同一文件
+（全部为重复行，测试去重的开销）。测试表结构与迁移后的数据表一致
+（TEXT数据列 + 审计列 + 检索列 + 行指纹唯一索引）。最后一列的列名含 %（与 batch_1 的
+“断后伸长率%”等字段相同），覆盖参数化语句中列名的转义。测试结束后删除临时表和CSV。
+
+需要MySQL开启 local_infile（SET GLOBAL local_infile = 1）。
+
+使用方式：
+    cd backend/scripts
+    python bench_load_data.py                          # 20万行 × 20列
+    python bench_load_data.py --rows 1000000 --columns 30
+    python bench_load_data.py --segment-rows 100000    # LOAD DATA 每个 INSERT ... SELECT 的行数
+"""
+
+import argparse
+import csv
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到Python路径，以便导入backend包
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from backend.config import Settings
+from backend.services.experimental.bulk_writer import BulkWriter
+from backend.services.experimental.file_dedupe import FileDeduper
+from backend.services.experimental.fingerprint import (
+    FINGERPRINT_COLUMN, FINGERPRINT_INDEX, compute_fingerprint, find_existing
+)
+from backend.services.experimental.load_data import LoadDataImporter, local_infile_enabled
+from backend.services.experimental.search_index import SEARCH_COLUMN, search_text_sql
+from backend.services.experimental.upload_reader import UploadReader, dataframe_to_records
+from backend.utils.db_pool import get_connection
+from backend.utils.logger import get_logger
+from backend.utils.schema_registry import quote_column
+
+# 初始化日志记录器
+logger = get_logger(__name__)
+settings = Settings()
+
+BENCH_TABLE = "bench_load_data"
+
+
+def create_table(cursor, columns: List[str]):
+    """创建（重建）测试表"""
+    cursor.execute(f"DROP TABLE IF EXISTS `{BENCH_TABLE}`")
+    column_defs = "\n".join(f"  {quote_column(col, parameterized=False)} TEXT DEFAULT NULL," for col in columns)
+    cursor.execute(f"""
+        CREATE TABLE `{BENCH_TABLE}` (
+          `id` INT AUTO_INCREMENT PRIMARY KEY,
+          {column_defs}
+          `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+          `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+          `created_by` VARCHAR(50) DEFAULT NULL,
+          `updated_by` VARCHAR(50) DEFAULT NULL,
+          `{SEARCH_COLUMN}` MEDIUMTEXT DEFAULT NULL,
+          `{FINGERPRINT_COLUMN}` CHAR(32) DEFAULT NULL,
+          UNIQUE KEY `{FINGERPRINT_INDEX}` (`{FINGERPRINT_COLUMN}`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def generate_csv(path: str, count: int, columns: List[str]):
+    """生成测试CSV：一半列为数字，一半为短文本，约5%为空值标记"""
+    rng = random.Random(42)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for _ in range(count):
+            row = []
+            for i in range(len(columns)):
+                if rng.random() < 0.05:
+                    row.append("N/A")
+                elif i % 2 == 0:
+                    row.append(round(rng.uniform(0, 5000), 2))
+                else:
+                    row.append("".join(rng.choices(string.ascii_letters, k=8)))
+            writer.writerow(row)
+
+
+def run_rows(conn, path: str, columns: List[str], chunk_size: int) -> Tuple[float, Dict]:
+    """分块INSERT（stream_import 的流程），返回 (耗时, 统计)"""
+    null_tokens = frozenset(settings.NULL_VALUES)
+    deduper = FileDeduper(settings.NULL_VALUES)
+    result = {"success": 0, "duplicates": 0, "failed": 0}
+    expression = search_text_sql(columns)
+
+    def fill_search_text(cursor, written_rows):
+        # 与 batch_import 相同：检索文本在MySQL中按指纹定位本批的行计算
+        fingerprints = [data[FINGERPRINT_COLUMN] for _, data in written_rows]
+        cursor.execute(
+            f"UPDATE `{BENCH_TABLE}` SET `{SEARCH_COLUMN}` = {expression} "
+            f"WHERE `{FINGERPRINT_COLUMN}` IN ({', '.join(['%s'] * len(fingerprints))})",
+            fingerprints
+        )
+
+    started = time.perf_counter()
+    for chunk in UploadReader.open(path, "csv").iter_chunks():
+        chunk, _ = deduper.filter(chunk)
+        records = dataframe_to_records(chunk)
+        cursor = conn.cursor()
+        for data in records:
+            data[FINGERPRINT_COLUMN] = compute_fingerprint(data, columns, null_tokens)
+        seen = find_existing(cursor, BENCH_TABLE, [data[FINGERPRINT_COLUMN] for data in records])
+        rows = []
+        for idx, data in zip((chunk.index + 1).tolist(), records):
+            if data[FINGERPRINT_COLUMN] in seen:
+                result["duplicates"] += 1
+                continue
+            seen.add(data[FINGERPRINT_COLUMN])
+            data["created_by"] = "bench"
+            data["updated_by"] = "bench"
+            rows.append((idx, data))
+        conn.rollback()
+        written = BulkWriter(BENCH_TABLE, chunk_size).write(conn, rows, before_commit=fill_search_text)
+        for key in ("success", "duplicates", "failed"):
+            result[key] += written[key]
+    return time.perf_counter() - started, result
+
+
+def run_load_data(path: str, columns: List[str], segment_rows: int) -> Tuple[float, Dict]:
+    """LOAD DATA 快速导入，返回 (耗时, 统计)"""
+    importer = LoadDataImporter(
+        BENCH_TABLE, columns, settings.NULL_VALUES, has_search_column=True, segment_rows=segment_rows
+    )
+    started = time.perf_counter()
+    result = importer.run(UploadReader.open(path, "csv").iter_chunks(), "bench")
+    return time.perf_counter() - started, result
+
+
+def truncate(conn):
+    conn.cursor().execute(f"TRUNCATE TABLE `{BENCH_TABLE}`")
+    conn.commit()
+
+
+def report(label: str, rows: int, seconds: float, result: Dict, baseline: float = None):
+    speedup = f"  {baseline / seconds:6.1f}x" if baseline else ""
+    logger.info(
+        f"{label:<26} {rows:>8} 行  {seconds:8.2f} 秒  {rows / seconds:10.0f} 行/秒{speedup}"
+        f"  (新增 {result['success']}, 重复 {result['duplicates']}, 失败 {result['failed']})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LOAD DATA 快速导入基准测试（分块INSERT vs LOAD DATA）")
+    parser.add_argument("--rows", type=int, default=200000, help="测试行数")
+    parser.add_argument("--columns", type=int, default=20, help="数据列数")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE, help="分块INSERT的块大小")
+    parser.add_argument("--segment-rows", type=int, default=settings.IMPORT_LOAD_DATA_SEGMENT_ROWS,
+                        help="LOAD DATA 每个 INSERT ... SELECT 事务的行数")
+    parser.add_argument("--keep-table", action="store_true", help="测试结束后保留测试表")
+    args = parser.parse_args()
+
+    if not local_infile_enabled():
+        logger.error("✗ MySQL 未开启 local_infile，请先执行 SET GLOBAL local_infile = 1")
+        return
+
+    columns = [f"字段_{i}" for i in range(1, args.columns + 1)]
+    # 含 % 的列名：参数化语句中需转义为 %%，重复转义时 MySQL 报 Unknown column
+    columns[-1] += "断后伸长率%"
+    fd, csv_path = tempfile.mkstemp(prefix="bench_", suffix=".csv")
+    os.close(fd)
+    logger.info(f"生成测试CSV: {args.rows} 行 × {args.columns} 列")
+    generate_csv(csv_path, args.rows, columns)
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        create_table(cursor, columns)
+        conn.commit()
+
+        logger.info("=" * 90)
+        baselines = []
+        for round_label in ("空表", "重复导入"):
+            seconds, result = run_rows(conn, csv_path, columns, args.chunk_size)
+            baselines.append(seconds)
+            report(f"分块INSERT（{round_label}）", args.rows, seconds, result)
+        truncate(conn)
+
+        for round_label, baseline in zip(("空表", "重复导入"), baselines):
+            seconds, result = run_load_data(csv_path, columns, args.segment_rows)
+            report(f"LOAD DATA（{round_label}）", args.rows, seconds, result, baseline)
+            if result["errors"]:
+                logger.warning(f"⚠ 加载警告 {result['warnings']} 条，失败 {result['failed']} 行: {result['errors'][:3]}")
+        logger.info("=" * 90)
+
+    finally:
+        if not args.keep_table:
+            conn.cursor().execute(f"DROP TABLE IF EXISTS `{BENCH_TABLE}`")
+            conn.commit()
+        conn.close()
+        os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+空值规范化微基准测试
+
+对比原逐单元格实现与 utils.null_values 的按列向量化实现（不需要数据库）：
+1. 导入清洗：import_data.py 原 clean_value 逐单元格（iterrows） vs clean_frame
+2. NaN → None：原 replace + where 两次整表替换 vs dataframe_to_records 的一次掩码
+3. 覆盖率空值判断：原 CoverageService.is_empty_value 逐单元格 vs frame_null_mask
+   （向量化一侧包含由查询结果字典列表构建DataFrame的耗时）
+
+测试数据为随机生成：一半列为数字，一半为文本，约15%为空值或空值标记（含首尾空白）。
+
+使用方式：
+    cd backend/scripts
+    python bench_null_values.py                    # 5万行 × 34列
+    python bench_null_values.py --rows 200000 --columns 20 --repeat 5
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import pandas as pd
+
+# 添加项目根目录到Python路径，以便导入backend包
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from backend.config import settings
+from backend.services.experimental.upload_reader import dataframe_to_records
+from backend.utils.logger import get_logger
+from backend.utils.null_values import NULL_TOKENS, clean_frame, frame_null_mask
+
+# 初始化日志记录器
+logger = get_logger(__name__)
+
+
+def generate_frame(rows: int, columns: int) -> pd.DataFrame:
+    """生成测试数据（文本列含空值标记，数字列含 NaN）"""
+    rng = random.Random(42)
+    tokens = list(settings.NULL_VALUES)
+    data = {}
+    for i in range(columns):
+        values = []
+        for _ in range(rows):
+            if rng.random() < 0.15:
+                values.append(None if i % 2 == 0 else f" {rng.choice(tokens)} ")
+            elif i % 2 == 0:
+                values.append(round(rng.uniform(0, 5000), 2))
+            else:
+                values.append("".join(rng.choices(string.ascii_letters, k=8)))
+        data[f"字段_{i + 1}"] = pd.Series(values, dtype="float64" if i % 2 == 0 else object)
+    return pd.DataFrame(data)
+
+
+# ========== 原逐单元格实现 ==========
+
+def legacy_clean_value(value):
+    """import_data.py 原 clean_value"""
+    if pd.isna(value):
+        return None
+    value_str = str(value).strip()
+    if value_str in settings.NULL_VALUES:
+        return None
+    return value_str
+
+
+def legacy_clean(df: pd.DataFrame):
+    return [[legacy_clean_value(row[col]) for col in df.columns] for _, row in df.iterrows()]
+
+
+def legacy_to_records(df: pd.DataFrame):
+    df = df.replace({pd.NA: None, float('nan'): None})
+    df = df.where(pd.notna(df), None)
+    return df.to_dict('records')
+
+
+def legacy_is_empty_value(value) -> bool:
+    """原 CoverageService.is_empty_value"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        value_stripped = value.strip()
+        if value_stripped == '' or value_stripped in settings.NULL_VALUES:
+            return True
+    return False
+
+
+def legacy_coverage_counts(rows: List[dict], fields: List[str]) -> int:
+    non_empty = 0
+    for row in rows:
+        for field in fields:
+            if field in row and not legacy_is_empty_value(row[field]):
+                non_empty += 1
+    return non_empty
+
+
+def vectorized_coverage_counts(rows: List[dict], fields: List[str]) -> int:
+    df = pd.DataFrame.from_records(rows)
+    return int((~frame_null_mask(df[fields], NULL_TOKENS)).to_numpy().sum())
+
+
+# ========== 计时 ==========
+
+def best_of(func: Callable, repeat: int) -> float:
+    """执行 repeat 次，返回最短耗时"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, cells: int, seconds: float, baseline: float = None):
+    speedup = f"  {baseline / seconds:6.1f}x" if baseline else ""
+    logger.info(f"{label:<34} {seconds * 1000:10.1f} ms  {cells / seconds / 1e6:8.2f} 百万单元格/秒{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="空值规范化微基准测试（逐单元格 vs 按列向量化）")
+    parser.add_argument("--rows", type=int, default=50000, help="测试行数")
+    parser.add_argument("--columns", type=int, default=34, help="数据列数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最短耗时）")
+    args = parser.parse_args()
+
+    logger.info(f"生成测试数据: {args.rows} 行 × {args.columns} 列")
+    df = generate_frame(args.rows, args.columns)
+    cells = args.rows * args.columns
+    fields = df.columns.tolist()
+    rows = df.astype(object).where(df.notna(), None).to_dict('records')
+
+    # 结果一致性检查
+    legacy_count = legacy_coverage_counts(rows, fields)
+    vectorized_count = vectorized_coverage_counts(rows, fields)
+    if legacy_count != vectorized_count:
+        logger.warning(f"⚠ 覆盖率非空单元格数不一致: 逐单元格 {legacy_count}, 向量化 {vectorized_count}")
+
+    logger.info("=" * 80)
+    baseline = best_of(lambda: legacy_clean(df), args.repeat)
+    report("导入清洗 clean_value（逐单元格）", cells, baseline)
+    report("导入清洗 clean_frame", cells, best_of(lambda: clean_frame(df), args.repeat), baseline)
+
+    baseline = best_of(lambda: legacy_to_records(df), args.repeat)
+    report("NaN→None replace + where", cells, baseline)
+    report("NaN→None dataframe_to_records", cells, best_of(lambda: dataframe_to_records(df), args.repeat), baseline)
+
+    baseline = best_of(lambda: legacy_coverage_counts(rows, fields), args.repeat)
+    report("覆盖率 is_empty_value（逐单元格）", cells, baseline)
+    report("覆盖率 frame_null_mask", cells,
+           best_of(lambda: vectorized_coverage_counts(rows, fields), args.repeat), baseline)
+    logger.info("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
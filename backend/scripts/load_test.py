@@ -0,0 +1,216 @@
+"""
+接口延迟隔离压测
+
+本脚本用于验证重负载请求（覆盖率汇总、文件导入）不会拖慢登录和列表查询。
+需要先启动后端服务（python -m uvicorn backend.main:app）。
+
+测试流程：
+1. 基线阶段：无负载时顺序请求登录和列表接口，记录延迟
+2. 负载阶段：启动若干线程持续请求重负载接口，同时再次测量登录和列表延迟
+3. 输出两个阶段的 p50/p95/max 延迟对比
+
+为了让请求真正进入线程池而不是命中缓存：列表请求带 Cache-Control: no-cache 跳过响应缓存，
+覆盖率汇总带 refresh=true 等待重新计算；导入接口返回202后轮询导入任务直到结束，
+重负载耗时按整个导入任务计算。
+
+服务层阻塞调用按类别卸载到独立线程池（见 utils/concurrency.py）后，
+负载阶段的轻量请求延迟应与基线处于同一量级；若事件循环被阻塞，
+轻量请求延迟会接近重负载请求的耗时。
+
+使用方式：
+    cd backend/scripts
+    python load_test.py --dataset batch_1 --heavy-workers 4 --samples 50
+    # 使用导入接口作为重负载（需管理员账号）
+    python load_test.py --import-file ../../data/batch_1/batch2.xlsx --dataset load_test
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 添加父目录到Python路径，以便导入logger模块
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.logger import get_logger
+
+# 初始化日志记录器
+logger = get_logger(__name__)
+
+
+NO_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def http_request(method: str, url: str, token: Optional[str] = None,
+                 body: Optional[bytes] = None, content_type: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 timeout: float = 300) -> Tuple[int, bytes]:
+    """发送HTTP请求并返回 (状态码, 响应体)"""
+    request = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    if content_type:
+        request.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    """登录并返回JWT Token"""
+    body = json.dumps({"username": username, "password": password}).encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login", data=body, method="POST",
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def build_multipart(file_path: Path) -> Tuple[bytes, str]:
+    """构造multipart/form-data请求体"""
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{file_path.name}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return head + file_path.read_bytes() + tail, f"multipart/form-data; boundary={boundary}"
+
+
+def measure_light_requests(args, token: str, samples: int) -> Dict[str, List[float]]:
+    """顺序测量登录和列表接口延迟（毫秒）"""
+    latencies = {"login": [], "list": []}
+    login_body = json.dumps({"username": args.username, "password": args.password}).encode("utf-8")
+    list_url = f"{args.base_url}/api/experimental-data/{args.dataset}?page=1&page_size=20"
+
+    for _ in range(samples):
+        start = time.perf_counter()
+        http_request("POST", f"{args.base_url}/api/auth/login", body=login_body,
+                     content_type="application/json")
+        latencies["login"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        http_request("GET", list_url, token=token, headers=NO_CACHE_HEADERS)
+        latencies["list"].append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+def wait_import_task(args, token: str, submit_body: bytes, poll_interval: float = 0.5) -> Optional[str]:
+    """从202响应中取出导入任务ID并轮询到任务结束，返回最终状态"""
+    task_id = json.loads(submit_body).get("task_id")
+    if not task_id:
+        return None
+    task_url = f"{args.base_url}/api/experimental-data/import-tasks/{urllib.parse.quote(task_id)}"
+    while True:
+        code, body = http_request("GET", task_url, token=token, headers=NO_CACHE_HEADERS)
+        if code != 200:
+            logger.warning(f"查询导入任务失败: {task_id}, HTTP {code}")
+            return None
+        task_status = json.loads(body)["status"]
+        if task_status in TERMINAL_STATUSES:
+            return task_status
+        time.sleep(poll_interval)
+
+
+def heavy_worker(args, token: str, stop_event: threading.Event, heavy_latencies: List[float]):
+    """持续发送重负载请求（导入则等待任务结束），直到stop_event被设置"""
+    if args.import_file:
+        body, content_type = build_multipart(Path(args.import_file))
+        method, url = "POST", f"{args.base_url}/api/experimental-data/{args.dataset}/import"
+    else:
+        body, content_type = None, None
+        method, url = "GET", f"{args.base_url}/api/experimental-data/coverage/all?refresh=true"
+
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        code, response_body = http_request(method, url, token=token, body=body,
+                                           content_type=content_type, headers=NO_CACHE_HEADERS)
+        if args.import_file:
+            if code != 202:
+                logger.warning(f"提交导入任务失败: HTTP {code}")
+            else:
+                task_status = wait_import_task(args, token, response_body)
+                if task_status != "completed":
+                    logger.warning(f"导入任务未成功完成: {task_status}")
+        elif code != 200:
+            logger.warning(f"覆盖率汇总请求失败: HTTP {code}")
+        heavy_latencies.append((time.perf_counter() - start) * 1000)
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """计算延迟分位数"""
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(latencies)
+    p95_index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+    return {
+        "p50": round(statistics.median(ordered), 2),
+        "p95": round(ordered[p95_index], 2),
+        "max": round(ordered[-1], 2)
+    }
+
+
+def main():
+    """压测入口：基线阶段 + 负载阶段，输出延迟对比"""
+    parser = argparse.ArgumentParser(description="接口延迟隔离压测")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="123456")
+    parser.add_argument("--dataset", default="batch_1", help="列表查询/导入使用的数据集ID")
+    parser.add_argument("--samples", type=int, default=30, help="每阶段轻量请求采样次数")
+    parser.add_argument("--heavy-workers", type=int, default=4, help="并发重负载请求线程数")
+    parser.add_argument("--import-file", default=None, help="使用导入接口作为重负载时的文件路径")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+
+    logger.info("=" * 60)
+    logger.info("阶段1: 基线（无负载）")
+    baseline = measure_light_requests(args, token, args.samples)
+
+    logger.info(f"阶段2: 负载（{args.heavy_workers} 个重负载线程）")
+    stop_event = threading.Event()
+    heavy_latencies: List[float] = []
+    workers = [
+        threading.Thread(target=heavy_worker, args=(args, token, stop_event, heavy_latencies), daemon=True)
+        for _ in range(args.heavy_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(1)  # 等待重负载请求进入服务端
+    loaded = measure_light_requests(args, token, args.samples)
+    stop_event.set()
+    for worker in workers:
+        worker.join()
+
+    logger.info("=" * 60)
+    logger.info(f"{'接口':<8}{'阶段':<8}{'p50(ms)':>12}{'p95(ms)':>12}{'max(ms)':>12}")
+    for name in ("login", "list"):
+        for phase, data in (("基线", baseline), ("负载", loaded)):
+            stats = summarize(data[name])
+            logger.info(f"{name:<8}{phase:<8}{stats['p50']:>12}{stats['p95']:>12}{stats['max']:>12}")
+    heavy_stats = summarize(heavy_latencies)
+    logger.info(f"重负载请求: {len(heavy_latencies)} 次, p50={heavy_stats['p50']}ms, max={heavy_stats['max']}ms")
+
+    for name in ("login", "list"):
+        base_p95 = summarize(baseline[name])["p95"] or 1.0
+        ratio = summarize(loaded[name])["p95"] / base_p95
+        logger.info(f"{name} p95 负载/基线 = {ratio:.2f}x")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
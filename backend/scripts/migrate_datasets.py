@@ -0,0 +1,111 @@
+"""
+升级已有数据集的表结构
+
+本脚本把历史 exp_data_* 表升级到 DatasetCreator 新建表的结构（索引、辅助列等），
+迁移步骤定义在 services/experimental/table_migrations.py 中，均可重复执行。
+
+功能：
+1. 遍历元数据中的所有数据集（或指定数据集）
+2. 依次执行全部迁移步骤（或指定步骤）
+3. 迁移完成后刷新表结构注册表
+
+注意：column_types 步骤会更新元数据配置文件中的字段类型，运行中的服务需重启后生效。
+
+使用方式：
+    cd backend/scripts
+    python migrate_datasets.py                               # 所有数据集、所有步骤
+    python migrate_datasets.py --dataset batch_1             # 指定数据集
+    python migrate_datasets.py --step pagination_index       # 指定步骤
+    python migrate_datasets.py --step search_index           # 添加检索列并建立全文索引
+    python migrate_datasets.py --step column_types           # 按已有数据把TEXT列转换为推断的类型
+    python migrate_datasets.py --step row_fingerprint        # 添加行指纹列、回填并建立唯一索引
+    python migrate_datasets.py --step coverage_stats         # 添加非空字段数列并重建覆盖率统计（修复偏差）
+    python migrate_datasets.py --list                        # 列出迁移步骤
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径，以便导入backend包
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from backend.models.experimental.metadata import DatasetMetadata
+from backend.services.experimental.table_migrations import MIGRATIONS, list_migrations
+from backend.utils.db_pool import get_connection
+from backend.utils.logger import get_logger
+from backend.utils.schema_registry import schema_registry
+
+# 初始化日志记录器
+logger = get_logger(__name__)
+
+
+def migrate_dataset(dataset_id: str, steps: list) -> int:
+    """
+    对单个数据集执行迁移步骤
+
+    Args:
+        dataset_id: 数据集ID
+        steps: 迁移步骤名称列表
+
+    Returns:
+        int: 实际修改了表结构的步骤数
+    """
+    metadata = DatasetMetadata(dataset_id)
+    table_name = metadata.get_table_name()
+
+    if not schema_registry.table_exists(table_name):
+        logger.warning(f"⚠ 数据集 {dataset_id} 的表 {table_name} 不存在，跳过")
+        return 0
+
+    changed = 0
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for step in steps:
+            logger.info(f"  - {dataset_id}: 执行 {step}")
+            if MIGRATIONS[step](cursor, metadata):
+                changed += 1
+            conn.commit()
+    finally:
+        conn.close()
+
+    schema_registry.invalidate(table_name)
+    return changed
+
+
+def main():
+    """迁移脚本入口"""
+    parser = argparse.ArgumentParser(description="升级已有数据集的表结构")
+    parser.add_argument("--dataset", action="append", help="数据集ID（可重复指定），默认全部")
+    parser.add_argument("--step", action="append", choices=list_migrations(), help="迁移步骤（可重复指定），默认全部")
+    parser.add_argument("--list", action="store_true", help="列出所有迁移步骤")
+    args = parser.parse_args()
+
+    if args.list:
+        for step in list_migrations():
+            print(step)
+        return
+
+    dataset_ids = args.dataset or [d["id"] for d in DatasetMetadata.list_all_datasets()]
+    steps = args.step or list_migrations()
+
+    logger.info("=" * 60)
+    logger.info(f"开始迁移: {len(dataset_ids)} 个数据集, 步骤: {', '.join(steps)}")
+    logger.info("=" * 60)
+
+    total_changed = 0
+    failed = []
+    for dataset_id in dataset_ids:
+        try:
+            total_changed += migrate_dataset(dataset_id, steps)
+        except Exception as e:
+            failed.append(dataset_id)
+            logger.error(f"✗ 数据集 {dataset_id} 迁移失败: {str(e)}", exc_info=True)
+
+    logger.info("=" * 60)
+    logger.info(f"迁移完成: 修改 {total_changed} 处表结构, 失败数据集: {failed or '无'}")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 """认证服务"""
-import pymysql
 from typing import Optional, Dict
 from datetime import datetime, timedelta
 import jwt
 from backend.config import Settings
+from backend.utils.db_pool import get_connection
 
 
 settings = Settings()
@@ -16,16 +16,8 @@ class AuthService:
         self.settings = settings
     
     def get_connection(self):
-        """获取数据库连接"""
-        return pymysql.connect(
-            host=self.settings.MYSQL_HOST,
-            port=self.settings.MYSQL_PORT,
-            user=self.settings.MYSQL_USER,
-            password=self.settings.MYSQL_PASSWORD,
-            database=self.settings.MYSQL_DATABASE,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        """从进程级连接池借出数据库连接（close() 即归还）"""
+        return get_connection()
     
     def authenticate(self, username: str, password: str) -> Optional[Dict]:
         """
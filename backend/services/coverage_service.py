@@ -1,7 +1,12 @@
 """数据覆盖率计算服务"""
-import pymysql
 from typing import Dict, List
 from backend.config import Settings
+from backend.services.experimental.coverage_state import (
+    FILLED_ALIAS, coverage_histogram, fetch_low_coverage_rows, row_coverage
+)
+from backend.utils.db_pool import get_connection
+from backend.utils.null_values import NULL_TOKENS, is_null_value
+from backend.utils.schema_registry import schema_registry
 
 
 settings = Settings()
@@ -31,16 +36,8 @@ class CoverageService:
         ]
     
     def get_connection(self):
-        """获取数据库连接"""
-        return pymysql.connect(
-            host=self.settings.MYSQL_HOST,
-            port=self.settings.MYSQL_PORT,
-            user=self.settings.MYSQL_USER,
-            password=self.settings.MYSQL_PASSWORD,
-            database=self.settings.MYSQL_DATABASE,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        """从进程级连接池借出数据库连接（close() 即归还）"""
+        return get_connection()
     
     def get_table_name(self, batch_id: int) -> str:
         """获取批次表名"""
@@ -49,14 +46,8 @@ class CoverageService:
         return f"exp_data_batch_{batch_id}"
     
     def is_empty_value(self, value) -> bool:
-        """判断值是否为空"""
-        if value is None:
-            return True
-        if isinstance(value, str):
-            value_stripped = value.strip()
-            if value_stripped == '' or value_stripped in self.settings.NULL_VALUES:
-                return True
-        return False
+        """判断值是否为空（见 utils.null_values）"""
+        return is_null_value(value, NULL_TOKENS)
     
     def calculate_row_coverage(self, row: Dict) -> float:
         """
@@ -129,12 +120,14 @@ class CoverageService:
         try:
             cursor = conn.cursor()
             
-            # 查询所有数据
-            sql = f"SELECT * FROM {table_name}"
-            cursor.execute(sql)
-            rows = cursor.fetchall()
+            # 在MySQL中按每行的非空字段数分组统计（见 experimental.coverage_state.coverage_histogram）
+            columns = schema_registry.get_columns(table_name)
+            existing = set(columns)
+            fields = [field for field in self.data_fields if field in existing]
+            histogram, field_counts = coverage_histogram(cursor, table_name, fields)
+            total_records = sum(histogram.values())
             
-            if not rows:
+            if not total_records:
                 return {
                     "batch_id": batch_id,
                     "total_records": 0,
@@ -145,63 +138,52 @@ class CoverageService:
                     "field_coverage": {}
                 }
             
-            total_records = len(rows)
-            total_cells = 0
-            non_empty_cells = 0
-            
-            # 字段覆盖率统计
-            field_stats = {field: {"total": 0, "non_empty": 0} for field in self.data_fields}
-            
-            # 记录覆盖率统计
-            row_coverages = []
-            low_coverage_records = []
-            
             # 覆盖率分布
             distribution = {"90-100%": 0, "80-90%": 0, "70-80%": 0, "below_70%": 0}
-            
-            for row in rows:
-                row_coverage = self.calculate_row_coverage(row)
-                row_coverages.append(row_coverage)
+            coverage_sum = 0.0
+            low_filled = []
+            for filled, records in histogram.items():
+                coverage = row_coverage(filled, len(fields))
+                coverage_sum += coverage * records
                 
                 # 分类统计
-                if row_coverage >= 90:
-                    distribution["90-100%"] += 1
-                elif row_coverage >= 80:
-                    distribution["80-90%"] += 1
-                elif row_coverage >= 70:
-                    distribution["70-80%"] += 1
+                if coverage >= 90:
+                    distribution["90-100%"] += records
+                elif coverage >= 80:
+                    distribution["80-90%"] += records
+                elif coverage >= 70:
+                    distribution["70-80%"] += records
                 else:
-                    distribution["below_70%"] += 1
+                    distribution["below_70%"] += records
                 
-                # 记录低覆盖率的数据
-                if row_coverage < self.settings.COVERAGE_THRESHOLD * 100:
+                if coverage < self.settings.COVERAGE_THRESHOLD * 100:
+                    low_filled.append(filled)
+            
+            # 只读取最低的20条低覆盖率记录
+            low_coverage_records = []
+            if low_filled:
+                identity = [column for column in ("id", "编号") if column in columns]
+                rows = fetch_low_coverage_rows(cursor, table_name, fields, identity, max(low_filled), limit=20)
+                for row in rows:
                     low_coverage_records.append({
                         "id": row.get('id'),
                         "编号": row.get('编号', 'N/A'),
-                        "coverage": row_coverage
+                        "coverage": row_coverage(int(row[FILLED_ALIAS]), len(fields))
                     })
-                
-                # 统计每个字段
-                for field in self.data_fields:
-                    if field in row:
-                        field_stats[field]["total"] += 1
-                        total_cells += 1
-                        
-                        if not self.is_empty_value(row[field]):
-                            field_stats[field]["non_empty"] += 1
-                            non_empty_cells += 1
             
             # 计算综合覆盖率
+            total_cells = total_records * len(fields)
+            non_empty_cells = sum(filled * records for filled, records in histogram.items())
             comprehensive_coverage = round((non_empty_cells / total_cells) * 100, 2) if total_cells > 0 else 0.0
             
             # 计算平均覆盖率
-            average_coverage = round(sum(row_coverages) / len(row_coverages), 2) if row_coverages else 0.0
+            average_coverage = round(coverage_sum / total_records, 2)
             
             # 计算每个字段的覆盖率
             field_coverage = {}
-            for field, stats in field_stats.items():
-                if stats["total"] > 0:
-                    field_coverage[field] = round((stats["non_empty"] / stats["total"]) * 100, 2)
+            for field in self.data_fields:
+                if field in field_counts:
+                    field_coverage[field] = round((field_counts[field] / total_records) * 100, 2)
                 else:
                     field_coverage[field] = 0.0
             
@@ -211,7 +193,7 @@ class CoverageService:
                 "comprehensive_coverage": comprehensive_coverage,
                 "average_coverage": average_coverage,
                 "coverage_distribution": distribution,
-                "low_coverage_records": low_coverage_records[:20],  # 最多返回20条
+                "low_coverage_records": low_coverage_records,  # 最多返回20条
                 "field_coverage": field_coverage,
                 "meets_threshold": comprehensive_coverage >= self.settings.COVERAGE_THRESHOLD * 100
             }
@@ -1,13 +1,75 @@
 """通用实验数据服务 - 零硬编码，元数据驱动"""
-import pymysql
-from typing import List, Dict, Optional, Tuple, Any
+import base64
+import json
+from typing import List, Dict, Callable, Iterable, Optional, Tuple, Any
 from datetime import datetime
+
+import pymysql
+
 from backend.models.experimental.metadata import DatasetMetadata
 from backend.config import Settings
+from backend.services.experimental.bulk_writer import BulkWriter
+from backend.services.experimental.count_service import NO_FILTER, row_counter
+from backend.services.experimental.coverage_state import (
+    COVERAGE_COLUMN, CoverageDelta, coverage_fields, coverage_histogram, coverage_state,
+    filled_count_sql, row_filled_flags
+)
+from backend.services.experimental.file_dedupe import FileDeduper
+from backend.services.experimental.fingerprint import (
+    FINGERPRINT_COLUMN, compute_fingerprint, find_existing, is_duplicate_key_error
+)
+from backend.services.experimental.filter_compiler import FilterCompiler, equality_filter, parse_filter
+from backend.services.experimental.load_data import LoadDataImporter
+from backend.services.experimental.search_index import (
+    ENGINE_FULLTEXT, ENGINE_SCAN, SEARCH_COLUMN,
+    search_condition, search_text_sql
+)
+from backend.services.experimental.table_migrations import widen_text_columns
+from backend.services.experimental.type_inference import (
+    TYPE_DATETIME, TYPE_INTEGER, TYPE_STRING, check_value, is_typed, varchar_length
+)
+from backend.services.experimental.upload_reader import dataframe_to_records
+from backend.utils.db_pool import get_connection
+from backend.utils.null_values import NULL_TOKENS, clean_frame, is_null_value
+from backend.utils.response_cache import data_versions
+from backend.utils.schema_registry import INTERNAL_COLUMNS, schema_registry
 
 
 settings = Settings()
 
+# 游标中 created_at 的格式（TIMESTAMP 精度为秒）
+CURSOR_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def encode_cursor(row: Dict) -> Optional[str]:
+    """根据记录的 (created_at, id) 生成不透明的分页游标"""
+    created_at = row.get('created_at')
+    if created_at is None or row.get('id') is None:
+        return None
+    if isinstance(created_at, datetime):
+        created_at = created_at.strftime(CURSOR_TIME_FORMAT)
+    payload = json.dumps([str(created_at), row['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    解析分页游标
+    
+    Returns:
+        (created_at, id)
+        
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        datetime.strptime(created_at, CURSOR_TIME_FORMAT)
+        return created_at, int(row_id)
+    except Exception:
+        raise ValueError("无效的分页游标")
+
 
 class BaseExperimentalDataService:
     """通用实验数据服务 - 支持所有数据集"""
@@ -22,48 +84,300 @@ class BaseExperimentalDataService:
         self.dataset_id = dataset_id
         self.metadata = DatasetMetadata(dataset_id)
         self.table_name = self.metadata.get_table_name()
+        # 替换导入时 table_name 指向影子表，live_table_name 始终为对外的数据表
+        self.live_table_name = self.table_name
+        self.is_shadow = False
         self.settings = settings
+        # 非字符串类型的字段（INT/DOUBLE/DATE列不能存储 N/A 等空值标记）→ (类型, 列类型)
+        self.typed_field_types = {
+            field['name']: (field.get('type'), field.get('sql_type'))
+            for field in self.metadata.get_data_fields()
+            if is_typed(field.get('type'))
+        }
+        self.typed_fields = set(self.typed_field_types)
+        # VARCHAR 列的长度上限（更长的值写入前先加宽列，见 _ensure_text_capacity）
+        self.text_field_lengths = {
+            field['name']: varchar_length(field.get('sql_type'))
+            for field in self.metadata.get_data_fields()
+            if varchar_length(field.get('sql_type'))
+        }
+        self.null_tokens = NULL_TOKENS
     
     def get_connection(self):
-        """获取数据库连接"""
-        return pymysql.connect(
-            host=self.settings.MYSQL_HOST,
-            port=self.settings.MYSQL_PORT,
-            user=self.settings.MYSQL_USER,
-            password=self.settings.MYSQL_PASSWORD,
-            database=self.settings.MYSQL_DATABASE,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        """从进程级连接池借出数据库连接（close() 即归还）"""
+        return get_connection()
     
     def _escape_field_name(self, field_name: str) -> str:
         """转义字段名（处理%等特殊字符）"""
         return field_name.replace('%', '%%')
     
-    def _ensure_table_exists(self, cursor):
-        """确保数据库表存在，否则抛出异常"""
-        cursor.execute(f"SHOW TABLES LIKE '{self.table_name}'")
-        if not cursor.fetchone():
+    def _select_columns(self, fields: Optional[List[str]] = None) -> str:
+        """
+        SELECT列表（列名已转义）
+        
+        Args:
+            fields: 字段投影（由 DatasetMetadata.resolve_fields 校验），None时为全部对外列
+                    （排除检索文本等内部辅助列）
+        """
+        columns = fields if fields else schema_registry.get_public_columns(self.table_name)
+        return ", ".join(f"`{self._escape_field_name(column)}`" for column in columns)
+    
+    def _has_search_column(self) -> bool:
+        """数据表是否已有检索列（历史表需执行迁移后才有）"""
+        return schema_registry.has_column(self.table_name, SEARCH_COLUMN)
+    
+    def _refresh_search_text(self, cursor, data_id: int):
+        """按当前字段值重新计算一条记录的检索文本（需在commit前调用）"""
+        if self._has_search_column():
+            cursor.execute(
+                f"UPDATE {self.table_name} SET `{SEARCH_COLUMN}` = "
+                f"{search_text_sql(self.metadata.get_all_field_names())} WHERE id = %s",
+                (data_id,)
+            )
+    
+    def _fill_search_text(self, cursor, rows: List[Tuple[int, Dict]], after_id: int = 0):
+        """
+        按字段值计算本批新写入行的检索文本（需在commit前调用）
+        
+        有指纹列时按指纹（唯一索引）定位本批的行；历史表没有指纹列时，
+        更新 id 大于 after_id（写入前的最大id）且检索文本为空的行。
+        
+        Args:
+            rows: 本批写入的 (行号, 行数据) 列表
+            after_id: 写入前数据表的最大id（仅没有指纹列时使用）
+        """
+        if not rows or not self._has_search_column():
+            return
+        expression = search_text_sql(self.metadata.get_all_field_names())
+        if self._has_fingerprint_column():
+            fingerprints = [data[FINGERPRINT_COLUMN] for _, data in rows]
+            placeholders = ", ".join(["%s"] * len(fingerprints))
+            cursor.execute(
+                f"UPDATE {self.table_name} SET `{SEARCH_COLUMN}` = {expression} "
+                f"WHERE `{FINGERPRINT_COLUMN}` IN ({placeholders})",
+                fingerprints
+            )
+        else:
+            cursor.execute(
+                f"UPDATE {self.table_name} SET `{SEARCH_COLUMN}` = {expression} "
+                f"WHERE id > %s AND `{SEARCH_COLUMN}` IS NULL",
+                (after_id,)
+            )
+    
+    def _has_fingerprint_column(self) -> bool:
+        """数据表是否已有行指纹列（历史表需执行迁移后才有）"""
+        return schema_registry.has_column(self.table_name, FINGERPRINT_COLUMN)
+    
+    def _fingerprint(self, data: Dict) -> str:
+        """计算一行数据的指纹（全部数据字段，见 fingerprint 模块）"""
+        return compute_fingerprint(data, self.metadata.get_all_field_names(), self.null_tokens)
+    
+    def _refresh_fingerprint(self, cursor, data_id: int):
+        """
+        按当前字段值重新计算一条记录的指纹（需在commit前调用）
+        
+        Raises:
+            ValueError: 更新后与已有记录完全相同
+        """
+        if not self._has_fingerprint_column():
+            return
+        cursor.execute(
+            f"SELECT {self._select_columns(self.metadata.get_all_field_names())} "
+            f"FROM {self.table_name} WHERE id = %s",
+            (data_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return
+        try:
+            cursor.execute(
+                f"UPDATE {self.table_name} SET `{FINGERPRINT_COLUMN}` = %s WHERE id = %s",
+                (self._fingerprint(row), data_id)
+            )
+        except pymysql.err.IntegrityError as e:
+            if is_duplicate_key_error(e):
+                raise ValueError("更新后的数据与已有记录完全相同")
+            raise
+    
+    def _normalize_values(self, data: Dict) -> Dict:
+        """
+        检查非字符串类型字段的值（见 type_inference.check_value）
+        
+        空值标记（settings.NULL_VALUES）转换为NULL；值无法写入列类型时抛出 ValueError，
+        不把数据库的类型错误（或非严格模式下静默写入的0）留给写入阶段。
+        
+        Raises:
+            ValueError: 值与字段类型不符
+        """
+        errors = []
+        for key in self.typed_fields.intersection(data.keys()):
+            value = data[key]
+            if isinstance(value, str) and is_null_value(value, self.null_tokens):
+                data[key] = None
+                continue
+            field_type, sql_type = self.typed_field_types[key]
+            data[key], error = check_value(value, field_type, sql_type)
+            if error:
+                errors.append(f"{key}={value!r} {error}")
+        if errors:
+            raise ValueError("字段值与类型不符: " + "; ".join(errors))
+        return data
+    
+    def _text_lengths(self, records: Iterable[Dict]) -> Dict[str, int]:
+        """VARCHAR 字段中待写入值的最大长度 {字段名: 字符数}"""
+        lengths: Dict[str, int] = {}
+        for record in records:
+            for key in self.text_field_lengths.keys() & record.keys():
+                value = record[key]
+                if value is not None:
+                    lengths[key] = max(lengths.get(key, 0), len(str(value)))
+        return lengths
+    
+    def _ensure_text_capacity(self, cursor, max_lengths: Dict[str, int]):
+        """
+        加宽容纳不下待写入值的 VARCHAR 列（见 table_migrations.widen_text_columns）
+        
+        ALTER TABLE 会隐式提交，需在写事务开始前调用。
+        """
+        overflow = {
+            key: length for key, length in max_lengths.items()
+            if key in self.text_field_lengths and length > self.text_field_lengths[key]
+        }
+        if not overflow:
+            return
+        column_types = widen_text_columns(
+            cursor, self.metadata, self.table_name, overflow, save_metadata=not self.is_shadow
+        )
+        for key, sql_type in column_types.items():
+            length = varchar_length(sql_type)
+            if length:
+                self.text_field_lengths[key] = length
+            else:
+                self.text_field_lengths.pop(key, None)
+    
+    def _ensure_table_exists(self):
+        """确保数据库表存在，否则抛出异常（查询进程级表结构注册表，无需访问数据库）"""
+        if not schema_registry.table_exists(self.table_name):
             raise ValueError(f"数据集对应的数据库表不存在: {self.table_name}")
     
+    def _record_row_delta(self, cursor, delta: int):
+        """在写事务内维护数据集统计信息（需在commit前调用）"""
+        if not self.is_shadow:
+            row_counter.adjust(cursor, self.dataset_id, delta)
+    
+    def _coverage_fields(self) -> List[str]:
+        """参与覆盖率计算的字段（见 coverage_state）"""
+        return coverage_fields(self.metadata, self.live_table_name)
+    
+    def _has_coverage_column(self) -> bool:
+        """数据表是否已有每行非空字段数列（历史表需执行迁移后才有）"""
+        return schema_registry.has_column(self.table_name, COVERAGE_COLUMN)
+    
+    def _record_coverage(self, cursor, delta: Optional[CoverageDelta]):
+        """
+        在写事务内维护覆盖率统计（需在commit前调用）
+        
+        delta 为None表示增量未知，重置统计，下次读取时重建。
+        """
+        if self.is_shadow:
+            return
+        if delta is None:
+            coverage_state.reset(cursor, self.dataset_id)
+        else:
+            coverage_state.apply(cursor, self.dataset_id, delta)
+    
+    def _coverage_of_ids(
+        self,
+        cursor,
+        data_ids: List[int],
+        delta: Optional[CoverageDelta] = None,
+        sign: int = 1
+    ) -> CoverageDelta:
+        """
+        按当前字段值统计指定记录的覆盖率并累加到 delta（更新、删除前用 sign=-1 扣除旧值）
+        """
+        placeholders = ", ".join(["%s"] * len(data_ids))
+        histogram, field_counts = coverage_histogram(
+            cursor, self.table_name, self._coverage_fields(), f"s.id IN ({placeholders})", list(data_ids)
+        )
+        delta = delta if delta is not None else CoverageDelta()
+        delta.add_histogram(histogram, field_counts, sign)
+        return delta
+    
+    def _refresh_coverage_filled(self, cursor, data_id: int):
+        """按当前字段值重新计算一条记录的非空字段数（需在commit前调用）"""
+        if self._has_coverage_column():
+            filled_sql, params = filled_count_sql(self._coverage_fields())
+            cursor.execute(
+                f"UPDATE {self.table_name} SET `{COVERAGE_COLUMN}` = {filled_sql} WHERE id = %s",
+                tuple(params) + (data_id,)
+            )
+    
+    def _after_write(self):
+        """写操作提交后使相关缓存失效（计数缓存、响应缓存）"""
+        if self.is_shadow:
+            return
+        row_counter.invalidate(self.dataset_id)
+        data_versions.bump(self.dataset_id)
+    
     # ========== 查询操作 ==========
     
+    def _page_condition(
+        self,
+        where_sql: str,
+        params: List,
+        page: int,
+        page_size: int,
+        page_cursor: Optional[str]
+    ) -> Tuple[str, List, int]:
+        """
+        构建分页条件
+        
+        传入游标时取排在游标之后（更早）的记录，走 (created_at, id) 索引，
+        页面深度不影响耗时；否则按页码计算OFFSET（兼容旧接口）。
+        
+        Returns:
+            (WHERE子句, 参数列表, OFFSET)
+        """
+        if page_cursor:
+            created_at, last_id = decode_cursor(page_cursor)
+            keyset_sql = "(created_at < %s OR (created_at = %s AND id < %s))"
+            return f"({where_sql}) AND {keyset_sql}", params + [created_at, created_at, last_id], 0
+        return where_sql, list(params), (page - 1) * page_size
+    
+    def build_next_cursor(self, data_list: List[Dict], page_size: int) -> Optional[str]:
+        """根据当前页最后一条记录生成下一页游标（不足一页说明已到末尾）"""
+        if len(data_list) < page_size:
+            return None
+        return encode_cursor(data_list[-1])
+    
     def list_data(
         self,
         page: int = 1,
         page_size: int = 20,
-        filters: Optional[Dict[str, Any]] = None
-    ) -> Tuple[List[Dict], int]:
+        filters: Optional[Dict[str, Any]] = None,
+        page_cursor: Optional[str] = None,
+        count_mode: str = "exact",
+        filter_expr: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[int]]:
         """
         分页查询数据（通用）
         
         Args:
-            page: 页码
+            page: 页码（OFFSET分页）
             page_size: 每页数量
-            filters: 过滤条件字典
+            filters: 等值过滤条件字典（未定义的字段被忽略）
+            page_cursor: 分页游标，传入时使用游标分页并忽略page
+            count_mode: 计数模式 exact/estimate/none（见 count_service）
+            filter_expr: 过滤表达式或JSON条件树（语法见 filter_compiler）
+            fields: 字段投影，只查询这些列（None为全部字段）
             
         Returns:
-            (data_list, total_count)
+            (data_list, total_count)，count_mode为none时total_count为None
+            
+        Raises:
+            FilterError: 过滤条件无效
         """
         conn = self.get_connection()
         
@@ -71,35 +385,23 @@ class BaseExperimentalDataService:
             cursor = conn.cursor()
             
             # 检查表是否存在
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
 
-            # 构建WHERE子句
-            where_clauses = []
-            params = []
-            
-            if filters:
-                all_fields = set(self.metadata.get_all_field_names())
-                for key, value in filters.items():
-                    if key in all_fields and value is not None:
-                        where_clauses.append(f"`{self._escape_field_name(key)}` = %s")
-                        params.append(value)
-            
-            where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+            # 构建WHERE子句（过滤条件编译为参数化SQL）
+            where_sql, params = self._compile_filters(filters, filter_expr)
             
-            # 查询总数
-            count_sql = f"SELECT COUNT(*) as total FROM {self.table_name} WHERE {where_sql}"
-            cursor.execute(count_sql, tuple(params))
-            total = cursor.fetchone()['total']
+            # 查询总数（无过滤条件时读取维护的总行数，有过滤条件时优先使用缓存）
+            total = row_counter.count(cursor, self.dataset_id, self.table_name, where_sql, params, count_mode)
             
             # 分页查询数据
-            offset = (page - 1) * page_size
+            page_sql, page_params, offset = self._page_condition(where_sql, params, page, page_size, page_cursor)
             data_sql = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE {where_sql} 
-                ORDER BY created_at DESC 
+                SELECT {self._select_columns(fields)} FROM {self.table_name} 
+                WHERE {page_sql} 
+                ORDER BY created_at DESC, id DESC 
                 LIMIT %s OFFSET %s
             """
-            cursor.execute(data_sql, tuple(params + [page_size, offset]))
+            cursor.execute(data_sql, tuple(page_params + [page_size, offset]))
             data_list = cursor.fetchall()
             
             return data_list, total
@@ -107,22 +409,64 @@ class BaseExperimentalDataService:
         finally:
             conn.close()
     
+    def _filter_field_types(self) -> Dict[str, Optional[str]]:
+        """可过滤字段及其类型（数据字段 + id + 审计字段）"""
+        field_types = {"id": TYPE_INTEGER}
+        for field in self.metadata.get_audit_fields():
+            field_types[field] = TYPE_DATETIME if field.endswith("_at") else TYPE_STRING
+        for field in self.metadata.get_data_fields():
+            field_types[field['name']] = field.get('type')
+        return field_types
+    
+    def _compile_filters(
+        self,
+        filters: Optional[Dict[str, Any]],
+        filter_expr: Optional[str]
+    ) -> Tuple[str, List]:
+        """合并等值过滤和过滤表达式，返回 (WHERE子句, 参数列表)"""
+        nodes = []
+        if filters:
+            all_fields = set(self.metadata.get_all_field_names())
+            node = equality_filter({k: v for k, v in filters.items() if k in all_fields})
+            if node:
+                nodes.append(node)
+        if filter_expr:
+            nodes.append(parse_filter(filter_expr))
+        
+        if not nodes:
+            return NO_FILTER, []
+        
+        compiler = FilterCompiler(self._filter_field_types(), self.settings.NULL_VALUES)
+        return compiler.compile(nodes[0] if len(nodes) == 1 else {"and": nodes})
+    
     def search(
         self,
         keyword: str,
         page: int = 1,
-        page_size: int = 20
-    ) -> Tuple[List[Dict], int]:
+        page_size: int = 20,
+        page_cursor: Optional[str] = None,
+        count_mode: str = "exact",
+        order: str = "relevance",
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[int], str]:
         """
         关键词搜索（通用）
         
+        优先使用 search_text 列上的全文索引（见 search_index），
+        历史表未迁移时退回逐字段 LIKE。
+        
         Args:
             keyword: 搜索关键词
-            page: 页码
+            page: 页码（OFFSET分页）
             page_size: 每页数量
+            page_cursor: 分页游标，传入时按时间倒序使用游标分页并忽略page
+            count_mode: 计数模式 exact/estimate/none（见 count_service）
+            order: relevance 按相关度排序（仅全文检索）/ recent 按时间倒序
+            fields: 字段投影，只查询这些列（None为全部字段）
             
         Returns:
-            (data_list, total_count)
+            (data_list, total_count, engine)，count_mode为none时total_count为None，
+            engine为实际使用的查询方式 fulltext/like/scan
         """
         conn = self.get_connection()
         
@@ -130,52 +474,59 @@ class BaseExperimentalDataService:
             cursor = conn.cursor()
             
             # 检查表是否存在
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
 
             # 从元数据获取可搜索字段
             search_fields = self.metadata.get_searchable_fields()
             
             if not search_fields:
                 # 如果没有定义可搜索字段，返回空结果
-                return [], 0
-            
-            # 构建搜索条件
-            search_clauses = [
-                f"`{self._escape_field_name(field)}` LIKE %s" 
-                for field in search_fields
-            ]
-            search_sql = " OR ".join(search_clauses)
-            search_params = [f"%{keyword}%"] * len(search_fields)
-            
-            # 查询总数
-            count_sql = f"SELECT COUNT(*) as total FROM {self.table_name} WHERE {search_sql}"
-            cursor.execute(count_sql, tuple(search_params))
-            total = cursor.fetchone()['total']
-            
-            # 分页查询
-            offset = (page - 1) * page_size
-            data_sql = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE {search_sql} 
-                ORDER BY created_at DESC 
-                LIMIT %s OFFSET %s
-            """
-            cursor.execute(data_sql, tuple(search_params + [page_size, offset]))
+                return [], 0, ENGINE_SCAN
+            
+            # 构建搜索条件（全文索引 / 检索列LIKE / 逐字段LIKE）
+            engine, search_sql, search_params = search_condition(
+                keyword, self._has_search_column(), search_fields
+            )
+            
+            # 查询总数（相同关键词的计数结果会被缓存，写操作后失效）
+            total = row_counter.count(
+                cursor, self.dataset_id, self.table_name, search_sql, search_params, count_mode
+            )
+            
+            # 分页查询：全文检索按相关度排序，游标分页固定按时间倒序
+            ranked = engine == ENGINE_FULLTEXT and order == "relevance" and not page_cursor
+            page_sql, page_params, offset = self._page_condition(search_sql, search_params, page, page_size, page_cursor)
+            if ranked:
+                data_sql = f"""
+                    SELECT {self._select_columns(fields)} FROM {self.table_name} 
+                    WHERE {page_sql} 
+                    ORDER BY {search_sql} DESC, created_at DESC, id DESC 
+                    LIMIT %s OFFSET %s
+                """
+                page_params = page_params + search_params
+            else:
+                data_sql = f"""
+                    SELECT {self._select_columns(fields)} FROM {self.table_name} 
+                    WHERE {page_sql} 
+                    ORDER BY created_at DESC, id DESC 
+                    LIMIT %s OFFSET %s
+                """
+            cursor.execute(data_sql, tuple(page_params + [page_size, offset]))
             data_list = cursor.fetchall()
             
-            return data_list, total
+            return data_list, total, engine
             
         finally:
             conn.close()
     
-    def get_by_id(self, data_id: int) -> Optional[Dict]:
-        """根据ID获取单条数据"""
+    def get_by_id(self, data_id: int, fields: Optional[List[str]] = None) -> Optional[Dict]:
+        """根据ID获取单条数据（fields 为字段投影，None为全部字段）"""
         conn = self.get_connection()
         
         try:
             cursor = conn.cursor()
-            self._ensure_table_exists(cursor)
-            sql = f"SELECT * FROM {self.table_name} WHERE id = %s"
+            self._ensure_table_exists()
+            sql = f"SELECT {self._select_columns(fields)} FROM {self.table_name} WHERE id = %s"
             cursor.execute(sql, (data_id,))
             return cursor.fetchone()
         finally:
@@ -212,12 +563,12 @@ class BaseExperimentalDataService:
         
         for key in check_fields:
             value = data[key]
-            if value is None or value == '' or str(value).strip() in self.settings.NULL_VALUES:
+            if is_null_value(value, self.null_tokens):
                 # 空值检查
                 null_conditions = " OR ".join(["%s"] * len(self.settings.NULL_VALUES))
+                # 空字符串已包含在空值标记中（数值列与''比较会被当作0，不能使用 = ''）
                 where_clauses.append(
                     f"(`{self._escape_field_name(key)}` IS NULL OR "
-                    f"`{self._escape_field_name(key)}` = '' OR "
                     f"TRIM(`{self._escape_field_name(key)}`) IN ({null_conditions}))"
                 )
                 check_values.extend(self.settings.NULL_VALUES)
@@ -257,18 +608,30 @@ class BaseExperimentalDataService:
         valid, error_msg = self.metadata.validate_fields(data)
         if not valid:
             raise ValueError(error_msg)
+        self._normalize_values(data)
         
         conn = self.get_connection()
         
         try:
             cursor = conn.cursor()
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
+            self._ensure_text_capacity(cursor, self._text_lengths([data]))
             
-            # 检查重复
-            if self._check_duplicate(conn, data):
+            # 检查重复（有指纹列时一次索引查询，否则逐字段比较）
+            if self._has_fingerprint_column():
+                fingerprint = self._fingerprint(data)
+                if find_existing(cursor, self.table_name, [fingerprint]):
+                    raise ValueError("数据已存在，不允许插入完全相同的记录")
+                data[FINGERPRINT_COLUMN] = fingerprint
+            elif self._check_duplicate(conn, data):
                 raise ValueError("数据已存在，不允许插入完全相同的记录")
             
-            cursor = conn.cursor()
+            # 覆盖率：本行的非空字段数
+            fields = self._coverage_fields()
+            coverage_delta = CoverageDelta()
+            filled = coverage_delta.add_flags(row_filled_flags(data, fields), fields)
+            if self._has_coverage_column():
+                data[COVERAGE_COLUMN] = filled
             
             # 添加审计字段
             data['created_by'] = created_by
@@ -282,10 +645,22 @@ class BaseExperimentalDataService:
             sql = f"INSERT INTO {self.table_name} ({columns_str}) VALUES ({placeholders})"
             values = tuple(data.values())
             
-            cursor.execute(sql, values)
+            try:
+                cursor.execute(sql, values)
+            except pymysql.err.IntegrityError as e:
+                # 并发插入相同数据时由唯一索引兜底
+                if is_duplicate_key_error(e):
+                    raise ValueError("数据已存在，不允许插入完全相同的记录")
+                raise
+            new_id = cursor.lastrowid
+            # 检索文本在MySQL中按写入后的列值计算
+            self._refresh_search_text(cursor, new_id)
+            self._record_row_delta(cursor, 1)
+            self._record_coverage(cursor, coverage_delta)
             conn.commit()
+            self._after_write()
             
-            return cursor.lastrowid
+            return new_id
             
         finally:
             conn.close()
@@ -304,12 +679,18 @@ class BaseExperimentalDataService:
         """
         if not data:
             raise ValueError("没有提供更新字段")
+        self._normalize_values(data)
         
         conn = self.get_connection()
         
         try:
             cursor = conn.cursor()
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
+            self._ensure_text_capacity(cursor, self._text_lengths([data]))
+            
+            # 检索文本、行指纹按更新后的字段值重新计算，不接受客户端传入
+            for column in INTERNAL_COLUMNS:
+                data.pop(column, None)
             
             # 添加审计字段
             data['updated_by'] = updated_by
@@ -320,10 +701,24 @@ class BaseExperimentalDataService:
             values = list(data.values()) + [data_id]
             
             sql = f"UPDATE {self.table_name} SET {set_sql} WHERE id = %s"
+            # 覆盖率增量 = 更新后 - 更新前（按主键统计一行）
+            coverage_delta = self._coverage_of_ids(cursor, [data_id], sign=-1)
             cursor.execute(sql, tuple(values))
+            updated = cursor.rowcount > 0
+            if updated:
+                self._refresh_search_text(cursor, data_id)
+                self._refresh_coverage_filled(cursor, data_id)
+                try:
+                    self._refresh_fingerprint(cursor, data_id)
+                except ValueError:
+                    conn.rollback()
+                    raise
+                self._coverage_of_ids(cursor, [data_id], coverage_delta)
+                self._record_coverage(cursor, coverage_delta)
             conn.commit()
+            self._after_write()
             
-            return cursor.rowcount > 0
+            return updated
             
         finally:
             conn.close()
@@ -334,12 +729,18 @@ class BaseExperimentalDataService:
         
         try:
             cursor = conn.cursor()
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
             sql = f"DELETE FROM {self.table_name} WHERE id = %s"
+            coverage_delta = self._coverage_of_ids(cursor, [data_id], sign=-1)
             cursor.execute(sql, (data_id,))
+            deleted = cursor.rowcount
+            self._record_row_delta(cursor, -deleted)
+            if deleted:
+                self._record_coverage(cursor, coverage_delta)
             conn.commit()
+            self._after_write()
             
-            return cursor.rowcount > 0
+            return deleted > 0
         finally:
             conn.close()
     
@@ -357,71 +758,135 @@ class BaseExperimentalDataService:
         
         try:
             cursor = conn.cursor()
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
             placeholders = ','.join(['%s'] * len(data_ids))
             sql = f"DELETE FROM {self.table_name} WHERE id IN ({placeholders})"
+            coverage_delta = self._coverage_of_ids(cursor, data_ids, sign=-1)
             cursor.execute(sql, tuple(data_ids))
+            deleted = cursor.rowcount
+            self._record_row_delta(cursor, -deleted)
+            if deleted:
+                self._record_coverage(cursor, coverage_delta)
             conn.commit()
+            self._after_write()
             
-            return cursor.rowcount
+            return deleted
             
         finally:
             conn.close()
     
     # ========== 批量导入 ==========
     
-    def batch_import(self, data_list: List[Dict], created_by: str) -> Dict:
+    def batch_import(
+        self,
+        data_list: List[Dict],
+        created_by: str,
+        chunk_size: Optional[int] = None,
+        row_numbers: Optional[List[int]] = None
+    ) -> Dict:
         """
         批量导入数据（带重复检查）
         
+        先完成重复检查并准备好全部行，再交给 BulkWriter 按块多行写入、逐块提交；
+        某块出错时只有该块逐行重试，其余块不受影响。
+        
+        Args:
+            data_list: 行数据列表
+            created_by: 导入者
+            chunk_size: 每块行数，默认 settings.IMPORT_CHUNK_SIZE
+            row_numbers: 各行在文件中的行号（用于错误信息，文件内去重后行号不再连续），默认从1编号
+        
         Returns:
             导入统计信息
         """
         conn = self.get_connection()
         
-        success_count = 0
         duplicate_count = 0
         failed_count = 0
         errors = []
         
         try:
             cursor = conn.cursor()
-            self._ensure_table_exists(cursor)
+            self._ensure_table_exists()
+            has_search_column = self._has_search_column()
+            has_fingerprint_column = self._has_fingerprint_column()
+            has_coverage_column = self._has_coverage_column()
+            fields = self._coverage_fields()
+            # 各行的字段非空标记（按行号），写入成功的行在提交前累加到覆盖率统计
+            filled_flags = {}
+            
+            # 类型检查：值无法写入列类型的行直接记为失败
+            valid_rows = []
+            for idx, data in zip(row_numbers or range(1, len(data_list) + 1), data_list):
+                try:
+                    self._normalize_values(data)
+                except ValueError as e:
+                    failed_count += 1
+                    errors.append(f"第{idx}行: {str(e)}")
+                    continue
+                valid_rows.append((idx, data))
+            
+            # 有指纹列时：先计算全部指纹，按批 IN 探测已存在的指纹，不再逐行扫描全表
+            seen_fingerprints = set()
+            if has_fingerprint_column:
+                for _, data in valid_rows:
+                    data[FINGERPRINT_COLUMN] = self._fingerprint(data)
+                seen_fingerprints = find_existing(
+                    cursor, self.table_name, [data[FINGERPRINT_COLUMN] for _, data in valid_rows]
+                )
             
-            for idx, data in enumerate(data_list, start=1):
+            rows = []
+            for idx, data in valid_rows:
                 try:
-                    # 检查重复
-                    if self._check_duplicate(conn, data):
+                    # 检查重复（与数据库中已有数据以及本批之前的行比较）
+                    if has_fingerprint_column:
+                        if data[FINGERPRINT_COLUMN] in seen_fingerprints:
+                            duplicate_count += 1
+                            continue
+                        seen_fingerprints.add(data[FINGERPRINT_COLUMN])
+                    elif self._check_duplicate(conn, data):
                         duplicate_count += 1
                         continue
                     
+                    # 覆盖率：本行的非空字段数
+                    filled_flags[idx] = row_filled_flags(data, fields)
+                    if has_coverage_column:
+                        data[COVERAGE_COLUMN] = sum(filled_flags[idx])
+                    
                     # 添加审计字段
                     data['created_by'] = created_by
                     data['updated_by'] = created_by
-                    
-                    # 构建INSERT语句
-                    columns = list(data.keys())
-                    placeholders = ', '.join(['%s'] * len(columns))
-                    columns_str = ', '.join([f'`{self._escape_field_name(col)}`' for col in columns])
-                    
-                    sql = f"INSERT INTO {self.table_name} ({columns_str}) VALUES ({placeholders})"
-                    values = tuple(data.values())
-                    
-                    cursor.execute(sql, values)
-                    success_count += 1
+                    rows.append((idx, data))
                     
                 except Exception as e:
                     failed_count += 1
                     errors.append(f"第{idx}行: {str(e)}")
             
-            conn.commit()
+            def before_commit(cursor, written_rows):
+                # 检索文本在MySQL中按写入后的列值计算
+                if has_search_column:
+                    self._fill_search_text(cursor, written_rows, search_after_id)
+                self._record_row_delta(cursor, len(written_rows))
+                coverage_delta = CoverageDelta()
+                for idx, _ in written_rows:
+                    coverage_delta.add_flags(filled_flags[idx], fields)
+                self._record_coverage(cursor, coverage_delta)
+            
+            # 重复检查只读，结束只读事务后开始分块写入（加宽列的 ALTER TABLE 也需在写事务之外）
+            conn.rollback()
+            self._ensure_text_capacity(cursor, self._text_lengths(data for _, data in rows))
+            search_after_id = 0
+            if has_search_column and not has_fingerprint_column:
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM {self.table_name}")
+                search_after_id = cursor.fetchone()['max_id']
+            written = BulkWriter(self.table_name, chunk_size).write(conn, rows, before_commit=before_commit)
             
             return {
-                "success": success_count,
-                "duplicates": duplicate_count,
-                "failed": failed_count,
+                "success": written["success"],
+                "duplicates": duplicate_count + written["duplicates"],
+                "failed": failed_count + written["failed"],
                 "total": len(data_list),
-                "errors": errors[:10]  # 最多返回10条错误
+                "errors": (errors + written["errors"])[:10]  # 最多返回10条错误
             }
             
         except Exception as e:
@@ -429,6 +894,198 @@ class BaseExperimentalDataService:
             raise Exception(f"批量导入失败: {str(e)}")
         finally:
             conn.close()
+            # 按块提交：即使中途失败，已提交的块也需要使缓存失效
+            self._after_write()
+    
+    def stream_import(
+        self,
+        chunks: Iterable,
+        created_by: str,
+        on_chunk: Optional[Callable[[Dict], None]] = None,
+        resume: Optional[Dict] = None
+    ) -> Dict:
+        """
+        分块导入（流式读取的文件，见 upload_reader）
+        
+        每块依次剔除文件内重复（与之前各块比较）、按列把非字符串类型字段中的空值标记
+        转换为NULL（见 utils.null_values），再按写入块（settings.IMPORT_CHUNK_SIZE 行，
+        即 BulkWriter 一次提交的行数）转换为字典列表并调用 batch_import，
+        内存中只保留当前块和已出现行的哈希。
+        
+        Args:
+            chunks: DataFrame 块序列，索引为数据行在文件中的序号（从0开始）
+            created_by: 导入者
+            on_chunk: 每个写入块提交后调用 on_chunk(累计统计)，可抛出异常中止导入（已提交的块保留）；
+                累计统计可作为检查点传给 resume（total 为已处理到的文件行数，之前的行都已提交）
+            resume: 上次中断时的检查点：前 resume["total"] 行已提交，只参与文件内去重，
+                不再写入；成功/重复/失败数从检查点继续累计
+        
+        Returns:
+            导入统计信息（total 为文件总行数，file_duplicates 为文件内重复行数）
+        """
+        deduper = FileDeduper(self.settings.NULL_VALUES)
+        result = {"success": 0, "duplicates": 0, "failed": 0, "total": 0, "file_duplicates": 0, "errors": []}
+        skip_rows = 0
+        if resume:
+            skip_rows = int(resume.get("total") or 0)
+            for key in ("success", "duplicates", "failed"):
+                result[key] = int(resume.get(key) or 0)
+            result["errors"] = list(resume.get("errors") or [])
+        
+        # 检查点按写入块保存：续传时最多重放中断时的一个写入块（见 import_tasks）
+        batch_rows = max(1, self.settings.IMPORT_CHUNK_SIZE)
+        
+        def checkpoint(rows: int):
+            result["total"] = rows
+            result["file_duplicates"] = deduper.duplicates
+            if on_chunk:
+                on_chunk(result)
+        
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            chunk_end = int(chunk.index[-1]) + 1
+            if skip_rows:
+                # 检查点之前的行已提交，只用于重建文件内去重的哈希集合
+                committed = chunk.index < skip_rows
+                deduper.filter(chunk[committed])
+                chunk = chunk[~committed]
+                if chunk.empty:
+                    result["total"] = chunk_end
+                    continue
+            chunk, _ = deduper.filter(chunk)
+            typed_columns = self.typed_fields.intersection(chunk.columns)
+            if typed_columns and not chunk.empty:
+                chunk = clean_frame(chunk, self.null_tokens, columns=typed_columns, strip_text=False)
+            for start in range(0, len(chunk), batch_rows):
+                batch = chunk.iloc[start:start + batch_rows]
+                batch_result = self.batch_import(
+                    dataframe_to_records(batch),
+                    created_by,
+                    chunk_size=batch_rows,
+                    row_numbers=(batch.index + 1).tolist()
+                )
+                for key in ("success", "duplicates", "failed"):
+                    result[key] += batch_result[key]
+                result["errors"].extend(batch_result["errors"][:10 - len(result["errors"])])
+                checkpoint(int(batch.index[-1]) + 1)
+            # 块末尾的文件内重复行
+            if result["total"] < chunk_end:
+                checkpoint(chunk_end)
+        
+        result["file_duplicates"] = deduper.duplicates
+        result["errors"] = result["errors"][:10]  # 最多返回10条错误
+        return result
+    
+    def bulk_load_import(
+        self,
+        chunks: Iterable,
+        created_by: str,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        LOAD DATA 快速导入（见 load_data 模块；调用方需先用 load_data_unavailable 检查前提）
+        
+        Args:
+            chunks: DataFrame 块序列（CSV，列与数据集字段完全一致）
+            created_by: 导入者
+            on_progress: 进度变化时调用 on_progress(累计统计)，可抛出异常中止导入
+        
+        Returns:
+            导入统计信息（与 stream_import 相同的字段，另有 engine）
+        """
+        self._ensure_table_exists()
+        importer = LoadDataImporter(
+            self.table_name,
+            self.metadata.get_all_field_names(),
+            self.settings.NULL_VALUES,
+            has_search_column=self._has_search_column(),
+            coverage_fields=self._coverage_fields(),
+            has_coverage_column=self._has_coverage_column(),
+            field_types=self.typed_field_types
+        )
+        
+        def before_load(max_lengths):
+            conn = self.get_connection()
+            try:
+                self._ensure_text_capacity(conn.cursor(), max_lengths)
+            finally:
+                conn.close()
+        
+        def before_commit(cursor, count, coverage_delta):
+            self._record_row_delta(cursor, count)
+            self._record_coverage(cursor, coverage_delta)
+        
+        try:
+            return importer.run(
+                chunks, created_by,
+                before_load=before_load, before_commit=before_commit, on_progress=on_progress
+            )
+        finally:
+            # 按段提交：即使中途失败，已提交的段也需要使缓存失效
+            self._after_write()
+    
+    # ========== 替换导入（影子表） ==========
+    
+    def shadow_table_name(self, tag: str) -> str:
+        """替换导入使用的影子表名（tag 区分不同任务，表名不超过64字符）"""
+        return f"{self.live_table_name[:40]}__shadow_{tag[:12]}"
+    
+    def create_shadow_table(self, shadow_table: str):
+        """按数据表结构（含全部索引）创建空的影子表，已存在的同名表先删除"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self._ensure_table_exists()
+            cursor.execute(f"DROP TABLE IF EXISTS `{shadow_table}`")
+            cursor.execute(f"CREATE TABLE `{shadow_table}` LIKE `{self.live_table_name}`")
+            conn.commit()
+        finally:
+            conn.close()
+        schema_registry.invalidate(shadow_table)
+    
+    def drop_shadow_table(self, shadow_table: str):
+        """删除影子表（替换导入取消或失败时）"""
+        conn = self.get_connection()
+        try:
+            conn.cursor().execute(f"DROP TABLE IF EXISTS `{shadow_table}`")
+            conn.commit()
+        finally:
+            conn.close()
+        schema_registry.invalidate(shadow_table)
+    
+    def use_shadow_table(self, shadow_table: str):
+        """之后的读写都作用于影子表，不维护数据集行数统计、不使缓存失效（影子表对读者不可见）"""
+        self.table_name = shadow_table
+        self.is_shadow = True
+    
+    def swap_shadow_table(self, shadow_table: str):
+        """
+        用影子表原子替换数据表
+        
+        单条 RENAME TABLE 同时完成两次改名，读者要么看到旧表、要么看到新表；
+        之后删除旧表，并重置行数、覆盖率统计（下次读取时重新统计）。
+        """
+        old_table = f"{self.live_table_name[:40]}__old_{shadow_table[-12:]}"
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS `{old_table}`")
+            cursor.execute(
+                f"RENAME TABLE `{self.live_table_name}` TO `{old_table}`, "
+                f"`{shadow_table}` TO `{self.live_table_name}`"
+            )
+            cursor.execute(f"DROP TABLE `{old_table}`")
+            row_counter.reset(cursor, self.dataset_id)
+            coverage_state.reset(cursor, self.dataset_id)
+            conn.commit()
+        finally:
+            conn.close()
+        for table in (self.live_table_name, shadow_table, old_table):
+            schema_registry.invalidate(table)
+        self.table_name = self.live_table_name
+        self.is_shadow = False
+        self._after_write()
     
     def get_table_columns(self) -> List[str]:
         """获取表的所有列名（从元数据）"""
@@ -0,0 +1,120 @@
+"""批量写入 - 多行INSERT分块写入，按块提交并隔离错误
+
+原批量导入对每一行重新拼接列名、占位符和INSERT语句并单独执行一次，
+10万行就是10万次网络往返。本模块：
+
+- 按列签名（列名及顺序）把行分组，同组的行共用一条INSERT语句
+- 每组按 chunk_size 分块，每块一次 executemany（PyMySQL 会把
+  INSERT ... VALUES 改写为多行 VALUES (...),(...) 一次发送）
+- 每块单独提交；某块失败时只回滚该块并逐行重试，定位出错的行，
+  其余块不受影响
+
+块大小由 settings.IMPORT_CHUNK_SIZE 控制。PyMySQL 会按 max_stmt_length
+（默认1MB）自动拆分过长的语句，不会超出 max_allowed_packet。
+
+使用示例：
+    writer = BulkWriter(table_name)
+    result = writer.write(conn, rows, before_commit=lambda cursor, written: ...)
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pymysql
+
+from backend.config import Settings
+from backend.services.experimental.fingerprint import is_duplicate_key_error
+from backend.utils.logger import get_logger
+from backend.utils.schema_registry import quote_column
+
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# 返回的错误信息条数上限
+MAX_ERRORS = 10
+
+
+class BulkWriter:
+    """多行INSERT批量写入"""
+
+    def __init__(self, table_name: str, chunk_size: Optional[int] = None):
+        """
+        Args:
+            table_name: 数据表名
+            chunk_size: 每块行数（每块一次提交），默认 settings.IMPORT_CHUNK_SIZE
+        """
+        self.table_name = table_name
+        self.chunk_size = max(1, chunk_size or settings.IMPORT_CHUNK_SIZE)
+
+    def insert_sql(self, columns: Tuple[str, ...]) -> str:
+        """生成单行INSERT语句（executemany 会改写为多行VALUES）"""
+        columns_str = ", ".join(quote_column(column) for column in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        return f"INSERT INTO `{self.table_name}` ({columns_str}) VALUES ({placeholders})"
+
+    @staticmethod
+    def group_by_signature(rows: List[Tuple[int, Dict]]) -> "OrderedDict[Tuple[str, ...], List[Tuple[int, Dict]]]":
+        """按列签名分组（保持各组内的行顺序）"""
+        groups: "OrderedDict[Tuple[str, ...], List[Tuple[int, Dict]]]" = OrderedDict()
+        for idx, data in rows:
+            groups.setdefault(tuple(data.keys()), []).append((idx, data))
+        return groups
+
+    def write(
+        self,
+        conn,
+        rows: List[Tuple[int, Dict]],
+        before_commit: Optional[Callable] = None
+    ) -> Dict:
+        """
+        分块写入
+
+        Args:
+            conn: 数据库连接（本方法按块提交）
+            rows: (行号, 行数据) 列表，行号用于错误信息
+            before_commit: 每块提交前调用 before_commit(cursor, 本块写入的 (行号, 行数据) 列表)，
+                与本块数据在同一事务内（用于维护行数、覆盖率统计）
+
+        Returns:
+            {"success", "duplicates", "failed", "errors", "chunks"}
+        """
+        result = {"success": 0, "duplicates": 0, "failed": 0, "errors": [], "chunks": 0}
+        cursor = conn.cursor()
+
+        for columns, group in self.group_by_signature(rows).items():
+            sql = self.insert_sql(columns)
+            for start in range(0, len(group), self.chunk_size):
+                chunk = group[start:start + self.chunk_size]
+                result["chunks"] += 1
+                try:
+                    cursor.executemany(sql, [tuple(data.values()) for _, data in chunk])
+                    if before_commit:
+                        before_commit(cursor, chunk)
+                    conn.commit()
+                    result["success"] += len(chunk)
+                except pymysql.MySQLError as e:
+                    conn.rollback()
+                    logger.warning(f"⚠ {self.table_name}: 第{chunk[0][0]}行起的块写入失败，逐行重试: {e}")
+                    self._write_rows(conn, cursor, sql, chunk, before_commit, result)
+
+        return result
+
+    def _write_rows(self, conn, cursor, sql: str, chunk: List[Tuple[int, Dict]],
+                    before_commit: Optional[Callable], result: Dict):
+        """逐行写入一个失败的块（整块一次提交），记录重复和出错的行"""
+        inserted = []
+        for idx, data in chunk:
+            try:
+                cursor.execute(sql, tuple(data.values()))
+                inserted.append((idx, data))
+            except pymysql.MySQLError as e:
+                if is_duplicate_key_error(e):
+                    result["duplicates"] += 1
+                else:
+                    result["failed"] += 1
+                    if len(result["errors"]) < MAX_ERRORS:
+                        result["errors"].append(f"第{idx}行: {str(e)}")
+        if before_commit and inserted:
+            before_commit(cursor, inserted)
+        conn.commit()
+        result["success"] += len(inserted)
@@ -0,0 +1,198 @@
+"""行数统计服务 - 维护数据集总行数，缓存过滤条件的计数结果
+
+列表/搜索每次翻页都执行 SELECT COUNT(*) 在大表上相当于一次全表扫描。
+本服务提供三种计数方式：
+- 数据集总行数：保存在 sys_dataset_stats 表中，由写操作在同一事务内增减，
+  读取只需一次主键查询（首次使用时执行一次 COUNT(*) 初始化）；
+  重建持有统计行的行锁，与写操作的增减互斥，不会丢失重建期间提交的增量
+- 过滤/搜索条件计数：进程内LRU缓存，任意写操作后按数据集失效
+- 估算计数：使用 EXPLAIN 的行数估计，不扫描数据
+
+计数模式（count 参数）：
+- exact: 精确计数（默认，兼容旧接口）
+- estimate: 无过滤条件时返回精确总数，有过滤条件时优先使用缓存，否则返回估算值
+- none: 不计数，只返回当前页
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from backend.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+COUNT_MODES = ("exact", "estimate", "none")
+
+STATS_TABLE = "sys_dataset_stats"
+
+STATS_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS `{STATS_TABLE}` (
+        dataset_id VARCHAR(100) PRIMARY KEY COMMENT '数据集ID',
+        row_count BIGINT NOT NULL DEFAULT 0 COMMENT '数据行数',
+        updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间'
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='数据集统计表'
+"""
+
+# 无过滤条件时的WHERE子句
+NO_FILTER = "1=1"
+
+
+class FilterCountCache:
+    """过滤条件计数缓存（LRU + TTL，按数据集失效）"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[int, float]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: Tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            count, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return count
+
+    def put(self, key: Tuple, count: int):
+        with self._lock:
+            self._entries[key] = (count, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dataset_id: str):
+        """移除指定数据集的全部缓存（键的第一个元素为数据集ID）"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id]:
+                del self._entries[key]
+
+
+class RowCounter:
+    """数据集行数统计"""
+
+    def __init__(self):
+        self.filter_cache = FilterCountCache()
+
+    @staticmethod
+    def ensure_stats_table(cursor):
+        """创建统计表（已存在时不做任何修改）"""
+        cursor.execute(STATS_TABLE_DDL)
+
+    def get_total(self, cursor, dataset_id: str, table_name: str) -> int:
+        """获取数据集总行数（未初始化时执行一次COUNT(*)并保存）"""
+        cursor.execute(f"SELECT row_count FROM `{STATS_TABLE}` WHERE dataset_id = %s", (dataset_id,))
+        row = cursor.fetchone()
+        if row is not None:
+            return int(row['row_count'])
+        return self.rebuild(cursor, dataset_id, table_name)
+
+    def rebuild(self, cursor, dataset_id: str, table_name: str) -> int:
+        """
+        重新统计数据集总行数（初始化或修复偏差），结果立即提交
+
+        先锁定统计行（不存在时插入）再计数：之前的写操作已提交且计入计数，
+        之后的写操作在 adjust 处等待重建提交后再累加，重建期间的增量不会丢失。
+        """
+        # 结束调用方的读事务，计数的一致性快照在取得行锁之后建立
+        cursor.connection.commit()
+        cursor.execute(
+            f"""
+            INSERT INTO `{STATS_TABLE}` (dataset_id, row_count) VALUES (%s, 0)
+            ON DUPLICATE KEY UPDATE row_count = row_count
+            """,
+            (dataset_id,)
+        )
+        cursor.execute(f"SELECT COUNT(*) AS total FROM `{table_name}`")
+        total = int(cursor.fetchone()['total'])
+        cursor.execute(
+            f"UPDATE `{STATS_TABLE}` SET row_count = %s WHERE dataset_id = %s",
+            (total, dataset_id)
+        )
+        cursor.connection.commit()
+        logger.info(f"✓ 数据集 {dataset_id} 行数统计已初始化: {total}")
+        return total
+
+    def adjust(self, cursor, dataset_id: str, delta: int):
+        """
+        在调用方事务内增减总行数（需由调用方提交）
+
+        UPDATE 持有统计行的行锁直到调用方提交，与 rebuild 互斥。
+        统计尚未初始化时不做处理，首次读取时会重新计数。
+        """
+        if delta:
+            cursor.execute(
+                f"UPDATE `{STATS_TABLE}` SET row_count = GREATEST(row_count + %s, 0) WHERE dataset_id = %s",
+                (delta, dataset_id)
+            )
+
+    def reset(self, cursor, dataset_id: str):
+        """删除统计记录（数据集表被整体替换时使用），下次读取时重新计数"""
+        cursor.execute(f"DELETE FROM `{STATS_TABLE}` WHERE dataset_id = %s", (dataset_id,))
+
+    def estimate(self, cursor, table_name: str, where_sql: str, params: List) -> int:
+        """使用EXPLAIN估算满足条件的行数（不扫描数据）"""
+        cursor.execute(f"EXPLAIN SELECT 1 FROM `{table_name}` WHERE {where_sql}", tuple(params))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+        estimated = rows[0].get('rows') or 0
+        filtered = rows[0].get('filtered') or 100
+        return int(estimated * float(filtered) / 100)
+
+    def count(
+        self,
+        cursor,
+        dataset_id: str,
+        table_name: str,
+        where_sql: str = NO_FILTER,
+        params: Optional[List] = None,
+        mode: str = "exact"
+    ) -> Optional[int]:
+        """
+        按计数模式获取满足条件的行数
+
+        Args:
+            cursor: 数据库游标
+            dataset_id: 数据集ID
+            table_name: 表名
+            where_sql: WHERE子句（参数化）
+            params: WHERE子句参数
+            mode: exact / estimate / none
+
+        Returns:
+            行数；mode为none时返回None
+        """
+        if mode == "none":
+            return None
+
+        params = list(params or [])
+        if where_sql == NO_FILTER:
+            return self.get_total(cursor, dataset_id, table_name)
+
+        key = (dataset_id, where_sql, tuple(str(p) for p in params))
+        cached = self.filter_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if mode == "estimate":
+            return self.estimate(cursor, table_name, where_sql, params)
+
+        cursor.execute(f"SELECT COUNT(*) AS total FROM `{table_name}` WHERE {where_sql}", tuple(params))
+        total = int(cursor.fetchone()['total'])
+        self.filter_cache.put(key, total)
+        return total
+
+    def invalidate(self, dataset_id: str):
+        """写操作提交后调用，使过滤条件计数缓存失效"""
+        self.filter_cache.invalidate(dataset_id)
+
+
+# 进程级单例
+row_counter = RowCounter()
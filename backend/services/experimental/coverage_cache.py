@@ -0,0 +1,246 @@
+"""覆盖率结果缓存 - 按数据版本失效、并发请求合并计算、过期后先返回旧结果再后台刷新
+
+覆盖率概览页和 /coverage/all 每次加载都会重新计算各数据集的覆盖率，多个用户同时打开时
+各自执行一遍相同的查询。本模块为每个数据集缓存最近一次的计算结果：
+
+- 缓存的结果带计算时的数据版本（response_cache.data_versions，写操作提交后递增）；
+  版本未变且未超过 settings.COVERAGE_CACHE_TTL 秒时直接返回（其他进程的写入无法通知
+  本进程，由 TTL 兜底）
+- 合并计算（single-flight）：同一数据集同一版本同时只有一个计算，其余请求等待同一结果
+- 陈旧时先返回（stale-while-revalidate）：版本已变或超过 TTL、但未超过
+  settings.COVERAGE_CACHE_MAX_STALE 秒的结果立即返回，同时在后台线程池刷新；
+  更旧的结果不再返回，由请求同步计算
+
+返回的结果是缓存的浅拷贝，附带缓存字段：
+cache_status（hit / stale / miss / shared）、stale、cache_age_seconds、computed_at、data_version。
+
+使用示例：
+    from backend.services.experimental.coverage_cache import coverage_cache
+
+    result = coverage_cache.lookup(dataset_id, compute)     # 不阻塞，未缓存时返回None
+    result = coverage_cache.get(dataset_id, compute)        # 阻塞，未缓存时计算
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from backend.config import Settings
+from backend.utils.logger import get_logger
+from backend.utils.response_cache import data_versions
+
+
+settings = Settings()
+logger = get_logger(__name__)
+
+STATUS_HIT = "hit"          # 新鲜的缓存结果
+STATUS_STALE = "stale"      # 陈旧的缓存结果（已在后台刷新）
+STATUS_MISS = "miss"        # 本请求计算的结果
+STATUS_SHARED = "shared"    # 等待其他请求正在进行的计算
+
+
+class CoverageEntry:
+    """缓存条目：一个数据集某个数据版本的覆盖率结果"""
+
+    __slots__ = ("version", "result", "computed_at", "computed_mono")
+
+    def __init__(self, version: int, result: Dict):
+        self.version = version
+        self.result = result
+        self.computed_at = datetime.now().isoformat(timespec="seconds")
+        self.computed_mono = time.monotonic()
+
+
+class CoverageCache:
+    """覆盖率结果缓存（线程安全，每个数据集保留最近一次结果）"""
+
+    def __init__(self, ttl_seconds: float, max_stale_seconds: float, refresh_workers: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.refresh_workers = max(1, refresh_workers)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CoverageEntry] = {}
+        # (数据集ID, 数据版本) -> 正在进行的计算
+        self._inflight: Dict[Tuple[str, int], Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.refresh_workers, thread_name_prefix="coverage-refresh"
+                )
+            return self._executor
+
+    @staticmethod
+    def _serve(entry: CoverageEntry, status: str) -> Dict:
+        """结果的浅拷贝，附带缓存字段（调用方可以在拷贝上添加提示信息）"""
+        result = dict(entry.result)
+        result.update({
+            "cache_status": status,
+            "stale": status == STATUS_STALE,
+            "cache_age_seconds": round(time.monotonic() - entry.computed_mono, 1),
+            "computed_at": entry.computed_at,
+            "data_version": entry.version
+        })
+        return result
+
+    def _claim(self, key: Tuple[str, int]) -> Tuple[Future, bool]:
+        """加入正在进行的计算，没有时登记一个新的（需持有 _lock）；返回 (Future, 是否由调用方计算)"""
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        return future, True
+
+    def _run(self, key: Tuple[str, int], future: Future, compute: Callable[[], Dict]):
+        """执行计算并写入缓存，结果（或异常）交给所有等待者"""
+        dataset_id, version = key
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        entry = CoverageEntry(version, result)
+        with self._lock:
+            current = self._entries.get(dataset_id)
+            # 计算期间可能已有更新版本的结果写入，不用旧版本覆盖
+            if current is None or current.version <= version:
+                self._entries[dataset_id] = entry
+            self._inflight.pop(key, None)
+        future.set_result(entry)
+
+    def _refresh(self, key: Tuple[str, int], future: Future, compute: Callable[[], Dict]):
+        """后台刷新（失败只记录日志，下次请求重试）"""
+        self._run(key, future, compute)
+        if future.exception() is not None:
+            logger.warning(f"⚠ 后台刷新 {key[0]} 覆盖率失败: {future.exception()}")
+
+    def lookup(self, dataset_id: str, compute: Callable[[], Dict]) -> Optional[Dict]:
+        """
+        不阻塞地读取缓存（可在事件循环中调用）
+
+        新鲜的结果直接返回；陈旧但未超过 max_stale_seconds 的结果返回的同时提交后台刷新。
+
+        Args:
+            compute: 计算覆盖率的阻塞函数（后台刷新时调用）
+
+        Returns:
+            带缓存字段的结果；没有可用的缓存时返回None
+        """
+        version = data_versions.get(dataset_id)
+        refresh = None
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None:
+                return None
+            age = time.monotonic() - entry.computed_mono
+            if entry.version == version and age <= self.ttl_seconds:
+                self.hits += 1
+                return self._serve(entry, STATUS_HIT)
+            if age > self.max_stale_seconds:
+                return None
+            self.stale_hits += 1
+            key = (dataset_id, version)
+            future, leader = self._claim(key)
+            if leader:
+                self.refreshes += 1
+                refresh = (key, future)
+            served = self._serve(entry, STATUS_STALE)
+        if refresh is not None:
+            self._get_executor().submit(self._refresh, refresh[0], refresh[1], compute)
+        return served
+
+    def get(self, dataset_id: str, compute: Callable[[], Dict], refresh: bool = False) -> Dict:
+        """
+        读取覆盖率结果（阻塞调用）
+
+        先按 lookup 读取缓存；没有可用的缓存或 refresh=True 时计算，
+        同一版本正在计算时等待该计算的结果。
+
+        Args:
+            compute: 计算覆盖率的阻塞函数
+            refresh: 忽略缓存，等待按当前数据版本计算的结果
+
+        Returns:
+            带缓存字段的结果
+
+        Raises:
+            compute 抛出的异常（所有等待同一计算的请求都会收到）
+        """
+        if not refresh:
+            cached = self.lookup(dataset_id, compute)
+            if cached is not None:
+                return cached
+        key = (dataset_id, data_versions.get(dataset_id))
+        with self._lock:
+            future, leader = self._claim(key)
+            if leader:
+                self.misses += 1
+            else:
+                self.shared += 1
+        if leader:
+            self._run(key, future, compute)
+        entry = future.result()
+        return self._serve(entry, STATUS_MISS if leader else STATUS_SHARED)
+
+    def invalidate(self, dataset_id: Optional[str] = None) -> int:
+        """
+        删除缓存的结果（正在进行的计算不受影响）
+
+        Args:
+            dataset_id: 指定数据集，None则清空全部
+
+        Returns:
+            删除的条目数
+        """
+        with self._lock:
+            keys = [k for k in self._entries if dataset_id is None or k == dataset_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "max_stale_seconds": self.max_stale_seconds,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "inflight": len(self._inflight),
+                "datasets": {
+                    dataset_id: {
+                        "version": entry.version,
+                        "current_version": data_versions.get(dataset_id),
+                        "age_seconds": round(now - entry.computed_mono, 1),
+                        "computed_at": entry.computed_at
+                    }
+                    for dataset_id, entry in self._entries.items()
+                }
+            }
+
+
+# 进程级单例
+coverage_cache = CoverageCache(
+    ttl_seconds=settings.COVERAGE_CACHE_TTL,
+    max_stale_seconds=settings.COVERAGE_CACHE_MAX_STALE,
+    refresh_workers=settings.COVERAGE_CACHE_REFRESH_WORKERS
+)
@@ -1,11 +1,35 @@
-"""覆盖率计算服务 - 基于元数据，零硬编码"""
-import pymysql
-from typing import Dict, List
+"""覆盖率计算服务 - 基于元数据，零硬编码
+
+覆盖率统计由写操作增量维护（见 coverage_state）：读取时只需查询按非空字段数分组的
+记录数和各字段的非空数（O(字段数)），记录覆盖率、分布、综合覆盖率和字段覆盖率都由
+这几十行统计算出。汇总只返回低覆盖率记录数，记录本身由 list_low_coverage_records
+按每行的非空字段数列走索引分页读取（LIMIT/OFFSET，每页只读 page_size 行）。
+统计尚未初始化时首次读取执行一次聚合查询（coverage_histogram）重建。
+
+单个数据集的结果经 coverage_cache 缓存（按数据版本失效、并发请求合并计算、
+过期后先返回旧结果再后台刷新），见 dataset_coverage。
+所有数据集的汇总（calculate_all_datasets_coverage）在有界线程池中并行计算未缓存的数据集，
+按各数据集的精确单元格数累加总体覆盖率。
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
 from backend.models.experimental.metadata import DatasetMetadata
 from backend.config import Settings
+from backend.services.experimental.coverage_cache import coverage_cache
+from backend.services.experimental.coverage_state import (
+    FILLED_ALIAS, coverage_fields, coverage_state, fetch_low_coverage_rows, row_coverage
+)
+from backend.utils.db_pool import get_connection
+from backend.utils.logger import get_logger
+from backend.utils.null_values import NULL_TOKENS, is_null_value
+from backend.utils.schema_registry import schema_registry
 
 
 settings = Settings()
+logger = get_logger(__name__)
 
 
 class CoverageService:
@@ -28,26 +52,12 @@ class CoverageService:
         self.threshold = self.metadata.get_coverage_threshold()
     
     def get_connection(self):
-        """获取数据库连接"""
-        return pymysql.connect(
-            host=self.settings.MYSQL_HOST,
-            port=self.settings.MYSQL_PORT,
-            user=self.settings.MYSQL_USER,
-            password=self.settings.MYSQL_PASSWORD,
-            database=self.settings.MYSQL_DATABASE,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        """从进程级连接池借出数据库连接（close() 即归还）"""
+        return get_connection()
     
     def is_empty_value(self, value) -> bool:
-        """判断值是否为空"""
-        if value is None:
-            return True
-        if isinstance(value, str):
-            value_stripped = value.strip()
-            if value_stripped == '' or value_stripped in self.settings.NULL_VALUES:
-                return True
-        return False
+        """判断值是否为空（见 utils.null_values）"""
+        return is_null_value(value, NULL_TOKENS)
     
     def calculate_row_coverage(self, row: Dict) -> float:
         """
@@ -72,28 +82,34 @@ class CoverageService:
         
         return round((non_empty_fields / total_fields) * 100, 2)
     
+    def _is_low(self, filled: int, total_fields: int) -> bool:
+        """非空字段数为 filled 的记录是否低于覆盖率阈值"""
+        return row_coverage(filled, total_fields) < self.threshold * 100
+    
     def calculate_batch_coverage(self) -> Dict:
         """
-        计算数据集的覆盖率统计
+        计算数据集的覆盖率统计（只读取增量维护的统计）
+        
+        低覆盖率记录只返回条数 low_coverage_count，记录本身分页读取（见 list_low_coverage_records）。
         
         Returns:
-            包含综合覆盖率、平均覆盖率、分布情况等信息的字典
+            包含综合覆盖率、分布情况、低覆盖率记录数等信息的字典
         """
         conn = self.get_connection()
         
         try:
             cursor = conn.cursor()
             
-            # 查询所有数据
-            sql = f"SELECT * FROM {self.table_name}"
-            cursor.execute(sql)
-            rows = cursor.fetchall()
+            fields = coverage_fields(self.metadata, self.table_name)
+            histogram, field_counts = coverage_state.get(cursor, self.dataset_id, self.table_name, fields)
+            total_records = sum(histogram.values())
             
-            if not rows:
+            if not total_records:
                 return {
                     "dataset_id": self.dataset_id,
                     "display_name": self.metadata.get_display_name(),
                     "total_records": 0,
+                    "total_fields": len(fields),
                     "comprehensive_coverage": 0.0,
                     "coverage_distribution": {
                         "90-100%": 0,
@@ -107,89 +123,34 @@ class CoverageService:
                         "10-20%": 0,
                         "0-10%": 0
                     },
-                    "low_coverage_records": [],
-                    "field_coverage": {},
+                    "low_coverage_count": 0,
+                    "field_coverage": {field: 0.0 for field in fields},
+                    "total_cells": 0,
+                    "non_empty_cells": 0,
+                    "threshold": self.threshold * 100,
                     "meets_threshold": False
                 }
             
-            total_records = len(rows)
-            total_cells = 0
-            non_empty_cells = 0
-            
-            # 字段覆盖率统计
-            field_stats = {field: {"total": 0, "non_empty": 0} for field in self.data_fields}
-            
-            # 记录覆盖率统计
-            row_coverages = []
-            low_coverage_records = []
-            
-            # 覆盖率分布
-            distribution = {
-                "90-100%": 0, "80-90%": 0, "70-80%": 0, "60-70%": 0, "50-60%": 0,
-                "40-50%": 0, "30-40%": 0, "20-30%": 0, "10-20%": 0, "0-10%": 0
-            }
-            
-            for row in rows:
-                row_coverage = self.calculate_row_coverage(row)
-                row_coverages.append(row_coverage)
-                
-                # 分类统计（每10%一个区间）
-                if row_coverage >= 90:
-                    distribution["90-100%"] += 1
-                elif row_coverage >= 80:
-                    distribution["80-90%"] += 1
-                elif row_coverage >= 70:
-                    distribution["70-80%"] += 1
-                elif row_coverage >= 60:
-                    distribution["60-70%"] += 1
-                elif row_coverage >= 50:
-                    distribution["50-60%"] += 1
-                elif row_coverage >= 40:
-                    distribution["40-50%"] += 1
-                elif row_coverage >= 30:
-                    distribution["30-40%"] += 1
-                elif row_coverage >= 20:
-                    distribution["20-30%"] += 1
-                elif row_coverage >= 10:
-                    distribution["10-20%"] += 1
-                else:
-                    distribution["0-10%"] += 1
-                
-                # 记录低覆盖率的数据
-                if row_coverage < self.threshold * 100:
-                    # 获取标识字段（通常是'编号'）
-                    identifier = row.get('编号', row.get('id', 'N/A'))
-                    
-                    # 包含完整行数据，以便前端动态展示列
-                    record_data = {
-                        "id": row.get('id'),
-                        "identifier": identifier,
-                        "coverage": row_coverage,
-                        "full_data": row  # 包含原始数据
-                    }
-                    low_coverage_records.append(record_data)
-                
-                # 统计每个字段
-                for field in self.data_fields:
-                    if field in row:
-                        field_stats[field]["total"] += 1
-                        total_cells += 1
-                        
-                        if not self.is_empty_value(row[field]):
-                            field_stats[field]["non_empty"] += 1
-                            non_empty_cells += 1
-            
-            # 按覆盖率升序排序，取最低的20条
-            low_coverage_records.sort(key=lambda x: x['coverage'])
+            # 覆盖率分布（每10%一个区间，100%计入90-100%）：按非空字段数分组换算
+            counts = [0] * 10
+            low_coverage_count = 0
+            for filled, records in histogram.items():
+                coverage = row_coverage(filled, len(fields))
+                counts[min(int(coverage // 10), 9)] += records
+                if self._is_low(filled, len(fields)):
+                    low_coverage_count += records
+            distribution = {f"{i * 10}-{(i + 1) * 10}%": counts[i] for i in range(9, -1, -1)}
             
             # 计算综合覆盖率
+            total_cells = total_records * len(fields)
+            non_empty_cells = sum(filled * records for filled, records in histogram.items())
             comprehensive_coverage = round((non_empty_cells / total_cells) * 100, 2) if total_cells > 0 else 0.0
             
             # 计算每个字段的覆盖率
             field_coverage = {}
-            for field, stats in field_stats.items():
-                if stats["total"] > 0:
-                    field_coverage[field] = round((stats["non_empty"] / stats["total"]) * 100, 2)
+            for field in fields:
+                if field in field_counts:
+                    field_coverage[field] = round((field_counts[field] / total_records) * 100, 2)
                 else:
                     field_coverage[field] = 0.0
             
@@ -197,59 +158,150 @@ class CoverageService:
                 "dataset_id": self.dataset_id,
                 "display_name": self.metadata.get_display_name(),
                 "total_records": total_records,
-                "total_fields": len(self.data_fields),
+                "total_fields": len(fields),
                 "comprehensive_coverage": comprehensive_coverage,
                 "coverage_distribution": distribution,
-                "low_coverage_records": low_coverage_records,  # 返回所有低覆盖率记录
+                "low_coverage_count": low_coverage_count,  # 记录本身分页读取
                 "field_coverage": field_coverage,
+                "total_cells": total_cells,             # 记录数 × 参与计算的字段数
+                "non_empty_cells": non_empty_cells,
                 "threshold": self.threshold * 100,
                 "meets_threshold": comprehensive_coverage >= self.threshold * 100
             }
             
         finally:
             conn.close()
+    
+    def list_low_coverage_records(self, page: int = 1, page_size: int = 20,
+                                  full_data_fields: Optional[List[str]] = None) -> Tuple[List[Dict], int]:
+        """
+        分页读取低覆盖率记录（覆盖率最低的排在前面，同覆盖率按id升序）
+        
+        总数由统计直接得出（不执行 COUNT），每页只读取 page_size 行（见 fetch_low_coverage_rows）。
+        
+        Args:
+            page: 页码
+            page_size: 每页数量
+            full_data_fields: full_data 中返回的字段（字段投影），None为全部字段
+        
+        Returns:
+            (记录列表, 低覆盖率记录总数)
+        """
+        conn = self.get_connection()
+        
+        try:
+            cursor = conn.cursor()
+            
+            fields = coverage_fields(self.metadata, self.table_name)
+            histogram, _ = coverage_state.get(cursor, self.dataset_id, self.table_name, fields)
+            low_filled = [filled for filled, records in histogram.items()
+                          if records > 0 and self._is_low(filled, len(fields))]
+            total = sum(histogram[filled] for filled in low_filled)
+            offset = (page - 1) * page_size
+            if not low_filled or offset >= total:
+                return [], total
+            
+            public_columns = schema_registry.get_public_columns(self.table_name)
+            if full_data_fields:
+                wanted = set(["id", "编号"] + full_data_fields)
+                columns = [column for column in public_columns if column in wanted]
+            else:
+                columns = public_columns
+            rows = fetch_low_coverage_rows(
+                cursor, self.table_name, fields, columns, max(low_filled), limit=page_size, offset=offset
+            )
+            
+            records = []
+            for row in rows:
+                coverage = row_coverage(int(row.pop(FILLED_ALIAS)), len(fields))
+                records.append({
+                    "id": row.get('id'),
+                    # 标识字段（通常是'编号'）
+                    "identifier": row.get('编号', row.get('id', 'N/A')),
+                    "coverage": coverage,
+                    # 完整行数据，以便前端动态展示列（指定投影时只包含投影字段）
+                    "full_data": (
+                        {f: row.get(f) for f in full_data_fields} if full_data_fields else row
+                    )
+                })
+            return records, total
+            
+        finally:
+            conn.close()
 
 
-def calculate_all_datasets_coverage() -> Dict:
+def _dataset_coverage(dataset_id: str) -> Dict:
+    """计算单个数据集的覆盖率并记录耗时（缓存未命中时调用）"""
+    started = time.perf_counter()
+    result = CoverageService(dataset_id).calculate_batch_coverage()
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def cached_dataset_coverage(dataset_id: str) -> Optional[Dict]:
+    """不阻塞地读取缓存的覆盖率（见 coverage_cache.lookup），没有可用的缓存时返回None"""
+    return coverage_cache.lookup(dataset_id, partial(_dataset_coverage, dataset_id))
+
+
+def dataset_coverage(dataset_id: str, refresh: bool = False) -> Dict:
+    """
+    读取单个数据集的覆盖率（经 coverage_cache，阻塞调用）
+    
+    Args:
+        refresh: 忽略缓存重新计算
+    
+    Returns:
+        覆盖率统计，附带缓存字段（cache_status、stale、cache_age_seconds 等）
+    """
+    return coverage_cache.get(dataset_id, partial(_dataset_coverage, dataset_id), refresh=refresh)
+
+
+def calculate_all_datasets_coverage(max_workers: Optional[int] = None, refresh: bool = False) -> Dict:
     """
     计算所有数据集的覆盖率汇总
     
+    各数据集的结果经 coverage_cache 读取：可用的缓存直接使用，其余数据集在有界线程池中
+    并行计算（每个任务借出一个连接），总耗时取决于最慢的数据集；并发的汇总请求共享各数据集的计算。
+    总体覆盖率由各数据集的精确单元格数累加，不再由四舍五入后的百分比反推。
+    
+    Args:
+        max_workers: 并行计算的数据集数，默认 settings.COVERAGE_ALL_WORKERS
+        refresh: 忽略缓存重新计算所有数据集
+    
     Returns:
-        总体覆盖率和各数据集详情
+        总体覆盖率和各数据集详情（含各数据集耗时 elapsed_ms）；
+        stale 为是否有数据集使用了陈旧的缓存，cache_age_seconds 为最旧结果的缓存时长
     """
-    datasets = DatasetMetadata.list_all_datasets()
+    started = time.perf_counter()
+    dataset_ids = [dataset_info['id'] for dataset_info in DatasetMetadata.list_all_datasets()]
     
-    batches_data = []
-    total_records = 0
-    total_cells = 0
-    total_non_empty = 0
+    results: Dict[str, Dict] = {}
+    errors: Dict[str, str] = {}
+    if not refresh:
+        for dataset_id in dataset_ids:
+            cached = cached_dataset_coverage(dataset_id)
+            if cached is not None:
+                results[dataset_id] = cached
+    pending = [dataset_id for dataset_id in dataset_ids if dataset_id not in results]
     
-    for dataset_info in datasets:
-        dataset_id = dataset_info['id']
-        
-        try:
-            coverage_service = CoverageService(dataset_id)
-            batch_coverage = coverage_service.calculate_batch_coverage()
-            batches_data.append(batch_coverage)
-            
-            # 累计统计
-            records = batch_coverage["total_records"]
-            total_records += records
-            
-            if records > 0:
-                # 每批次的单元格数 = 记录数 * 字段数
-                metadata = DatasetMetadata(dataset_id)
-                fields_count = len(metadata.get_coverage_calculation_fields())
-                batch_cells = records * fields_count
-                batch_non_empty = int((batch_coverage["comprehensive_coverage"] / 100) * batch_cells)
-                
-                total_cells += batch_cells
-                total_non_empty += batch_non_empty
-                
-        except Exception as e:
-            # 如果某个数据集出错，跳过
-            print(f"计算 {dataset_id} 覆盖率失败: {e}")
-            continue
+    if pending:
+        workers = max(1, min(max_workers or settings.COVERAGE_ALL_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="coverage") as pool:
+            futures = {pool.submit(dataset_coverage, dataset_id, refresh): dataset_id for dataset_id in pending}
+            for future in as_completed(futures):
+                dataset_id = futures[future]
+                try:
+                    results[dataset_id] = future.result()
+                except Exception as e:
+                    # 某个数据集出错时跳过，不影响其他数据集
+                    logger.warning(f"⚠ 计算 {dataset_id} 覆盖率失败: {str(e)}")
+                    errors[dataset_id] = str(e)
+    
+    # 按数据集列表顺序返回
+    batches_data = [results[dataset_id] for dataset_id in dataset_ids if dataset_id in results]
+    total_records = sum(batch["total_records"] for batch in batches_data)
+    total_cells = sum(batch["total_cells"] for batch in batches_data)
+    total_non_empty = sum(batch["non_empty_cells"] for batch in batches_data)
     
     # 计算总体覆盖率
     overall_coverage = round((total_non_empty / total_cells) * 100, 2) if total_cells > 0 else 0.0
@@ -257,7 +309,16 @@ def calculate_all_datasets_coverage() -> Dict:
     return {
         "overall_coverage": overall_coverage,
         "total_records": total_records,
+        "total_cells": total_cells,
+        "non_empty_cells": total_non_empty,
         "total_datasets": len(batches_data),
         "meets_threshold": overall_coverage >= 90.0,  # 默认90%阈值
-        "datasets": batches_data
+        "datasets": batches_data,
+        "failed_datasets": [
+            {"dataset_id": dataset_id, "error": errors[dataset_id]}
+            for dataset_id in dataset_ids if dataset_id in errors
+        ],
+        "stale": any(batch["stale"] for batch in batches_data),
+        "cache_age_seconds": max((batch["cache_age_seconds"] for batch in batches_data), default=0.0),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
     }
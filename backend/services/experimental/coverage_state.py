@@ -0,0 +1,318 @@
+"""覆盖率统计状态 - 由写操作增量维护，读取时不再扫描数据表
+
+覆盖率只取决于每行的非空字段数和每个字段的非空记录数，而数据只会经
+create / update / delete / batch_delete / 批量导入改变。本模块维护三部分状态：
+
+- 每行的非空字段数：数据表的 coverage_filled 列（带 (coverage_filled, id) 索引），
+  插入时在Python端计算，更新时用SQL表达式重新计算；低覆盖率记录直接走索引读取
+- 分布：sys_coverage_stats 表，每个数据集按非空字段数分组的记录数
+- 字段非空数：sys_coverage_field_stats 表，每个数据集每个字段的非空记录数
+
+写操作在自己的事务内把增量（CoverageDelta）累加到统计表，与数据一起提交；
+统计尚未初始化、字段集合变化或被重置（替换导入）时，首次读取执行一次聚合查询
+重建（见 coverage_histogram）。增量、重置和重建都先锁定 sys_coverage_state 中
+数据集的状态行，彼此互斥，重建期间提交的增量不会被覆盖。出现偏差时可执行迁移步骤 coverage_stats 重建：
+    python scripts/migrate_datasets.py --step coverage_stats
+
+空值规则与 utils.null_values 相同；Python端判断去除全部首尾空白，SQL的 TRIM 只去除空格，
+仅含制表符/换行的值两边结论可能不同，重建后以SQL为准。
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.logger import get_logger
+from backend.utils.null_values import NULL_TOKENS, is_null_value, sql_filled_expression
+from backend.utils.schema_registry import quote_column, schema_registry
+
+
+logger = get_logger(__name__)
+
+# 每行非空字段数（数据表的内部辅助列）
+COVERAGE_COLUMN = "coverage_filled"
+COVERAGE_INDEX = "idx_coverage_filled"
+
+HISTOGRAM_TABLE = "sys_coverage_stats"
+FIELD_STATS_TABLE = "sys_coverage_field_stats"
+# 每个数据集一行，增量、重置与重建在该行的行锁上互斥
+STATE_TABLE = "sys_coverage_state"
+
+STATS_TABLES_DDL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS `{HISTOGRAM_TABLE}` (
+        dataset_id VARCHAR(100) NOT NULL COMMENT '数据集ID',
+        filled INT NOT NULL COMMENT '非空字段数',
+        records BIGINT NOT NULL DEFAULT 0 COMMENT '记录数',
+        PRIMARY KEY (dataset_id, filled)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='覆盖率分布统计表'
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS `{FIELD_STATS_TABLE}` (
+        dataset_id VARCHAR(100) NOT NULL COMMENT '数据集ID',
+        field_name VARCHAR(255) NOT NULL COMMENT '字段名',
+        non_empty BIGINT NOT NULL DEFAULT 0 COMMENT '非空记录数',
+        updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+        PRIMARY KEY (dataset_id, field_name)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='字段覆盖率统计表'
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS `{STATE_TABLE}` (
+        dataset_id VARCHAR(100) PRIMARY KEY COMMENT '数据集ID',
+        rebuilt_at DATETIME DEFAULT NULL COMMENT '最近重建时间'
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='覆盖率统计状态表'
+    """,
+)
+
+# 低覆盖率查询中非空字段数的列别名
+FILLED_ALIAS = "__filled"
+
+
+def coverage_fields(metadata, table_name: str) -> List[str]:
+    """参与覆盖率计算且数据表中存在的字段（按元数据顺序）"""
+    return [
+        field for field in metadata.get_coverage_calculation_fields()
+        if schema_registry.has_column(table_name, field)
+    ]
+
+
+def filled_count_sql(fields: List[str]) -> Tuple[str, List[str]]:
+    """每行非空字段数的SQL表达式和参数"""
+    parts, params = [], []
+    for field in fields:
+        sql, field_params = sql_filled_expression(field, NULL_TOKENS)
+        parts.append(sql)
+        params.extend(field_params)
+    return " + ".join(parts) or "0", params
+
+
+def row_filled_flags(data: Dict, fields: List[str]) -> List[bool]:
+    """一行数据各字段是否非空（Python端，插入前计算）"""
+    return [not is_null_value(data.get(field), NULL_TOKENS) for field in fields]
+
+
+def row_coverage(filled: int, total_fields: int) -> float:
+    """非空字段数对应的记录覆盖率（与 CoverageService.calculate_row_coverage 相同，保留两位小数）"""
+    if total_fields == 0:
+        return 0.0
+    return round((filled / total_fields) * 100, 2)
+
+
+def coverage_histogram(
+    cursor,
+    table_name: str,
+    fields: List[str],
+    where: str = "1=1",
+    params: Optional[List] = None
+) -> Tuple[Dict[int, int], Dict[str, int]]:
+    """
+    在MySQL中一次扫描统计覆盖率
+
+    内层查询为每个字段生成 CASE 表达式（非空为1），外层按每行的非空字段数分组，
+    返回行数不超过字段数 + 1。
+
+    Args:
+        cursor: 数据库游标（DictCursor）
+        table_name: 数据表名
+        fields: 参与计算的字段（须为表中存在的列）
+        where: 只统计满足条件的行（参数化，表别名为 s），默认全表
+        params: where 的参数
+
+    Returns:
+        ({非空字段数: 记录数}, {字段: 非空记录数})
+    """
+    params = list(params or [])
+    if not fields:
+        cursor.execute(f"SELECT COUNT(*) AS records FROM `{table_name}` AS s WHERE {where}", params)
+        records = int(cursor.fetchone()["records"])
+        return ({0: records} if records else {}), {}
+
+    inner, inner_params = [], []
+    for i, field in enumerate(fields):
+        sql, field_params = sql_filled_expression(field, NULL_TOKENS)
+        inner.append(f"{sql} AS f{i}")
+        inner_params.extend(field_params)
+    filled = " + ".join(f"f{i}" for i in range(len(fields)))
+    sums = ", ".join(f"SUM(f{i}) AS s{i}" for i in range(len(fields)))
+    cursor.execute(
+        f"SELECT {filled} AS filled, COUNT(*) AS records, {sums} "
+        f"FROM (SELECT {', '.join(inner)} FROM `{table_name}` AS s WHERE {where}) AS cells "
+        f"GROUP BY filled",
+        inner_params + params
+    )
+
+    histogram: Dict[int, int] = {}
+    field_counts = {field: 0 for field in fields}
+    for row in cursor.fetchall():
+        histogram[int(row["filled"])] = int(row["records"])
+        for i, field in enumerate(fields):
+            field_counts[field] += int(row[f"s{i}"] or 0)
+    return histogram, field_counts
+
+
+def fetch_low_coverage_rows(cursor, table_name: str, fields: List[str], columns: List[str],
+                            max_filled: int, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+    """
+    读取非空字段数不超过 max_filled 的记录（按非空字段数、id升序）
+
+    数据表有 coverage_filled 列时走 (coverage_filled, id) 索引，按索引顺序读到 offset + limit 行即停止；
+    否则逐行计算表达式，ORDER BY ... LIMIT 由 MySQL 的 filesort 优先队列（有界堆）选出前 offset + limit 行，
+    不对全部低覆盖率记录排序。
+
+    Args:
+        columns: 返回的列
+        max_filled: 非空字段数上限（由分布和阈值换算）
+        limit: 最多返回的记录数，None为不限
+        offset: 跳过的记录数（分页，需同时指定 limit）
+
+    Returns:
+        记录列表，每条记录的 FILLED_ALIAS 键为非空字段数
+    """
+    select_list = ", ".join(quote_column(column) for column in columns)
+    if schema_registry.has_column(table_name, COVERAGE_COLUMN):
+        sql = (
+            f"SELECT {select_list}, `{COVERAGE_COLUMN}` AS `{FILLED_ALIAS}` FROM `{table_name}` "
+            f"WHERE `{COVERAGE_COLUMN}` <= %s ORDER BY `{COVERAGE_COLUMN}`, `id`"
+        )
+        params: List = []
+    else:
+        filled, params = filled_count_sql(fields)
+        sql = (
+            f"SELECT * FROM (SELECT {select_list}, {filled} AS `{FILLED_ALIAS}` FROM `{table_name}`) AS scored "
+            f"WHERE `{FILLED_ALIAS}` <= %s ORDER BY `{FILLED_ALIAS}`, `id`"
+        )
+    params.append(max_filled)
+    if limit is not None:
+        sql += " LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+class CoverageDelta:
+    """一次写事务对覆盖率统计的增量"""
+
+    def __init__(self):
+        self.histogram: Counter = Counter()
+        self.field_counts: Counter = Counter()
+
+    def add_flags(self, flags: List[bool], fields: List[str], sign: int = 1) -> int:
+        """累加一行（row_filled_flags 的结果），返回该行的非空字段数"""
+        filled = 0
+        for field, is_filled in zip(fields, flags):
+            if is_filled:
+                self.field_counts[field] += sign
+                filled += 1
+        self.histogram[filled] += sign
+        return filled
+
+    def add_histogram(self, histogram: Dict[int, int], field_counts: Dict[str, int], sign: int = 1):
+        """累加 coverage_histogram 的结果（删除、更新前的旧值用 sign=-1）"""
+        for filled, records in histogram.items():
+            self.histogram[filled] += sign * records
+        for field, count in field_counts.items():
+            self.field_counts[field] += sign * count
+
+    def __bool__(self) -> bool:
+        return any(self.histogram.values()) or any(self.field_counts.values())
+
+
+class CoverageState:
+    """数据集覆盖率统计状态"""
+
+    @staticmethod
+    def ensure_stats_tables(cursor):
+        """创建统计表（已存在时不做任何修改）"""
+        for ddl in STATS_TABLES_DDL:
+            cursor.execute(ddl)
+
+    def get(self, cursor, dataset_id: str, table_name: str, fields: List[str]) -> Tuple[Dict[int, int], Dict[str, int]]:
+        """
+        读取覆盖率统计（未初始化或字段集合变化时重建）
+
+        Returns:
+            ({非空字段数: 记录数}, {字段: 非空记录数})
+        """
+        cursor.execute(
+            f"SELECT field_name, non_empty FROM `{FIELD_STATS_TABLE}` WHERE dataset_id = %s",
+            (dataset_id,)
+        )
+        field_counts = {row["field_name"]: int(row["non_empty"]) for row in cursor.fetchall()}
+        if not fields or set(field_counts) != set(fields):
+            return self.rebuild(cursor, dataset_id, table_name, fields)
+
+        cursor.execute(
+            f"SELECT filled, records FROM `{HISTOGRAM_TABLE}` WHERE dataset_id = %s AND records > 0",
+            (dataset_id,)
+        )
+        histogram = {int(row["filled"]): int(row["records"]) for row in cursor.fetchall()}
+        return histogram, {field: field_counts[field] for field in fields}
+
+    @staticmethod
+    def _lock(cursor, dataset_id: str):
+        """锁定数据集的状态行（不存在时插入），直到调用方的事务结束"""
+        cursor.execute(
+            f"INSERT INTO `{STATE_TABLE}` (dataset_id) VALUES (%s) "
+            f"ON DUPLICATE KEY UPDATE dataset_id = dataset_id",
+            (dataset_id,)
+        )
+
+    def rebuild(self, cursor, dataset_id: str, table_name: str, fields: List[str]) -> Tuple[Dict[int, int], Dict[str, int]]:
+        """
+        重新统计数据集的覆盖率（初始化或修复偏差），结果立即提交
+
+        先锁定状态行再统计：之前的写操作已提交且计入统计，
+        之后的写操作在 apply 处等待重建提交后再累加，重建期间的增量不会丢失。
+        """
+        # 结束调用方的读事务，统计的一致性快照在取得行锁之后建立
+        cursor.connection.commit()
+        self._lock(cursor, dataset_id)
+        histogram, field_counts = coverage_histogram(cursor, table_name, fields)
+        self.reset(cursor, dataset_id)
+        if histogram:
+            cursor.executemany(
+                f"INSERT INTO `{HISTOGRAM_TABLE}` (dataset_id, filled, records) VALUES (%s, %s, %s)",
+                [(dataset_id, filled, records) for filled, records in histogram.items()]
+            )
+        if field_counts:
+            cursor.executemany(
+                f"INSERT INTO `{FIELD_STATS_TABLE}` (dataset_id, field_name, non_empty) VALUES (%s, %s, %s)",
+                [(dataset_id, field, count) for field, count in field_counts.items()]
+            )
+        cursor.execute(f"UPDATE `{STATE_TABLE}` SET rebuilt_at = NOW() WHERE dataset_id = %s", (dataset_id,))
+        cursor.connection.commit()
+        logger.info(f"✓ 数据集 {dataset_id} 覆盖率统计已重建: {sum(histogram.values())} 条记录")
+        return histogram, field_counts
+
+    def apply(self, cursor, dataset_id: str, delta: CoverageDelta):
+        """
+        在调用方事务内累加增量（需由调用方提交）
+
+        统计尚未初始化时字段行不存在，UPDATE 不生效，首次读取时会重建（重建先清除分布）。
+        """
+        if not delta:
+            return
+        self._lock(cursor, dataset_id)
+        field_rows = [(count, dataset_id, field) for field, count in delta.field_counts.items() if count]
+        if field_rows:
+            cursor.executemany(
+                f"UPDATE `{FIELD_STATS_TABLE}` SET non_empty = GREATEST(non_empty + %s, 0) "
+                f"WHERE dataset_id = %s AND field_name = %s",
+                field_rows
+            )
+        # 分组行不存在时插入增量本身（只有统计已有偏差时才会为负，读取时忽略非正的分组）
+        histogram_rows = [(dataset_id, filled, records) for filled, records in delta.histogram.items() if records]
+        if histogram_rows:
+            cursor.executemany(
+                f"INSERT INTO `{HISTOGRAM_TABLE}` (dataset_id, filled, records) VALUES (%s, %s, %s) "
+                f"ON DUPLICATE KEY UPDATE records = GREATEST(records + VALUES(records), 0)",
+                histogram_rows
+            )
+
+    def reset(self, cursor, dataset_id: str):
+        """删除统计记录（数据集表被整体替换或无法计算增量时使用），下次读取时重建"""
+        self._lock(cursor, dataset_id)
+        cursor.execute(f"DELETE FROM `{HISTOGRAM_TABLE}` WHERE dataset_id = %s", (dataset_id,))
+        cursor.execute(f"DELETE FROM `{FIELD_STATS_TABLE}` WHERE dataset_id = %s", (dataset_id,))
+
+
+# 进程级单例
+coverage_state = CoverageState()
@@ -1,11 +1,24 @@
 """动态数据集创建服务 - 自动创建表和元数据配置"""
 import json
 import os
-from typing import List, Dict, Any, Tuple
+import tempfile
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-import pymysql
 
 from backend.config import Settings
+from backend.models.experimental.metadata import DatasetMetadata
+from backend.services.experimental.coverage_state import COVERAGE_COLUMN, COVERAGE_INDEX
+from backend.services.experimental.fingerprint import FINGERPRINT_COLUMN, FINGERPRINT_INDEX
+from backend.services.experimental.search_index import FULLTEXT_INDEX, SEARCH_COLUMN
+from backend.services.experimental.table_migrations import PAGINATION_INDEX
+from backend.services.experimental.type_inference import DEFAULT_COLUMN_TYPE
+from backend.utils.db_pool import get_connection
+from backend.utils.schema_registry import schema_registry
+
+
+# 元数据文件的读-改-写在进程内串行执行（创建数据集、导入/写入线程加宽列时都会改写）
+_metadata_lock = threading.Lock()
 
 
 class DatasetCreator:
@@ -15,6 +28,10 @@ class DatasetCreator:
         self.settings = Settings()
         self.metadata_file = Path(__file__).parent.parent.parent / "config" / "dataset_metadata.json"
     
+    def get_connection(self):
+        """从进程级连接池借出数据库连接（close() 即归还）"""
+        return get_connection()
+    
     def check_dataset_exists(self, dataset_id: str) -> Tuple[bool, bool]:
         """
         检查数据集是否存在
@@ -22,49 +39,36 @@ class DatasetCreator:
         Returns:
             (metadata_exists, table_exists)
         """
-        # 检查元数据
-        metadata_exists = False
+        # 检查元数据（使用DatasetMetadata的进程级缓存，不重复读取JSON文件）
         try:
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-                metadata_exists = dataset_id in metadata.get("datasets", {})
+            metadata_exists = DatasetMetadata.validate_dataset_id(dataset_id)
         except FileNotFoundError:
-            pass
+            metadata_exists = False
         
-        # 检查数据库表
-        table_exists = False
-        table_name = f"exp_data_{dataset_id}"
-        conn = pymysql.connect(
-            host=self.settings.MYSQL_HOST,
-            port=self.settings.MYSQL_PORT,
-            user=self.settings.MYSQL_USER,
-            password=self.settings.MYSQL_PASSWORD,
-            database=self.settings.MYSQL_DATABASE,
-            charset='utf8mb4'
-        )
-        
-        try:
-            cursor = conn.cursor()
-            cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-            table_exists = cursor.fetchone() is not None
-        finally:
-            conn.close()
+        # 检查数据库表（使用表结构注册表）
+        table_exists = schema_registry.table_exists(self.generate_table_name(dataset_id))
         
         return metadata_exists, table_exists
     
-    def infer_field_info(self, column_name: str) -> Dict[str, Any]:
+    def infer_field_info(self, column_name: str, column_type: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
         根据字段名推断字段信息
         
+        Args:
+            column_name: 字段名
+            column_type: 类型推断结果 {"type", "sql_type"}，None时为字符串/TEXT
+        
         分类规则：
         - 物性_xxx → category: "物性"
         - 工艺_xxx → category: "工艺"
         - 状态_xxx → category: "状态"
         - 性能_xxx → category: "性能"
         """
+        column_type = column_type or DEFAULT_COLUMN_TYPE
         field_info = {
             "name": column_name,
-            "type": "string",  # 默认字符串类型，MySQL会自动转换
+            "type": column_type["type"],
+            "sql_type": column_type["sql_type"],
             "nullable": True
         }
         
@@ -84,27 +88,26 @@ class DatasetCreator:
         """生成表名"""
         return f"exp_data_{dataset_id}"
     
-    def create_database_table(self, dataset_id: str, columns: List[str]) -> str:
+    def create_database_table(
+        self,
+        dataset_id: str,
+        columns: List[str],
+        column_types: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> str:
         """
         创建数据库表
         
         Args:
             dataset_id: 数据集ID
             columns: CSV列名列表
+            column_types: 列类型推断结果（type_inference.infer_chunked_column_types），None时全部为TEXT
             
         Returns:
             创建的表名
         """
         table_name = self.generate_table_name(dataset_id)
         
-        conn = pymysql.connect(
-            host=self.settings.MYSQL_HOST,
-            port=self.settings.MYSQL_PORT,
-            user=self.settings.MYSQL_USER,
-            password=self.settings.MYSQL_PASSWORD,
-            database=self.settings.MYSQL_DATABASE,
-            charset='utf8mb4'
-        )
+        conn = self.get_connection()
         
         try:
             cursor = conn.cursor()
@@ -116,17 +119,32 @@ class DatasetCreator:
                 "  `id` INT AUTO_INCREMENT PRIMARY KEY,",
             ]
             
-            # 数据字段（所有CSV列都设为TEXT类型，可存储任意长度）
+            # 数据字段（按推断类型建列，未推断的列为TEXT类型）
+            column_types = column_types or {}
             for col in columns:
                 escaped_col = col.replace("`", "``")  # 转义反引号
-                sql_parts.append(f"  `{escaped_col}` TEXT DEFAULT NULL,")
+                sql_type = column_types.get(col, DEFAULT_COLUMN_TYPE)["sql_type"]
+                sql_parts.append(f"  `{escaped_col}` {sql_type} DEFAULT NULL,")
             
             # 审计字段
             sql_parts.extend([
                 "  `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,",
                 "  `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,",
                 "  `created_by` VARCHAR(50) DEFAULT NULL,",
-                "  `updated_by` VARCHAR(50) DEFAULT NULL",
+                "  `updated_by` VARCHAR(50) DEFAULT NULL,",
+                # 检索文本（所有数据字段拼接，由写操作维护）
+                f"  `{SEARCH_COLUMN}` MEDIUMTEXT DEFAULT NULL,",
+                # 行指纹（规范化字段值的MD5，用于重复检测）
+                f"  `{FINGERPRINT_COLUMN}` CHAR(32) DEFAULT NULL,",
+                # 非空字段数（覆盖率计算字段中非空的个数，由写操作维护）
+                f"  `{COVERAGE_COLUMN}` SMALLINT UNSIGNED DEFAULT NULL,",
+                # 游标分页索引（ORDER BY created_at DESC, id DESC）
+                f"  KEY `{PAGINATION_INDEX}` (`created_at`, `id`),",
+                f"  UNIQUE KEY `{FINGERPRINT_INDEX}` (`{FINGERPRINT_COLUMN}`),",
+                # 低覆盖率记录（ORDER BY coverage_filled, id）
+                f"  KEY `{COVERAGE_INDEX}` (`{COVERAGE_COLUMN}`, `id`),",
+                # 全文索引（ngram分词，支持中文）
+                f"  FULLTEXT KEY `{FULLTEXT_INDEX}` (`{SEARCH_COLUMN}`) WITH PARSER ngram",
                 ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;"
             ])
             
@@ -139,13 +157,19 @@ class DatasetCreator:
         finally:
             conn.close()
     
-    def generate_metadata_config(self, dataset_id: str, columns: List[str]) -> Dict[str, Any]:
+    def generate_metadata_config(
+        self,
+        dataset_id: str,
+        columns: List[str],
+        column_types: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
         生成元数据配置
         
         Args:
             dataset_id: 数据集ID
             columns: CSV列名列表
+            column_types: 列类型推断结果，None时全部为字符串类型
             
         Returns:
             数据集元数据配置字典
@@ -156,7 +180,8 @@ class DatasetCreator:
         batch_num = dataset_id.replace("batch_", "") if dataset_id.startswith("batch_") else dataset_id
         
         # 生成字段信息
-        data_fields = [self.infer_field_info(col) for col in columns]
+        column_types = column_types or {}
+        data_fields = [self.infer_field_info(col, column_types.get(col)) for col in columns]
         
         # 注意：不再生成 searchable_fields 配置
         # 所有 data_fields 默认都可搜索，由代码动态获取
@@ -197,33 +222,82 @@ class DatasetCreator:
             dataset_id: 数据集ID
             config: 配置字典
         """
-        # 确保配置目录存在
-        self.metadata_file.parent.mkdir(parents=True, exist_ok=True)
+        with _metadata_lock:
+            metadata = self._read_metadata_file()
+            metadata["datasets"][dataset_id] = config
+            self._write_metadata_file(metadata)
+    
+    def update_field_types(self, dataset_id: str, column_types: Dict[str, Dict[str, str]]) -> None:
+        """
+        更新元数据中指定字段的 type / sql_type
+        
+        在锁内重新读取文件，只合并这些字段的类型，不用调用方可能过期的配置覆盖其他修改。
         
-        # 读取现有配置
+        Args:
+            dataset_id: 数据集ID
+            column_types: {字段名: {"type": ..., "sql_type": ...}}
+        """
+        with _metadata_lock:
+            metadata = self._read_metadata_file()
+            config = metadata["datasets"].get(dataset_id)
+            if config is None:
+                raise ValueError(f"数据集 '{dataset_id}' 不存在")
+            for field in config['fields']['data_fields']:
+                if field['name'] in column_types:
+                    field['type'] = column_types[field['name']]['type']
+                    field['sql_type'] = column_types[field['name']]['sql_type']
+            self._write_metadata_file(metadata)
+    
+    def remove_metadata_config(self, dataset_id: str) -> None:
+        """
+        从JSON文件中删除数据集的元数据配置（数据表需由调用方删除）
+        
+        Args:
+            dataset_id: 数据集ID
+        """
+        with _metadata_lock:
+            metadata = self._read_metadata_file()
+            if metadata["datasets"].pop(dataset_id, None) is not None:
+                self._write_metadata_file(metadata)
+    
+    def _read_metadata_file(self) -> Dict[str, Any]:
+        """读取元数据文件（需持有 _metadata_lock）"""
         if self.metadata_file.exists():
             with open(self.metadata_file, 'r', encoding='utf-8') as f:
                 metadata = json.load(f)
         else:
-            metadata = {"datasets": {}}
-        
-        # 添加新配置
-        if "datasets" not in metadata:
-            metadata["datasets"] = {}
-        
-        metadata["datasets"][dataset_id] = config
-        
-        # 保存
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+            metadata = {}
+        metadata.setdefault("datasets", {})
+        return metadata
+    
+    def _write_metadata_file(self, metadata: Dict[str, Any]) -> None:
+        """写入临时文件后原子替换（需持有 _metadata_lock），读者不会读到写了一半的文件"""
+        self.metadata_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".dataset_metadata_", suffix=".json", dir=str(self.metadata_file.parent)
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.metadata_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
     
-    def create_new_dataset(self, dataset_id: str, csv_columns: List[str]) -> Dict[str, Any]:
+    def create_new_dataset(
+        self,
+        dataset_id: str,
+        csv_columns: List[str],
+        column_types: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
         创建新数据集（表 + 元数据配置）
         
         Args:
             dataset_id: 数据集ID
             csv_columns: CSV文件的列名列表
+            column_types: 列类型推断结果（type_inference.infer_chunked_column_types）
             
         Returns:
             创建结果信息
@@ -241,14 +315,17 @@ class DatasetCreator:
         
         # 创建数据库表
         if not table_exists:
-            table_name = self.create_database_table(dataset_id, csv_columns)
+            table_name = self.create_database_table(dataset_id, csv_columns, column_types)
+            # 新表创建后使表结构注册表中的缓存失效
+            schema_registry.invalidate(table_name)
         else:
             table_name = self.generate_table_name(dataset_id)
         
         # 生成并保存元数据配置
         if not metadata_exists:
-            config = self.generate_metadata_config(dataset_id, csv_columns)
+            config = self.generate_metadata_config(dataset_id, csv_columns, column_types)
             self.save_metadata_config(dataset_id, config)
+            DatasetMetadata.reload_metadata()
         
         return {
             "created": True,
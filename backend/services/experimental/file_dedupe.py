@@ -0,0 +1,76 @@
+"""文件内去重 - 导入前用向量化哈希剔除上传文件中重复的行
+
+上传的文件本身常含有大量重复行（多次复制粘贴、合并多个表格）。这些行
+原本都会进入 batch_import 与数据库逐一比较。现在导入前先在 DataFrame 上：
+
+1. 规范化：文本去除首尾空白，settings.NULL_VALUES 中的空值标记与空白统一为空
+2. 用 pandas.util.hash_pandas_object 为每行计算64位哈希（逐列向量化计算）
+3. 保留每组相同哈希的第一行，其余计为文件内重复
+
+文件内重复与数据库中已存在的重复在导入结果中分别统计（file_duplicates / duplicates）。
+数值的等价（如 2000 与 2000.0）在同一列内由 pandas 的列类型保证；跨文件、
+与数据库已有数据的比较由行指纹完成（见 fingerprint 模块）。
+"""
+from typing import Iterable, Set, Tuple
+
+import pandas as pd
+
+from backend.utils.null_values import null_mask, null_token_set
+
+
+# 规范化后空值的占位（不会出现在规范化后的文本中）
+_NULL = "\x00"
+
+
+def normalize_frame(df: pd.DataFrame, null_values: Iterable[str]) -> pd.DataFrame:
+    """
+    规范化DataFrame用于比较（不修改原数据）
+
+    文本列去除首尾空白，空值标记、空白和 NaN/None 统一为同一占位值；
+    数值列统一为float64，日期列保持原类型（NaN 在哈希中本身是一致的）。
+    """
+    null_tokens = null_token_set(null_values)
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == object:
+            text = series.astype(str).str.strip()
+            series = text.mask(null_mask(series, null_tokens), _NULL)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            # 分块读取时同一列可能在某块为int、另一块为float（含空值），统一为float再哈希
+            series = series.astype('float64')
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+class FileDeduper:
+    """
+    跨分块的文件内去重
+
+    流式导入时文件被分块读取，已出现过的行哈希保存在集合中
+    （每行8字节，内存与文件行数成正比但远小于数据本身）。
+    """
+
+    def __init__(self, null_values: Iterable[str]):
+        self.null_values = list(null_values)
+        self.seen: Set[int] = set()
+        self.duplicates = 0
+
+    def filter(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """
+        剔除本块中与之前各块或本块前面的行重复的行
+
+        Returns:
+            (去重后的数据（保留原索引，即文件中的行位置）, 本块的重复行数)
+        """
+        if df.empty:
+            return df, 0
+        hashes = pd.util.hash_pandas_object(normalize_frame(df, self.null_values), index=False)
+        duplicated = hashes.duplicated(keep='first') | hashes.isin(self.seen)
+        self.seen.update(hashes[~duplicated].tolist())
+        count = int(duplicated.sum())
+        self.duplicates += count
+        if not count:
+            return df, 0
+        return df[~duplicated.values], count
+
@@ -0,0 +1,380 @@
+"""过滤条件编译 - 把过滤表达式编译为参数化SQL，在数据库端完成筛选
+
+支持两种写法，编译结果相同：
+
+1. 表达式（list 接口的 filter 参数）::
+
+       工艺_激光功率>=2000 AND (物性_材料 IN (304, 316) OR 编号 ^= "A1") AND 备注 IS NOT NULL
+
+   - 比较: =  !=  <>  >  >=  <  <=
+   - 列表: IN (...)  NOT IN (...)
+   - 前缀: ^= "前缀"
+   - 空值: IS NULL / IS NOT NULL（空字符串和 settings.NULL_VALUES 中的标记都视为空）
+   - 组合: AND / OR / NOT 以及括号，AND 优先级高于 OR
+   - 字段名含空格、括号等字符时用反引号包裹：`工艺_激光功率(W)` >= 2000
+   - 字符串值用单引号或双引号包裹，数字可直接书写（文本字段上按原文比较，如 编号 = 007）
+
+2. JSON（以 { 开头）::
+
+       {"and": [{"field": "工艺_激光功率", "op": "gte", "value": 2000},
+                {"or": [{"field": "物性_材料", "op": "in", "value": [304, 316]},
+                        {"field": "编号", "op": "prefix", "value": "A1"}]}]}
+
+字段必须是元数据中定义的数据字段或审计字段。数值比较：已转换为数值类型的列
+（见 type_inference）直接比较，可以使用索引；TEXT列先用正则确认是数字再CAST比较，
+N/A 等空值标记不会被当成0。
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.services.experimental.type_inference import NUMBER_PATTERN, TYPE_FLOAT, TYPE_INTEGER, is_typed
+
+
+class FilterError(ValueError):
+    """过滤表达式无效（语法错误、未知字段、超出限制等）"""
+
+
+# 防止构造过大的查询
+MAX_CONDITIONS = 100
+MAX_IN_VALUES = 1000
+MAX_DEPTH = 20
+
+# 比较运算符 → 节点中的 op
+COMPARE_OPS = {
+    "=": "eq", "!=": "ne", "<>": "ne",
+    ">": "gt", ">=": "gte", "<": "lt", "<=": "lte",
+    "^=": "prefix"
+}
+SQL_OPERATORS = {"eq": "=", "ne": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+VALUE_OPS = set(SQL_OPERATORS) | {"prefix"}
+LIST_OPS = {"in", "not_in"}
+NULL_OPS = {"is_null", "not_null"}
+
+KEYWORDS = {"AND", "OR", "NOT", "IN", "IS", "NULL"}
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<field>`(?:[^`]|``)+`)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<op>>=|<=|!=|<>|\^=|=|>|<)
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<comma>,)
+  | (?P<word>[^\s()=<>!^,"'`]+)
+""", re.VERBOSE)
+
+NUMBER_RE = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+
+
+class NumberLiteral(str):
+    """
+    未加引号的数字（表达式中的数字或JSON中的数值），保留原文
+
+    TEXT列按原文比较（编号 = 007 匹配 '007'），只有数值列才转换为数字。
+    """
+
+    def to_number(self):
+        return _parse_number(self)
+
+
+# ========== 表达式解析 ==========
+
+def _tokenize(text: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match:
+            raise FilterError(f"过滤表达式第{pos + 1}个字符无法识别: {text[pos:pos + 10]}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "space":
+            continue
+        if kind == "field":
+            tokens.append(("field", value[1:-1].replace("``", "`")))
+        elif kind == "string":
+            tokens.append(("string", re.sub(r'\\(.)', r'\1', value[1:-1])))
+        elif kind == "word" and value.upper() in KEYWORDS:
+            tokens.append(("keyword", value.upper()))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """递归下降解析器，生成与JSON写法相同的条件树"""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        # 括号与 NOT 的嵌套层数（解析时限制，避免深层嵌套耗尽递归栈）
+        self.depth = 0
+
+    def _peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self._peek()
+        if token is None:
+            raise FilterError("过滤表达式不完整")
+        self.pos += 1
+        return token
+
+    def _accept(self, kind: str, value: Any = None) -> bool:
+        token = self._peek()
+        if token and token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: Any = None, message: str = ""):
+        if not self._accept(kind, value):
+            found = self._peek()
+            raise FilterError(f"{message or '语法错误'}，位置: {found[1] if found else '末尾'}")
+
+    def parse(self) -> Dict:
+        node = self._parse_or()
+        if self._peek() is not None:
+            raise FilterError(f"语法错误，多余的内容: {self._peek()[1]}")
+        return node
+
+    def _parse_or(self) -> Dict:
+        nodes = [self._parse_and()]
+        while self._accept("keyword", "OR"):
+            nodes.append(self._parse_and())
+        return nodes[0] if len(nodes) == 1 else {"or": nodes}
+
+    def _parse_and(self) -> Dict:
+        nodes = [self._parse_unary()]
+        while self._accept("keyword", "AND"):
+            nodes.append(self._parse_unary())
+        return nodes[0] if len(nodes) == 1 else {"and": nodes}
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise FilterError(f"过滤条件嵌套超过{MAX_DEPTH}层")
+
+    def _parse_unary(self) -> Dict:
+        if self._accept("keyword", "NOT"):
+            self._enter()
+            node = {"not": self._parse_unary()}
+            self.depth -= 1
+            return node
+        if self._accept("lparen"):
+            self._enter()
+            node = self._parse_or()
+            self._expect("rparen", message="缺少右括号")
+            self.depth -= 1
+            return node
+        return self._parse_predicate()
+
+    def _parse_value(self) -> Any:
+        kind, value = self._next()
+        if kind == "string":
+            return value
+        if kind == "word":
+            return NumberLiteral(value) if NUMBER_RE.match(value) else value
+        raise FilterError(f"缺少比较值，位置: {value}")
+
+    def _parse_list(self) -> List:
+        self._expect("lparen", message="IN 后需要括号")
+        values = [self._parse_value()]
+        while self._accept("comma"):
+            values.append(self._parse_value())
+        self._expect("rparen", message="IN 列表缺少右括号")
+        return values
+
+    def _parse_predicate(self) -> Dict:
+        kind, field = self._next()
+        if kind not in ("word", "field", "string"):
+            raise FilterError(f"缺少字段名，位置: {field}")
+
+        if self._accept("keyword", "IS"):
+            negated = self._accept("keyword", "NOT")
+            self._expect("keyword", "NULL", message="IS 后需要 NULL 或 NOT NULL")
+            return {"field": field, "op": "not_null" if negated else "is_null"}
+        if self._accept("keyword", "NOT"):
+            self._expect("keyword", "IN", message="NOT 后需要 IN")
+            return {"field": field, "op": "not_in", "value": self._parse_list()}
+        if self._accept("keyword", "IN"):
+            return {"field": field, "op": "in", "value": self._parse_list()}
+
+        kind, op = self._next()
+        if kind != "op":
+            raise FilterError(f"字段 {field} 后缺少比较运算符")
+        return {"field": field, "op": COMPARE_OPS[op], "value": self._parse_value()}
+
+
+def _parse_number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_filter(text: str) -> Dict:
+    """
+    解析过滤条件（表达式或JSON）为条件树
+
+    Raises:
+        FilterError: 语法错误、嵌套过深
+    """
+    text = text.strip()
+    if not text:
+        raise FilterError("过滤条件不能为空")
+    try:
+        if text.startswith("{"):
+            try:
+                # 数值保留原文（见 NumberLiteral）
+                return json.loads(text, parse_int=NumberLiteral, parse_float=NumberLiteral)
+            except json.JSONDecodeError as e:
+                raise FilterError(f"过滤条件JSON格式错误: {e.msg}")
+        return _Parser(text).parse()
+    except RecursionError:
+        # JSON 的深层嵌套（表达式在解析时已按 MAX_DEPTH 限制）
+        raise FilterError(f"过滤条件嵌套超过{MAX_DEPTH}层")
+
+
+def equality_filter(filters: Dict[str, Any]) -> Optional[Dict]:
+    """把旧接口的等值过滤字典 {字段: 值} 转换为条件树（值为None的条件被忽略）"""
+    nodes = [
+        {"field": field, "op": "eq", "value": value}
+        for field, value in filters.items() if value is not None
+    ]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else {"and": nodes}
+
+
+# ========== SQL编译 ==========
+
+class FilterCompiler:
+    """把条件树编译为参数化的WHERE子句"""
+
+    def __init__(self, field_types: Dict[str, Optional[str]], null_values: List[str]):
+        """
+        Args:
+            field_types: 可过滤字段 → 元数据类型（integer/float/datetime/string）
+            null_values: 空值标记（settings.NULL_VALUES）
+        """
+        self.field_types = field_types
+        self.null_values = list(null_values)
+        self._conditions = 0
+
+    def compile(self, node: Dict) -> Tuple[str, List]:
+        """
+        Returns:
+            (WHERE子句, 参数列表)
+
+        Raises:
+            FilterError: 条件无效
+        """
+        self._conditions = 0
+        params: List = []
+        sql = self._compile_node(node, params, depth=0)
+        return sql, params
+
+    def _compile_node(self, node: Any, params: List, depth: int) -> str:
+        if depth > MAX_DEPTH:
+            raise FilterError(f"过滤条件嵌套超过{MAX_DEPTH}层")
+        if not isinstance(node, dict):
+            raise FilterError("过滤条件格式错误")
+
+        for group, joiner in (("and", " AND "), ("or", " OR ")):
+            if group in node:
+                children = node[group]
+                if not isinstance(children, list) or not children:
+                    raise FilterError(f"{group} 需要非空的条件列表")
+                parts = [self._compile_node(child, params, depth + 1) for child in children]
+                return "(" + joiner.join(parts) + ")"
+        if "not" in node:
+            return f"NOT {self._compile_node(node['not'], params, depth + 1)}"
+
+        self._conditions += 1
+        if self._conditions > MAX_CONDITIONS:
+            raise FilterError(f"过滤条件数量超过{MAX_CONDITIONS}个")
+        return self._compile_predicate(node, params)
+
+    def _column(self, field: Any) -> str:
+        if not isinstance(field, str) or field not in self.field_types:
+            raise FilterError(f"未知的过滤字段: {field}")
+        return "`" + field.replace("`", "``").replace("%", "%%") + "`"
+
+    def _is_numeric_field(self, field: str) -> bool:
+        return self.field_types.get(field) in (TYPE_INTEGER, TYPE_FLOAT)
+
+    def _compile_predicate(self, node: Dict, params: List) -> str:
+        field = node.get("field")
+        op = node.get("op")
+        column = self._column(field)
+        value = node.get("value")
+
+        if op in NULL_OPS:
+            return self._null_condition(field, column, params, negated=(op == "not_null"))
+
+        if op in LIST_OPS:
+            if not isinstance(value, list) or not value:
+                raise FilterError(f"字段 {field} 的 {op} 需要非空的值列表")
+            if len(value) > MAX_IN_VALUES:
+                raise FilterError(f"IN 列表最多{MAX_IN_VALUES}个值")
+            params.extend(self._coerce(field, v) for v in value)
+            placeholders = ", ".join(["%s"] * len(value))
+            keyword = "IN" if op == "in" else "NOT IN"
+            return f"{column} {keyword} ({placeholders})"
+
+        if op not in VALUE_OPS:
+            raise FilterError(f"不支持的过滤运算: {op}")
+        if value is None or isinstance(value, (list, dict)):
+            raise FilterError(f"字段 {field} 的 {op} 需要单个比较值")
+
+        if op == "prefix":
+            escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(escaped + "%")
+            return f"{column} LIKE %s"
+
+        sql_op = SQL_OPERATORS[op]
+        numeric_value = isinstance(value, NumberLiteral) or (
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+        if numeric_value and not self._is_numeric_field(field) and op not in ("eq", "ne"):
+            # TEXT列上的数值范围：只比较内容为数字的值，避免字符串序比较和 N/A→0 的隐式转换
+            params.extend([NUMBER_PATTERN, value.to_number() if isinstance(value, NumberLiteral) else value])
+            return f"(TRIM({column}) REGEXP %s AND CAST(TRIM({column}) AS DECIMAL(38, 10)) {sql_op} %s)"
+
+        params.append(self._coerce(field, value))
+        return f"{column} {sql_op} %s"
+
+    def _coerce(self, field: str, value: Any) -> Any:
+        """
+        数值列把数字字符串转为数字；其他列按原文比较
+
+        未加引号的数字（NumberLiteral）在非数值列上保留原文，不经过 int/float 往返
+        （007、2000.0、1e3 不会变成 '7'、'2000'、'1000.0'）。
+
+        Raises:
+            FilterError: 数值列上的值不是数字（MySQL 会把 'abc'、true 隐式转换为数字，静默返回错误的结果）
+        """
+        if self._is_numeric_field(field):
+            if isinstance(value, str) and NUMBER_RE.match(value.strip()):
+                return _parse_number(value.strip())
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            raise FilterError(f"字段 {field} 是数值类型，比较值必须是数字: {value!r}")
+        if isinstance(value, str):
+            return str(value)
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    def _null_condition(self, field: str, column: str, params: List, negated: bool) -> str:
+        # 数值/日期列中空值已统一为NULL（见 type_inference），TEXT列还需匹配空值标记
+        if is_typed(self.field_types.get(field)):
+            return f"{column} IS NOT NULL" if negated else f"{column} IS NULL"
+        params.extend(self.null_values)
+        placeholders = ", ".join(["%s"] * len(self.null_values))
+        if negated:
+            return f"({column} IS NOT NULL AND TRIM({column}) NOT IN ({placeholders}))"
+        return f"({column} IS NULL OR TRIM({column}) IN ({placeholders}))"
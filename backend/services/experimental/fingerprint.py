@@ -0,0 +1,135 @@
+"""行指纹 - 基于规范化字段值的哈希，用于索引化的重复检测
+
+原重复检测对每一行执行 SELECT COUNT(*) ... WHERE 所有字段相等（空值还要匹配
+15个空值标记），每行一次全表扫描。现在每个数据表维护：
+
+- row_fingerprint：全部数据字段规范化后的MD5（CHAR(32)）
+- uk_row_fingerprint：row_fingerprint 上的唯一索引（历史表已有重复数据时退化为普通索引）
+
+规范化规则（保证同一行数据无论以何种形式写入，指纹都相同）：
+- None、NaN、空白以及 settings.NULL_VALUES 中的标记 → 空（与 utils.null_values 规则一致，
+  调用方传入 NULL_TOKENS）
+- 字符串去除首尾空白
+- 数字统一格式：2000、2000.0、"2000"、"2000.00" 相同；不含前导零的规则
+  与 type_inference 一致，"007" 这类编号保持原样
+- 日期/时间：零点时间只保留日期部分
+
+历史表通过 scripts/migrate_datasets.py --step row_fingerprint 添加列、回填并建立索引。
+"""
+import hashlib
+import math
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from backend.services.experimental.type_inference import NUMBER_PATTERN
+
+# 指纹列与索引名称
+FINGERPRINT_COLUMN = "row_fingerprint"
+FINGERPRINT_INDEX = "uk_row_fingerprint"
+
+# IN 探测每批的指纹数量
+PROBE_CHUNK_SIZE = 500
+
+# 字段值之间的分隔符与空值占位（均不会出现在规范化后的文本中）
+_SEPARATOR = "\x1f"
+_NULL = "\x00"
+
+_NUMBER_RE = re.compile(NUMBER_PATTERN)
+
+
+def normalize_value(value: Any, null_tokens: Set[str]) -> Optional[str]:
+    """
+    规范化单个字段值
+
+    Args:
+        value: 字段值
+        null_tokens: 空值标记集合（settings.NULL_VALUES）
+
+    Returns:
+        规范化后的文本，空值返回None
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return _format_number(Decimal(repr(value)))
+    if isinstance(value, (int, Decimal)):
+        return _format_number(Decimal(value))
+    if isinstance(value, datetime):
+        if value.time() == datetime.min.time():
+            return value.strftime('%Y-%m-%d')
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+
+    text = str(value).strip()
+    if not text or text in null_tokens:
+        return None
+    if _NUMBER_RE.match(text):
+        try:
+            return _format_number(Decimal(text))
+        except InvalidOperation:
+            return text
+    if len(text) == 19 and text.endswith(" 00:00:00"):
+        return text[:10]
+    return text
+
+
+def _format_number(number: Decimal) -> str:
+    """数字的规范文本：去掉多余的0和小数点，不使用科学计数法"""
+    if number == number.to_integral_value():
+        try:
+            return str(number.quantize(Decimal(1)))
+        except InvalidOperation:
+            pass
+    return format(number.normalize(), 'f')
+
+
+def compute_fingerprint(data: Dict[str, Any], fields: Iterable[str], null_tokens: Set[str]) -> str:
+    """
+    计算一行数据的指纹
+
+    Args:
+        data: 行数据（未提供的字段视为空）
+        fields: 全部数据字段（按元数据顺序）
+        null_tokens: 空值标记集合
+
+    Returns:
+        32位十六进制MD5
+    """
+    parts = []
+    for field in fields:
+        normalized = normalize_value(data.get(field), null_tokens)
+        parts.append(_NULL if normalized is None else normalized)
+    return hashlib.md5(_SEPARATOR.join(parts).encode("utf-8")).hexdigest()
+
+
+def find_existing(cursor, table_name: str, fingerprints: List[str]) -> Set[str]:
+    """
+    查询已存在的指纹（每批一次 IN 探测，走指纹索引）
+
+    Returns:
+        数据表中已存在的指纹集合
+    """
+    existing: Set[str] = set()
+    unique = list(dict.fromkeys(fingerprints))
+    for start in range(0, len(unique), PROBE_CHUNK_SIZE):
+        chunk = unique[start:start + PROBE_CHUNK_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"SELECT `{FINGERPRINT_COLUMN}` AS fp FROM `{table_name}` "
+            f"WHERE `{FINGERPRINT_COLUMN}` IN ({placeholders})",
+            tuple(chunk)
+        )
+        existing.update(row['fp'] for row in cursor.fetchall())
+    return existing
+
+
+def is_duplicate_key_error(error: Exception) -> bool:
+    """是否为唯一索引冲突（MySQL错误码1062）"""
+    return bool(getattr(error, "args", None)) and error.args[0] == 1062
@@ -0,0 +1,266 @@
+"""导入预检 - 不写入数据库的导入分析（dry run）
+
+管理员原本只有真正执行导入后才知道列名是否一致、有多少重复和错误行。
+预检按导入的同一流程分析上传文件，但不写入任何数据：
+
+1. 解析：UploadReader 分块读取（与导入相同的编码探测和分块）
+2. 列名验证：validate_import_columns（数据集不存在时改为推断列类型，导入时将自动创建）
+3. 文件内去重：FileDeduper，另外统计规范化后指纹相同的行
+4. 与已有数据的重复：每块的指纹分成 settings.IMPORT_PREVIEW_PROBE_WORKERS 组，
+   各组用独立连接并行执行批量 IN 探测（走指纹索引）
+5. 逐列统计：空值数、推断类型，以及数值/日期字段中无法转换为列类型的值
+   （导入时这些行会写入失败）
+
+返回汇总统计和问题行样本（settings.IMPORT_PREVIEW_SAMPLE_ROWS 行）。
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+
+from backend.config import Settings
+from backend.models.experimental.metadata import DatasetMetadata
+from backend.services.experimental.dataset_creator import DatasetCreator
+from backend.services.experimental.file_dedupe import FileDeduper
+from backend.services.experimental.fingerprint import (
+    FINGERPRINT_COLUMN, PROBE_CHUNK_SIZE, compute_fingerprint, find_existing
+)
+from backend.services.experimental.type_inference import (
+    TYPE_DATETIME, TYPE_FLOAT, TYPE_INTEGER, decide_column_type, empty_profile, merge_profiles, profile_series
+)
+from backend.services.experimental.upload_reader import UploadReader, dataframe_to_records
+from backend.utils.db_pool import get_connection
+from backend.utils.null_values import NULL_TOKENS, clean_frame, null_mask
+from backend.utils.schema_registry import schema_registry
+
+
+settings = Settings()
+
+# 问题类型
+ISSUE_FILE_DUPLICATE = "file_duplicate"
+ISSUE_EXISTING_DUPLICATE = "existing_duplicate"
+ISSUE_TYPE_ERROR = "type_error"
+
+
+def probe_existing(table_name: str, fingerprints: List[str], workers: Optional[int] = None) -> Set[str]:
+    """
+    并行探测已存在的指纹
+
+    指纹去重后按 PROBE_CHUNK_SIZE 分批，批次交错分给各工作线程，
+    每个线程借出一个连接依次执行 IN 探测（见 fingerprint.find_existing）。
+
+    Returns:
+        数据表中已存在的指纹集合
+    """
+    unique = list(dict.fromkeys(fingerprints))
+    if not unique:
+        return set()
+    batches = -(-len(unique) // PROBE_CHUNK_SIZE)
+    workers = max(1, min(workers or settings.IMPORT_PREVIEW_PROBE_WORKERS, batches))
+
+    def probe(group: List[str]) -> Set[str]:
+        conn = get_connection()
+        try:
+            return find_existing(conn.cursor(), table_name, group)
+        finally:
+            conn.close()
+
+    if workers == 1:
+        return probe(unique)
+    groups = [
+        [fp for start in range(offset * PROBE_CHUNK_SIZE, len(unique), workers * PROBE_CHUNK_SIZE)
+         for fp in unique[start:start + PROBE_CHUNK_SIZE]]
+        for offset in range(workers)
+    ]
+    existing: Set[str] = set()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fingerprint-probe") as pool:
+        for found in pool.map(probe, groups):
+            existing |= found
+    return existing
+
+
+def invalid_type_mask(series: pd.Series, field_type: Optional[str], null: pd.Series) -> pd.Series:
+    """
+    非空值中无法转换为字段类型的值（数值字段不是数字、整数字段有小数、日期字段无法解析）
+
+    Returns:
+        与 series 索引相同的布尔Series
+    """
+    invalid = pd.Series(False, index=series.index)
+    values = series[~null]
+    if values.empty or field_type not in (TYPE_INTEGER, TYPE_FLOAT, TYPE_DATETIME):
+        return invalid
+    if field_type == TYPE_DATETIME:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return invalid
+        parsed = pd.to_datetime(values.astype(str).str.strip(), errors="coerce", format="mixed")
+        invalid[values.index] = parsed.isna().to_numpy()
+        return invalid
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numeric = values.astype(float)
+    else:
+        numeric = pd.to_numeric(values.astype(str).str.strip(), errors="coerce")
+    bad = numeric.isna()
+    if field_type == TYPE_INTEGER:
+        bad = bad | (numeric % 1 != 0)
+    invalid[values.index] = bad.to_numpy()
+    return invalid
+
+
+def preview_import(dataset_id: str, file_path: str, file_ext: str,
+                   sample_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    分析上传文件的导入结果（阻塞调用，不写入数据库）
+
+    Args:
+        dataset_id: 数据集ID
+        file_path: 落盘的上传文件
+        file_ext: 文件扩展名（csv/xlsx/xls）
+        sample_rows: 返回的问题行样本数，默认 settings.IMPORT_PREVIEW_SAMPLE_ROWS
+
+    Returns:
+        汇总统计（见 ImportPreviewResponse）
+
+    Raises:
+        FileParseError: 文件无法解析
+    """
+    started = time.perf_counter()
+    sample_rows = settings.IMPORT_PREVIEW_SAMPLE_ROWS if sample_rows is None else sample_rows
+    reader = UploadReader.open(file_path, file_ext)
+
+    result: Dict[str, Any] = {
+        "dataset_id": dataset_id,
+        "dataset_exists": False,
+        "columns_valid": True,
+        "column_error": None,
+        "total_rows": 0,
+        "file_duplicates": 0,
+        "existing_duplicates": 0,
+        "type_error_rows": 0,
+        "new_rows": 0,
+        "columns": [],
+        "problem_rows": [],
+        "notes": []
+    }
+
+    metadata_exists, table_exists = DatasetCreator().check_dataset_exists(dataset_id)
+    metadata = None
+    if metadata_exists and table_exists:
+        metadata = DatasetMetadata(dataset_id)
+        result["dataset_exists"] = True
+        valid, error_msg = metadata.validate_import_columns(reader.columns)
+        if not valid:
+            result["columns_valid"] = False
+            result["column_error"] = error_msg
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+    else:
+        result["notes"].append("数据集不存在，导入时将按推断的列类型自动创建")
+
+    if reader.empty:
+        result["notes"].append("文件为空，没有数据")
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    # 数据集已存在时按元数据的字段顺序和类型分析；否则按文件列（类型由推断得出）
+    if metadata:
+        field_names = metadata.get_all_field_names()
+        field_types = {name: metadata.get_field_type(name) for name in field_names}
+        table_name = metadata.get_table_name()
+        can_probe = schema_registry.has_column(table_name, FINGERPRINT_COLUMN)
+        if not can_probe:
+            result["notes"].append("数据表缺少行指纹列，未检查与已有数据的重复")
+    else:
+        field_names = list(reader.columns)
+        field_types = {}
+        table_name = None
+        can_probe = False
+    typed_columns = [
+        name for name, field_type in field_types.items()
+        if field_type in (TYPE_INTEGER, TYPE_FLOAT, TYPE_DATETIME)
+    ]
+
+    profiles = {name: empty_profile() for name in field_names}
+    column_stats = {name: {"nulls": 0, "type_errors": 0} for name in field_names}
+    deduper = FileDeduper(settings.NULL_VALUES)
+    seen_fingerprints: Set[str] = set()
+    fingerprint_duplicates = 0
+    problems: List[Dict[str, Any]] = []
+
+    def add_problem(frame: pd.DataFrame, idx: int, issue: str, detail: str):
+        # 只为样本中的行转换原始数据
+        if len(problems) < sample_rows:
+            data = dataframe_to_records(frame.loc[[idx]])[0]
+            problems.append({"row": idx + 1, "issue": issue, "detail": detail, "data": data})
+
+    for chunk in reader.iter_chunks():
+        result["total_rows"] += len(chunk)
+        chunk = chunk[field_names]
+
+        # 逐列统计（整块向量化计算）
+        invalid_columns = {}
+        for name in field_names:
+            series = chunk[name]
+            null = null_mask(series, NULL_TOKENS)
+            column_stats[name]["nulls"] += int(null.sum())
+            merge_profiles(profiles[name], profile_series(series, settings.NULL_VALUES))
+            if name in field_types:
+                invalid = invalid_type_mask(series, field_types[name], null)
+                if invalid.any():
+                    invalid_columns[name] = invalid
+                    column_stats[name]["type_errors"] += int(invalid.sum())
+
+        # 文件内重复（与导入相同的规则）
+        unique, _ = deduper.filter(chunk)
+        if len(unique) < len(chunk):
+            for idx in chunk.index.difference(unique.index)[:sample_rows]:
+                add_problem(chunk, idx, ISSUE_FILE_DUPLICATE, "与文件中前面的行重复")
+
+        # 指纹：文件内规范化后相同的行、与已有数据重复的行
+        cleaned = clean_frame(unique, NULL_TOKENS, columns=typed_columns, strip_text=False) if typed_columns else unique
+        records = dataframe_to_records(cleaned)
+        fingerprints = [compute_fingerprint(data, field_names, NULL_TOKENS) for data in records]
+        existing = probe_existing(table_name, fingerprints) if can_probe else set()
+
+        type_error_rows = pd.Series(False, index=chunk.index)
+        for invalid in invalid_columns.values():
+            type_error_rows |= invalid
+
+        for idx, fingerprint in zip(unique.index, fingerprints):
+            if fingerprint in existing:
+                result["existing_duplicates"] += 1
+                add_problem(unique, idx, ISSUE_EXISTING_DUPLICATE, "与数据库中已有记录重复")
+                continue
+            if fingerprint in seen_fingerprints:
+                fingerprint_duplicates += 1
+                add_problem(unique, idx, ISSUE_FILE_DUPLICATE, "规范化后与文件中前面的行重复")
+                continue
+            seen_fingerprints.add(fingerprint)
+            if type_error_rows[idx]:
+                result["type_error_rows"] += 1
+                bad_fields = [name for name, invalid in invalid_columns.items() if invalid[idx]]
+                add_problem(
+                    unique, idx, ISSUE_TYPE_ERROR,
+                    "值与字段类型不符: " + ", ".join(f"{name}({field_types[name]})" for name in bad_fields)
+                )
+                continue
+            result["new_rows"] += 1
+
+    result["file_duplicates"] = deduper.duplicates + fingerprint_duplicates
+    for name in field_names:
+        non_null = profiles[name]["non_null"]
+        total = non_null + column_stats[name]["nulls"]
+        result["columns"].append({
+            "name": name,
+            "type": field_types.get(name),
+            "inferred_type": decide_column_type(profiles[name])["type"],
+            "non_null": non_null,
+            "nulls": column_stats[name]["nulls"],
+            "null_ratio": round(column_stats[name]["nulls"] / total, 4) if total else 0.0,
+            "type_errors": column_stats[name]["type_errors"]
+        })
+    problems.sort(key=lambda problem: problem["row"])
+    result["problem_rows"] = problems
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
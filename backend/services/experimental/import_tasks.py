@@ -0,0 +1,756 @@
+"""后台导入任务 - 基于 sys_import_tasks 的异步导入
+
+原导入接口在一个HTTP请求内完成整个导入，大文件会长时间占用请求并在代理处超时。
+现在上传接口只负责落盘和预检（编码、表头、列名），随即创建任务并返回 task_id；
+导入由进程内有界的工作线程池（settings.IMPORT_WORKERS）执行：
+
+- 任务状态保存在 sys_import_tasks：pending → processing → completed / failed / cancelled
+- 每提交一个写入块（settings.IMPORT_CHUNK_SIZE 行）更新一次进度
+  （current_row、progress、success_count、failed_count）
+- 取消：把状态改为 cancelled，工作线程在下一块开始前发现并停止
+  （已提交的块保留）；排队中的任务直接不再执行
+- 完成后完整的导入结果（与原同步接口的响应相同）保存在 result 列
+
+断点续传：每个写入块提交后把累计统计作为检查点写入 checkpoint 列。任务执行期间由心跳线程
+每 settings.IMPORT_TASK_HEARTBEAT_SECONDS 秒刷新 heartbeat_at（推断列类型、写入较慢的块
+可能远超巡检的超时时间），进程退出后心跳随之停止。
+进程崩溃或重启后，心跳超过 settings.IMPORT_TASK_STALE_SECONDS 的 processing 任务
+和无人执行的 pending 任务由巡检（启动时及每 settings.IMPORT_TASK_SWEEP_SECONDS 秒）
+重新认领，从检查点之后的行继续；检查点之前的行只参与文件内去重。
+服务正常关闭时执行中的任务在当前块完成后退回 pending，重启后继续。
+检查点在每个写入块提交之后、以单独的事务保存（逐行重试的块每行单独提交），
+两者之间中断时续传会重放该块：有行指纹列时这些行计为重复（duplicates）而不是成功，
+最多影响一个写入块（settings.IMPORT_CHUNK_SIZE 行）的统计。
+
+导入模式（mode 列）：
+- append：追加到数据表
+- replace：导入到影子表（CREATE TABLE ... LIKE 数据表），全部完成后用一条
+  RENAME TABLE 原子替换数据表；导入期间读者始终看到完整的旧数据，
+  也不会长时间持有数据表上的锁。取消或失败时删除影子表
+
+导入引擎（engine 列）：
+- rows：分块多行INSERT（默认）
+- load_data：LOAD DATA 快速导入（见 load_data 模块），前提不满足时回退到 rows，
+  结果中 engine 为实际使用的引擎、engine_note 为回退原因。该引擎按段提交且写入幂等，
+  续传时从头重新执行，已写入的行按指纹计为重复
+
+使用示例：
+    from backend.services.experimental.import_tasks import import_task_manager
+
+    task = import_task_manager.submit(dataset_id, filename, path, created_by)
+    import_task_manager.get(task["task_id"])
+    import_task_manager.cancel(task["task_id"])
+"""
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.config import Settings
+from backend.models.experimental.metadata import DatasetMetadata
+from backend.services.experimental.base_service import BaseExperimentalDataService
+from backend.services.experimental.dataset_creator import DatasetCreator
+from backend.services.experimental.load_data import (
+    ENGINE_LOAD_DATA, ENGINE_ROWS, IMPORT_ENGINES, load_data_unavailable
+)
+from backend.services.experimental.type_inference import infer_chunked_column_types
+from backend.services.experimental.upload_reader import UploadReader, remove_spooled
+from backend.utils.db_pool import get_connection
+from backend.utils.schema_registry import schema_registry
+from backend.utils.logger import get_logger
+
+
+settings = Settings()
+logger = get_logger(__name__)
+
+TASKS_TABLE = "sys_import_tasks"
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+TERMINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+MODE_APPEND = "append"
+MODE_REPLACE = "replace"
+IMPORT_MODES = (MODE_APPEND, MODE_REPLACE)
+
+STATUS_ENUM = "ENUM('pending', 'processing', 'completed', 'failed', 'cancelled')"
+
+# 与 sql/init_database.sql 保持一致
+TASKS_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS `{TASKS_TABLE}` (
+        id INT PRIMARY KEY AUTO_INCREMENT COMMENT '任务ID',
+        task_id VARCHAR(100) NOT NULL UNIQUE COMMENT '任务唯一标识',
+        batch_id VARCHAR(50) NOT NULL COMMENT '批次ID',
+        filename VARCHAR(255) NOT NULL COMMENT '上传的文件名',
+        file_path VARCHAR(500) COMMENT '文件存储路径',
+        mode ENUM('append', 'replace') NOT NULL DEFAULT 'append' COMMENT '导入模式',
+        engine ENUM('rows', 'load_data') NOT NULL DEFAULT 'rows' COMMENT '导入引擎',
+        status {STATUS_ENUM} NOT NULL DEFAULT 'pending' COMMENT '任务状态',
+        progress INT NOT NULL DEFAULT 0 COMMENT '进度百分比',
+        total_rows INT DEFAULT 0 COMMENT '总行数',
+        current_row INT DEFAULT 0 COMMENT '当前处理行',
+        success_count INT DEFAULT 0 COMMENT '成功导入数量',
+        failed_count INT DEFAULT 0 COMMENT '失败数量',
+        failed_rows JSON COMMENT '失败行详情',
+        result JSON COMMENT '导入结果',
+        checkpoint JSON COMMENT '断点续传检查点',
+        attempts INT NOT NULL DEFAULT 0 COMMENT '执行次数',
+        heartbeat_at DATETIME COMMENT '最近心跳时间',
+        error_message TEXT COMMENT '错误信息',
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '任务创建时间',
+        started_at DATETIME COMMENT '开始处理时间',
+        completed_at DATETIME COMMENT '完成时间',
+        created_by VARCHAR(50) COMMENT '创建人',
+        INDEX idx_task_id (task_id),
+        INDEX idx_batch_id (batch_id),
+        INDEX idx_status (status),
+        INDEX idx_created_at (created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='CSV导入任务表'
+"""
+
+# 任务列表返回的列（不含可能较大的 failed_rows / result）
+SUMMARY_COLUMNS = (
+    "task_id, batch_id, filename, mode, engine, status, progress, total_rows, current_row, "
+    "success_count, failed_count, attempts, error_message, created_at, started_at, completed_at, created_by"
+)
+
+# 旧表（init_database.sql 早期版本）缺少的列
+ADDED_COLUMNS = {
+    "engine": "engine ENUM('rows', 'load_data') NOT NULL DEFAULT 'rows' COMMENT '导入引擎' AFTER mode",
+    "result": "result JSON COMMENT '导入结果' AFTER failed_rows",
+    "checkpoint": "checkpoint JSON COMMENT '断点续传检查点' AFTER result",
+    "attempts": "attempts INT NOT NULL DEFAULT 0 COMMENT '执行次数' AFTER checkpoint",
+    "heartbeat_at": "heartbeat_at DATETIME COMMENT '最近心跳时间' AFTER attempts",
+}
+
+# 心跳超时的 processing 任务可被重新认领
+RECLAIMABLE_SQL = (
+    "(status = 'pending' OR (status = 'processing' AND "
+    "(heartbeat_at IS NULL OR heartbeat_at < NOW() - INTERVAL %s SECOND)))"
+)
+
+
+class ImportCancelled(Exception):
+    """任务已被取消（在块之间检查）"""
+
+
+class ImportTaskError(Exception):
+    """导入任务执行失败（数据集创建失败、列名不一致等）"""
+
+
+def ensure_tasks_table(cursor):
+    """创建任务表；init_database.sql 建立的旧表补充 cancelled 状态和新增的列"""
+    cursor.execute(TASKS_TABLE_DDL)
+    cursor.execute(
+        """
+        SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (TASKS_TABLE,)
+    )
+    columns = {row['COLUMN_NAME']: row['COLUMN_TYPE'] for row in cursor.fetchall()}
+    if STATUS_CANCELLED not in columns.get('status', ''):
+        cursor.execute(
+            f"ALTER TABLE `{TASKS_TABLE}` MODIFY status {STATUS_ENUM} NOT NULL DEFAULT 'pending' COMMENT '任务状态'"
+        )
+    for column, definition in ADDED_COLUMNS.items():
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE `{TASKS_TABLE}` ADD COLUMN {definition}")
+
+
+def _file_ext(path: str) -> str:
+    return os.path.splitext(path)[1].lstrip('.').lower()
+
+
+def execute_import(
+    dataset_id: str,
+    file_path: str,
+    created_by: str,
+    mode: str = MODE_APPEND,
+    engine: str = ENGINE_ROWS,
+    checkpoint: Optional[Dict] = None,
+    shadow_tag: Optional[str] = None,
+    on_checkpoint: Optional[Callable[[Dict], None]] = None,
+    on_total: Optional[Callable[[int], None]] = None
+) -> Dict[str, Any]:
+    """
+    执行一次导入（阻塞调用，在工作线程中执行）
+
+    数据集不存在时先分块扫描文件推断列类型并创建数据集，然后验证列名、分块导入。
+    replace 模式下（数据集已存在时）写入影子表，完成后原子替换数据表。
+
+    Args:
+        dataset_id: 数据集ID
+        file_path: 落盘的上传文件
+        created_by: 导入者
+        mode: append / replace
+        engine: rows / load_data（前提不满足时回退到 rows）
+        checkpoint: 上次中断时保存的检查点（None 为从头开始）
+        shadow_tag: 影子表名后缀（同一任务续传时相同）
+        on_checkpoint: 检查点变化时调用（每块提交后、创建数据集或影子表后），
+            抛出 ImportCancelled 可中止导入
+        on_total: 得到文件行数（估计值）后调用
+
+    Returns:
+        导入统计与数据集创建信息（BatchImportResponse 中除 message/filename 外的字段）
+
+    Raises:
+        ImportTaskError: 数据集创建失败、列名不一致
+        FileParseError: 文件无法解析
+    """
+    checkpoint = dict(checkpoint or {})
+    save = on_checkpoint or (lambda state: None)
+
+    reader = UploadReader.open(file_path, _file_ext(file_path))
+    if on_total:
+        on_total(reader.count_rows())
+
+    creator = DatasetCreator()
+    metadata_exists, table_exists = creator.check_dataset_exists(dataset_id)
+
+    # 如果数据集不存在，自动创建（续传时数据集已由上次执行创建，创建信息保存在检查点中）
+    if not metadata_exists or not table_exists:
+        # 分块扫描文件推断列类型（INT/DOUBLE/DATE/VARCHAR/TEXT），用于建表和元数据
+        column_types = infer_chunked_column_types(reader.iter_chunks(), settings.NULL_VALUES)
+        creation_info = creator.create_new_dataset(dataset_id, reader.columns, column_types)
+        if not creation_info.get("created", False) and not (metadata_exists and table_exists):
+            raise ImportTaskError(f"数据集创建失败: {creation_info.get('message', '未知错误')}")
+        # 强制重新加载元数据缓存
+        DatasetMetadata.reload_metadata()
+        if creation_info.get("created"):
+            checkpoint["creation"] = {
+                "table_name": creation_info.get("table_name"),
+                "fields_count": creation_info.get("fields_count")
+            }
+            save(checkpoint)
+
+    try:
+        metadata = DatasetMetadata(dataset_id)
+    except ValueError as e:
+        raise ImportTaskError(f"数据集 '{dataset_id}' 不存在且创建失败: {str(e)}")
+
+    valid, error_msg = metadata.validate_import_columns(reader.columns)
+    if not valid:
+        raise ImportTaskError(error_msg)
+
+    service = BaseExperimentalDataService(dataset_id)
+    creation = checkpoint.get("creation")
+
+    engine_note = None
+    if engine == ENGINE_LOAD_DATA:
+        engine_note = load_data_unavailable(reader, metadata.get_all_field_names(), service.table_name)
+        if engine_note:
+            logger.info(f"数据集 {dataset_id} 无法使用 LOAD DATA 导入，回退到分块INSERT: {engine_note}")
+            engine = ENGINE_ROWS
+
+    # replace：新建的数据集本身为空，直接写入；已有数据集写入影子表
+    shadow_table = None
+    if mode == MODE_REPLACE and not creation:
+        shadow_table = checkpoint.get("shadow_table")
+        if shadow_table:
+            schema_registry.invalidate(shadow_table)
+            if not schema_registry.table_exists(shadow_table):
+                # 上次执行已完成 RENAME TABLE，只是未来得及记录任务完成
+                logger.info(f"影子表 {shadow_table} 已换入，任务直接完成")
+                return _import_result(dataset_id, checkpoint)
+        else:
+            shadow_table = service.shadow_table_name(shadow_tag or uuid.uuid4().hex)
+            service.create_shadow_table(shadow_table)
+            checkpoint = {"shadow_table": shadow_table}
+            save(checkpoint)
+        service.use_shadow_table(shadow_table)
+
+    def save_progress(progress: Dict):
+        save({**progress, "shadow_table": shadow_table, "creation": creation})
+
+    if engine == ENGINE_LOAD_DATA:
+        # 写入幂等，续传时从头执行
+        result = service.bulk_load_import(reader.iter_chunks(), created_by, on_progress=save_progress)
+    else:
+        # load_data 引擎留下的检查点不是块级进度，不能用于续传
+        resumable = checkpoint.get("total") and checkpoint.get("engine", ENGINE_ROWS) == ENGINE_ROWS
+        result = service.stream_import(
+            reader.iter_chunks(),
+            created_by,
+            on_chunk=save_progress,
+            resume=checkpoint if resumable else None
+        )
+    if shadow_table:
+        service.swap_shadow_table(shadow_table)
+        logger.info(f"✓ 数据集 {dataset_id} 已由影子表 {shadow_table} 替换")
+    return _import_result(
+        dataset_id, {**result, "creation": creation, "engine": engine, "engine_note": engine_note}
+    )
+
+
+def _import_result(dataset_id: str, state: Dict) -> Dict[str, Any]:
+    """检查点/累计统计 → 导入结果"""
+    result = {
+        "dataset_id": dataset_id,
+        "success": int(state.get("success") or 0),
+        "duplicates": int(state.get("duplicates") or 0),
+        "failed": int(state.get("failed") or 0),
+        "total": int(state.get("total") or 0),
+        "file_duplicates": int(state.get("file_duplicates") or 0),
+        "errors": list(state.get("errors") or []),
+        "engine": state.get("engine") or ENGINE_ROWS
+    }
+    if state.get("engine_note"):
+        result["engine_note"] = state["engine_note"]
+    if state.get("warnings"):
+        result["warnings"] = int(state["warnings"])
+    # 如果是新创建的数据集，添加创建信息
+    creation = state.get("creation")
+    if creation:
+        result["dataset_created"] = True
+        result["table_name"] = creation.get("table_name")
+        result["fields_count"] = creation.get("fields_count")
+        result["creation_message"] = (
+            f"✨ 新数据集 '{dataset_id}' 已自动创建！表名: {creation.get('table_name')}, "
+            f"字段数: {creation.get('fields_count')}"
+        )
+    return result
+
+
+def _drop_shadow_table(dataset_id: str, checkpoint: Optional[Dict]):
+    """删除任务留下的影子表（replace 任务取消或失败时）"""
+    shadow_table = (checkpoint or {}).get("shadow_table")
+    if not shadow_table:
+        return
+    try:
+        BaseExperimentalDataService(dataset_id).drop_shadow_table(shadow_table)
+        logger.info(f"已删除影子表 {shadow_table}")
+    except Exception as e:
+        logger.error(f"✗ 删除影子表 {shadow_table} 失败: {str(e)}")
+
+
+class ImportTaskManager:
+    """导入任务的创建、执行、续传、查询与取消"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max(1, max_workers or settings.IMPORT_WORKERS)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stopping = False
+        # 本进程正在执行或排队的任务 -> 取消标记（跨进程的取消通过任务表状态传递）
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="import-worker"
+                )
+            return self._executor
+
+    @staticmethod
+    def _execute(sql: str, params: tuple = ()) -> int:
+        """执行一条写语句并提交，返回影响行数"""
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _fetch_one(sql: str, params: tuple = ()) -> Optional[Dict]:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        finally:
+            conn.close()
+
+    def _load_checkpoint(self, task_id: str) -> Optional[Dict]:
+        row = self._fetch_one(f"SELECT checkpoint FROM `{TASKS_TABLE}` WHERE task_id = %s", (task_id,))
+        return json.loads(row['checkpoint']) if row and row['checkpoint'] else None
+
+    def _enqueue(self, task_id: str):
+        """放入本进程的工作线程池（已在本进程排队或执行的任务不重复放入）"""
+        with self._lock:
+            if task_id in self._cancel_events:
+                return
+            self._cancel_events[task_id] = threading.Event()
+        self._get_executor().submit(self._run, task_id)
+
+    # ========== 任务提交 ==========
+
+    def submit(self, dataset_id: str, filename: str, file_path: str, created_by: str,
+               mode: str = MODE_APPEND, engine: str = ENGINE_ROWS) -> Dict:
+        """
+        创建任务并放入工作线程池
+
+        Args:
+            dataset_id: 数据集ID
+            filename: 上传的原始文件名
+            file_path: 落盘的上传文件（任务结束后删除）
+            created_by: 导入者
+            mode: append / replace
+            engine: rows / load_data
+
+        Returns:
+            任务信息（见 get）
+        """
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"无效的导入模式: {mode}")
+        if engine not in IMPORT_ENGINES:
+            raise ValueError(f"无效的导入引擎: {engine}")
+        task_id = uuid.uuid4().hex
+        self._execute(
+            f"""
+            INSERT INTO `{TASKS_TABLE}` (task_id, batch_id, filename, file_path, mode, engine, status, created_by)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (task_id, dataset_id, filename, file_path, mode, engine, STATUS_PENDING, created_by)
+        )
+        self._enqueue(task_id)
+        logger.info(f"导入任务已创建: {task_id} dataset={dataset_id} mode={mode} engine={engine} file={filename}")
+        return self.get(task_id)
+
+    # ========== 任务执行 ==========
+
+    def _claim(self, task_id: str) -> bool:
+        """认领任务（pending，或心跳超时的 processing），多个进程同时认领时只有一个成功"""
+        return self._execute(
+            f"""
+            UPDATE `{TASKS_TABLE}`
+            SET status = %s, started_at = COALESCE(started_at, NOW()), heartbeat_at = NOW(),
+                attempts = attempts + 1, error_message = NULL
+            WHERE task_id = %s AND {RECLAIMABLE_SQL}
+            """,
+            (STATUS_PROCESSING, task_id, settings.IMPORT_TASK_STALE_SECONDS)
+        ) > 0
+
+    def _start_heartbeat(self, task_id: str) -> threading.Event:
+        """启动任务的心跳线程（定期刷新 heartbeat_at），返回的事件 set() 后停止"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(settings.IMPORT_TASK_HEARTBEAT_SECONDS):
+                try:
+                    self._execute(
+                        f"UPDATE `{TASKS_TABLE}` SET heartbeat_at = NOW() WHERE task_id = %s AND status = %s",
+                        (task_id, STATUS_PROCESSING)
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠ 刷新导入任务 {task_id} 心跳失败: {str(e)}")
+
+        threading.Thread(target=beat, name=f"import-heartbeat-{task_id[:8]}", daemon=True).start()
+        return stop
+
+    def _run(self, task_id: str):
+        """工作线程入口"""
+        try:
+            task = self._fetch_one(f"SELECT * FROM `{TASKS_TABLE}` WHERE task_id = %s", (task_id,))
+            claimed = task is not None and self._claim(task_id)
+        except Exception as e:
+            logger.error(f"✗ 认领导入任务失败: {task_id}: {str(e)}")
+            claimed = False
+        if not claimed:
+            # 排队期间已被取消、或已被其他进程认领
+            self._cancel_events.pop(task_id, None)
+            logger.info(f"导入任务 {task_id} 已取消或由其他进程执行，跳过")
+            return
+
+        checkpoint = json.loads(task['checkpoint']) if task.get('checkpoint') else None
+        if checkpoint:
+            logger.info(f"导入任务 {task_id} 从检查点继续: 已处理 {checkpoint.get('total', 0)} 行")
+        finished = True
+        heartbeat = self._start_heartbeat(task_id)
+        try:
+            result = execute_import(
+                task['batch_id'],
+                task['file_path'],
+                task['created_by'],
+                mode=task['mode'],
+                engine=task.get('engine') or ENGINE_ROWS,
+                checkpoint=checkpoint,
+                shadow_tag=task_id,
+                on_checkpoint=lambda state: self._checkpoint(task_id, state),
+                on_total=lambda total: self._execute(
+                    f"UPDATE `{TASKS_TABLE}` SET total_rows = %s, heartbeat_at = NOW() WHERE task_id = %s",
+                    (total, task_id)
+                )
+            )
+            result = {"message": "导入完成", "filename": task['filename'], **result}
+            self._finish(task_id, STATUS_COMPLETED, result)
+            logger.info(
+                f"✓ 导入任务完成: {task_id} 成功 {result['success']} 重复 {result['duplicates']} "
+                f"文件内重复 {result['file_duplicates']} 失败 {result['failed']}"
+            )
+        except ImportCancelled as e:
+            if self._stopping:
+                # 服务关闭：退回 pending，重启后从检查点继续
+                finished = False
+                self._execute(
+                    f"UPDATE `{TASKS_TABLE}` SET status = %s WHERE task_id = %s AND status = %s",
+                    (STATUS_PENDING, task_id, STATUS_PROCESSING)
+                )
+                logger.warning(f"⚠ 服务关闭，导入任务暂停，重启后继续: {task_id}")
+            else:
+                _drop_shadow_table(task['batch_id'], self._load_checkpoint(task_id))
+                progress = e.args[0] if e.args else {}
+                self._finish(task_id, STATUS_CANCELLED, _import_result(task['batch_id'], progress))
+                logger.info(f"导入任务已取消: {task_id}")
+        except Exception as e:
+            logger.error(f"✗ 导入任务失败: {task_id}: {str(e)}", exc_info=True)
+            _drop_shadow_table(task['batch_id'], self._load_checkpoint(task_id))
+            self._finish(task_id, STATUS_FAILED, error_message=str(e))
+        finally:
+            heartbeat.set()
+            self._cancel_events.pop(task_id, None)
+            if finished:
+                remove_spooled(task['file_path'])
+
+    def _checkpoint(self, task_id: str, state: Dict):
+        """
+        保存检查点、更新进度和心跳，并检查是否已被取消
+
+        Raises:
+            ImportCancelled: 任务已被取消或服务正在关闭（携带截至目前的导入统计）
+        """
+        rows = int(state.get("total") or 0)
+        self._execute(
+            f"""
+            UPDATE `{TASKS_TABLE}`
+            SET current_row = %s, success_count = %s, failed_count = %s,
+                progress = LEAST(99, IF(total_rows > 0, FLOOR(%s * 100 / total_rows), 0)),
+                checkpoint = %s, heartbeat_at = NOW()
+            WHERE task_id = %s
+            """,
+            (
+                rows, int(state.get("success") or 0), int(state.get("failed") or 0), rows,
+                json.dumps(state, ensure_ascii=False, default=str), task_id
+            )
+        )
+        event = self._cancel_events.get(task_id)
+        if event is not None and event.is_set():
+            raise ImportCancelled(state)
+        row = self._fetch_one(f"SELECT status FROM `{TASKS_TABLE}` WHERE task_id = %s", (task_id,))
+        if row is None or row['status'] == STATUS_CANCELLED:
+            raise ImportCancelled(state)
+
+    def _finish(self, task_id: str, status: str, result: Optional[Dict] = None,
+                error_message: Optional[str] = None):
+        """记录任务结束状态（已取消的任务只补充结果，不改回其他状态）"""
+        assignments = ["status = IF(status = %s, status, %s)", "error_message = %s", "completed_at = NOW()"]
+        params: List[Any] = [STATUS_CANCELLED, status, error_message]
+        if status == STATUS_COMPLETED:
+            assignments.append("progress = 100")
+        if result is not None:
+            assignments += [
+                "current_row = %s", "success_count = %s", "failed_count = %s", "failed_rows = %s", "result = %s"
+            ]
+            params += [
+                result["total"], result["success"], result["failed"],
+                json.dumps(result.get("errors") or [], ensure_ascii=False),
+                json.dumps(result, ensure_ascii=False, default=str)
+            ]
+        self._execute(
+            f"UPDATE `{TASKS_TABLE}` SET {', '.join(assignments)} WHERE task_id = %s",
+            tuple(params + [task_id])
+        )
+
+    # ========== 中断任务续传 ==========
+
+    def resume_interrupted(self) -> int:
+        """
+        认领无人执行的任务并放入本进程的工作线程池
+
+        包括 pending 任务（重启前排队或被暂停）和心跳超时的 processing 任务（进程崩溃）。
+        上传文件已丢失或执行次数达到 settings.IMPORT_TASK_MAX_ATTEMPTS 的任务标记为失败。
+
+        Returns:
+            放入线程池的任务数
+        """
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT task_id, batch_id, file_path, status, attempts, checkpoint FROM `{TASKS_TABLE}`
+                WHERE {RECLAIMABLE_SQL} ORDER BY created_at, id
+                """,
+                (settings.IMPORT_TASK_STALE_SECONDS,)
+            )
+            candidates = cursor.fetchall()
+        finally:
+            conn.close()
+
+        resumed = 0
+        for task in candidates:
+            task_id = task['task_id']
+            if task_id in self._cancel_events:
+                continue
+            if task['attempts'] >= settings.IMPORT_TASK_MAX_ATTEMPTS:
+                reason = f"已重试 {task['attempts']} 次仍未完成"
+            elif not task['file_path'] or not os.path.exists(task['file_path']):
+                reason = "上传文件已丢失，无法继续导入"
+            else:
+                self._enqueue(task_id)
+                resumed += 1
+                continue
+            # 条件更新：只有仍处于可认领状态时才标记失败（避免与其他进程冲突）
+            if self._execute(
+                f"""
+                UPDATE `{TASKS_TABLE}` SET status = %s, error_message = %s, completed_at = NOW()
+                WHERE task_id = %s AND {RECLAIMABLE_SQL}
+                """,
+                (STATUS_FAILED, reason, task_id, settings.IMPORT_TASK_STALE_SECONDS)
+            ):
+                checkpoint = json.loads(task['checkpoint']) if task['checkpoint'] else None
+                _drop_shadow_table(task['batch_id'], checkpoint)
+                remove_spooled(task['file_path'])
+                logger.warning(f"⚠ 导入任务 {task_id} 无法继续: {reason}")
+        if resumed:
+            logger.info(f"✓ 继续执行 {resumed} 个中断的导入任务")
+        return resumed
+
+    @staticmethod
+    def _ensure_table():
+        conn = get_connection()
+        try:
+            ensure_tasks_table(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+
+    def start(self):
+        """
+        启动巡检线程（应用启动时调用）：立即续传一次，之后定期检查
+
+        不访问数据库，数据库暂不可用时也能启动；巡检线程先确保任务表存在，失败时下次巡检重试。
+        """
+        if self._sweeper is not None:
+            return
+        self._stopping = False
+        self._sweeper_stop.clear()
+
+        def sweep():
+            table_ready = False
+            while not self._sweeper_stop.is_set():
+                try:
+                    if not table_ready:
+                        self._ensure_table()
+                        table_ready = True
+                    self.resume_interrupted()
+                except Exception as e:
+                    logger.error(f"✗ 导入任务巡检失败: {str(e)}")
+                self._sweeper_stop.wait(settings.IMPORT_TASK_SWEEP_SECONDS)
+
+        self._sweeper = threading.Thread(target=sweep, name="import-task-sweeper", daemon=True)
+        self._sweeper.start()
+
+    # ========== 查询与取消 ==========
+
+    @staticmethod
+    def _format(row: Dict) -> Dict:
+        """任务表记录 → 接口响应"""
+        task = dict(row)
+        task["dataset_id"] = task.pop("batch_id")
+        for column in ("file_path", "id", "checkpoint", "heartbeat_at"):
+            task.pop(column, None)
+        failed_rows = task.pop("failed_rows", None)
+        task["errors"] = json.loads(failed_rows) if failed_rows else None
+        if "result" in task:
+            task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        """获取任务详情（不存在时返回None）"""
+        row = self._fetch_one(f"SELECT * FROM `{TASKS_TABLE}` WHERE task_id = %s", (task_id,))
+        return self._format(row) if row else None
+
+    def list(self, dataset_id: Optional[str] = None, status: Optional[str] = None,
+             limit: int = 20) -> List[Dict]:
+        """按创建时间倒序列出任务（不含失败行详情与导入结果）"""
+        conditions, params = [], []
+        if dataset_id:
+            conditions.append("batch_id = %s")
+            params.append(dataset_id)
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM `{TASKS_TABLE}` {where_sql} ORDER BY created_at DESC, id DESC LIMIT %s",
+                tuple(params + [limit])
+            )
+            return [self._format(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def cancel(self, task_id: str) -> Optional[Dict]:
+        """
+        取消排队中或执行中的任务（执行中的任务在当前块完成后停止，已提交的块保留）
+
+        Returns:
+            取消后的任务信息；任务不存在时返回None
+
+        Raises:
+            ValueError: 任务已结束
+        """
+        task = self.get(task_id)
+        if task is None:
+            return None
+        if task["status"] in TERMINAL_STATUSES:
+            raise ValueError(f"任务已结束（{task['status']}），无法取消")
+        row = self._fetch_one(
+            f"SELECT file_path, checkpoint FROM `{TASKS_TABLE}` WHERE task_id = %s", (task_id,)
+        )
+        cancelled_pending = self._execute(
+            f"""
+            UPDATE `{TASKS_TABLE}` SET status = %s, completed_at = NOW()
+            WHERE task_id = %s AND status = %s
+            """,
+            (STATUS_CANCELLED, task_id, STATUS_PENDING)
+        )
+        if cancelled_pending:
+            # 没有工作线程在执行，由这里清理（暂停后排队的 replace 任务可能留有影子表）
+            _drop_shadow_table(task["dataset_id"], json.loads(row['checkpoint']) if row['checkpoint'] else None)
+            remove_spooled(row['file_path'])
+        self._execute(
+            f"""
+            UPDATE `{TASKS_TABLE}`
+            SET status = %s WHERE task_id = %s AND status = %s
+            """,
+            (STATUS_CANCELLED, task_id, STATUS_PROCESSING)
+        )
+        event = self._cancel_events.get(task_id)
+        if event is not None:
+            event.set()
+        return self.get(task_id)
+
+    def shutdown(self):
+        """
+        应用关闭时停止巡检和工作线程池
+
+        执行中的任务在当前块完成后退回 pending，排队中的任务保持 pending，重启后从检查点继续。
+        """
+        self._stopping = True
+        self._sweeper_stop.set()
+        self._sweeper = None
+        for event in list(self._cancel_events.values()):
+            event.set()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# 进程级单例
+import_task_manager = ImportTaskManager()
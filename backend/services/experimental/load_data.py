@@ -0,0 +1,396 @@
+"""LOAD DATA 快速导入 - 大CSV文件的集合式写入路径
+
+常规导入（stream_import → batch_import → BulkWriter）每块都要把行转换为字典、
+IN 探测已有指纹，再拼接多行INSERT由服务器逐条解析。对于列与数据集字段完全一致的
+大CSV，导入任务可选择 engine=load_data 走本模块：
+
+1. 规范化：流式读取文件，逐块剔除文件内重复行、按 type_inference.check_value 检查
+   数值/日期列的值（与常规路径相同，不符的行记为失败、不写出）、计算行指纹，
+   把空值标记（settings.NULL_VALUES）和空白转换为 \\N，写成 UTF-8 的制表符分隔临时文件
+2. 加载：LOAD DATA LOCAL INFILE 写入暂存表（CREATE TABLE ... LIKE 数据表，去掉二级索引）
+3. 去重写入：按暂存表 id 分段（settings.IMPORT_LOAD_DATA_SEGMENT_ROWS 行）执行
+   INSERT IGNORE ... SELECT ... WHERE NOT EXISTS（走数据表的指纹索引），每段一个事务，
+   同时维护行数和覆盖率统计（写入前在暂存表上统计本段新行的覆盖率增量）；
+   检索文本、每行非空字段数在服务器端计算
+4. 删除暂存表和临时文件
+
+与常规路径的差异：
+- 文本列中的空值标记同样存为 NULL（常规路径只转换数值/日期列）
+- 类型检查之外 LOAD DATA 仍产生的警告（写入的是截断或转换后的值）计入 warnings，
+  前几条警告计入 errors；这些行已写入，计入 success / duplicates，不计入 failed
+- 写入是幂等的：中断后重新执行时已写入的行按指纹计为重复，因此不需要块级检查点
+
+前提（不满足时 load_data_unavailable 返回原因，导入回退到常规路径）：
+CSV 文件、列与数据集字段完全一致、数据表已有行指纹列、服务器开启 local_infile。
+"""
+import os
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from backend.config import Settings
+from backend.services.experimental.file_dedupe import FileDeduper
+from backend.services.experimental.coverage_state import (
+    COVERAGE_COLUMN, CoverageDelta, coverage_histogram, filled_count_sql
+)
+from backend.services.experimental.fingerprint import FINGERPRINT_COLUMN, compute_fingerprint
+from backend.services.experimental.search_index import SEARCH_COLUMN, search_text_sql
+from backend.services.experimental.type_inference import check_value
+from backend.services.experimental.upload_reader import UploadReader, dataframe_to_records
+from backend.utils.db_pool import connect_direct, get_connection
+from backend.utils.logger import get_logger
+from backend.utils.null_values import null_mask, null_token_set
+from backend.utils.schema_registry import quote_column, schema_registry
+
+
+settings = Settings()
+logger = get_logger(__name__)
+
+ENGINE_ROWS = "rows"
+ENGINE_LOAD_DATA = "load_data"
+IMPORT_ENGINES = (ENGINE_ROWS, ENGINE_LOAD_DATA)
+
+# LOAD DATA 默认格式：制表符分隔、反斜杠转义、\N 为 NULL
+NULL_MARKER = "\\N"
+_ESCAPES = (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r"))
+
+
+def local_infile_enabled() -> bool:
+    """服务器是否允许 LOAD DATA LOCAL INFILE（@@GLOBAL.local_infile）"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT @@GLOBAL.local_infile AS enabled")
+        row = cursor.fetchone()
+        return bool(row and int(row['enabled']))
+    finally:
+        conn.close()
+
+
+def load_data_unavailable(reader: UploadReader, field_names: Sequence[str], table_name: str) -> Optional[str]:
+    """
+    检查能否使用 LOAD DATA 快速导入
+
+    Returns:
+        不能使用的原因；可以使用时返回None
+    """
+    if not reader.is_csv:
+        return "LOAD DATA 仅支持CSV文件"
+    if len(reader.columns) != len(field_names) or set(reader.columns) != set(field_names):
+        return "文件列与数据集字段不完全一致（存在重复列）"
+    if not schema_registry.has_column(table_name, FINGERPRINT_COLUMN):
+        return "数据表缺少行指纹列（先执行 migrate_datasets.py --step row_fingerprint）"
+    try:
+        if not local_infile_enabled():
+            return "MySQL 未开启 local_infile"
+    except Exception as e:
+        return f"无法读取 local_infile 设置: {str(e)}"
+    return None
+
+
+def encode_column(series: pd.Series, null_tokens: FrozenSet[str]) -> pd.Series:
+    """
+    一列数据 → LOAD DATA 字段文本（向量化）
+
+    数字按 Python 的 str 格式（与 pymysql 写入常规路径时一致），
+    文本转义反斜杠、制表符和换行；空值、空白和空值标记写为 \\N。
+    """
+    null = null_mask(series, null_tokens)
+    if pd.api.types.is_bool_dtype(series):
+        text = series.astype(int).astype(str)
+    elif pd.api.types.is_numeric_dtype(series):
+        text = series.astype(str)
+    else:
+        text = series.astype(str)
+        for old, new in _ESCAPES:
+            text = text.str.replace(old, new, regex=False)
+    return text.mask(null, NULL_MARKER)
+
+
+class LoadDataImporter:
+    """把分块读取的CSV经暂存表集合式写入数据表"""
+
+    def __init__(self, table_name: str, field_names: List[str], null_values: Iterable[str],
+                 has_search_column: bool = False, segment_rows: Optional[int] = None,
+                 coverage_fields: Optional[List[str]] = None, has_coverage_column: bool = False,
+                 field_types: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None):
+        """
+        Args:
+            table_name: 目标数据表
+            field_names: 全部数据字段（按元数据顺序）
+            null_values: 空值标记（settings.NULL_VALUES）
+            has_search_column: 数据表是否有检索列
+            segment_rows: 每个 INSERT ... SELECT 事务的行数，默认 settings.IMPORT_LOAD_DATA_SEGMENT_ROWS
+            coverage_fields: 参与覆盖率计算的字段；指定时每段计算覆盖率增量
+            has_coverage_column: 数据表是否有每行非空字段数列
+            field_types: 数值/日期字段 → (元数据类型, 列类型)，写出前按 check_value 检查
+        """
+        self.table_name = table_name
+        self.field_names = list(field_names)
+        self.null_values = list(null_values)
+        self.null_tokens = null_token_set(self.null_values)
+        self.has_search_column = has_search_column
+        self.coverage_fields = coverage_fields
+        self.has_coverage_column = has_coverage_column
+        self.field_types = dict(field_types or {})
+        self.segment_rows = max(1, segment_rows or settings.IMPORT_LOAD_DATA_SEGMENT_ROWS)
+        self.staging_table = f"{table_name[:40]}__stage_{uuid.uuid4().hex[:12]}"
+
+    def _columns_sql(self, columns: Iterable[str]) -> str:
+        # 语句带参数执行，列名中的 % 需要转义
+        return ", ".join(quote_column(column) for column in columns)
+
+    # ========== 1. 规范化 ==========
+
+    def _check_types(self, chunk: pd.DataFrame, errors: List[str]) -> Tuple[pd.DataFrame, int]:
+        """
+        检查数值/日期字段的值（与常规路径的 _normalize_values 相同）
+
+        整数列的数字文本（如 "2000.0"）写为整数；值与类型不符的行被剔除，前10条原因追加到 errors。
+
+        Returns:
+            (通过检查的行, 剔除的行数)
+        """
+        fields = [field for field in self.field_types if field in chunk.columns]
+        if not fields:
+            return chunk, 0
+        chunk = chunk.copy()
+        row_errors: Dict[Any, List[str]] = {}
+        for field in fields:
+            field_type, sql_type = self.field_types[field]
+            column = chunk[field]
+            values = column[~null_mask(column, self.null_tokens)]
+            converted = {}
+            for idx, value in values.items():
+                new_value, error = check_value(value, field_type, sql_type)
+                if error:
+                    row_errors.setdefault(idx, []).append(f"{field}={value!r} {error}")
+                else:
+                    converted[idx] = str(new_value).strip()
+            if converted:
+                chunk.loc[list(converted), field] = list(converted.values())
+        if not row_errors:
+            return chunk, 0
+        for idx in sorted(row_errors)[:max(0, 10 - len(errors))]:
+            errors.append(f"第{idx + 1}行: 字段值与类型不符: " + "; ".join(row_errors[idx]))
+        return chunk.drop(index=list(row_errors)), len(row_errors)
+
+    def normalize(self, chunks: Iterable[pd.DataFrame], out_path: str,
+                  on_chunk: Optional[Callable[[Dict], None]] = None) -> Dict[str, Any]:
+        """
+        流式写出 LOAD DATA 文件（字段按元数据顺序，最后一列为行指纹）
+
+        Returns:
+            {"total": 文件行数, "staged": 写出行数, "file_duplicates": 文件内重复行数,
+             "failed": 值与类型不符的行数, "errors": 前10条失败原因,
+             "max_lengths": 各字段非空值的最大长度}
+        """
+        deduper = FileDeduper(self.null_values)
+        stats = {"total": 0, "staged": 0, "file_duplicates": 0, "failed": 0, "errors": []}
+        max_lengths: Dict[str, int] = {}
+        with open(out_path, "w", encoding="utf-8", newline="") as out:
+            for chunk in chunks:
+                stats["total"] += len(chunk)
+                chunk, _ = deduper.filter(chunk)
+                stats["file_duplicates"] = deduper.duplicates
+                if not chunk.empty:
+                    chunk, failed = self._check_types(chunk[self.field_names], stats["errors"])
+                    stats["failed"] += failed
+                if not chunk.empty:
+                    fingerprints = pd.Series(
+                        [compute_fingerprint(row, self.field_names, self.null_tokens)
+                         for row in dataframe_to_records(chunk)],
+                        index=chunk.index
+                    )
+                    encoded = [encode_column(chunk[field], self.null_tokens) for field in self.field_names]
+                    for field in self.field_names:
+                        values = chunk[field][~null_mask(chunk[field], self.null_tokens)]
+                        if not values.empty:
+                            length = int(values.astype(str).str.len().max())
+                            max_lengths[field] = max(max_lengths.get(field, 0), length)
+                    lines = encoded[0].str.cat(encoded[1:] + [fingerprints], sep="\t")
+                    out.write("\n".join(lines))
+                    out.write("\n")
+                    stats["staged"] += len(chunk)
+                if on_chunk:
+                    on_chunk(stats)
+        stats["max_lengths"] = max_lengths
+        return stats
+
+    # ========== 2. 加载到暂存表 ==========
+
+    def _create_staging_table(self, cursor):
+        """按数据表结构创建暂存表，去掉二级索引（加载时不维护索引）"""
+        cursor.execute(f"DROP TABLE IF EXISTS `{self.staging_table}`")
+        cursor.execute(f"CREATE TABLE `{self.staging_table}` LIKE `{self.table_name}`")
+        cursor.execute(
+            """
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY'
+            """,
+            (self.staging_table,)
+        )
+        indexes = [row['INDEX_NAME'] for row in cursor.fetchall()]
+        if indexes:
+            drops = ", ".join(f"DROP INDEX `{index}`" for index in indexes)
+            cursor.execute(f"ALTER TABLE `{self.staging_table}` {drops}")
+
+    def _load(self, cursor, path: str) -> Dict[str, Any]:
+        """LOAD DATA LOCAL INFILE 写入暂存表，返回 {"warnings": 警告数, "errors": 前10条警告}"""
+        columns = self._columns_sql(self.field_names + [FINGERPRINT_COLUMN])
+        cursor.execute(
+            f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE `{self.staging_table}` CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'
+            ({columns})
+            """,
+            (path,)
+        )
+        cursor.execute("SHOW COUNT(*) WARNINGS")
+        warnings = int(next(iter(cursor.fetchone().values())) or 0)
+        errors = []
+        if warnings:
+            cursor.execute("SHOW WARNINGS LIMIT 10")
+            errors = [f"LOAD DATA: {row['Message']}" for row in cursor.fetchall()]
+        return {"warnings": warnings, "errors": errors}
+
+    # ========== 3. 去重写入数据表 ==========
+
+    def _insert_segments(self, conn, created_by: str,
+                         before_commit: Optional[Callable[[Any, int, Optional[CoverageDelta]], None]],
+                         on_segment: Optional[Callable[[int], None]]) -> int:
+        """按暂存表 id 分段写入数据表中不存在的指纹，返回写入行数"""
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM `{self.staging_table}`")
+        max_id = int(cursor.fetchone()['max_id'])
+
+        data_columns = self.field_names + [FINGERPRINT_COLUMN]
+        target_columns = list(data_columns)
+        select_list = self._columns_sql(data_columns)
+        if self.has_search_column:
+            target_columns.append(SEARCH_COLUMN)
+            # search_text_sql 返回的表达式中列名的 % 已转义
+            select_list += ", " + search_text_sql(self.field_names)
+        select_params: List = []
+        if self.has_coverage_column and self.coverage_fields is not None:
+            filled_sql, select_params = filled_count_sql(self.coverage_fields)
+            target_columns.append(COVERAGE_COLUMN)
+            select_list += ", " + filled_sql
+        target_columns += ["created_by", "updated_by"]
+
+        segment_where = f"""
+            s.id > %s AND s.id <= %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM `{self.table_name}` m
+                  WHERE m.`{FINGERPRINT_COLUMN}` = s.`{FINGERPRINT_COLUMN}`
+              )
+        """
+        sql = f"""
+            INSERT IGNORE INTO `{self.table_name}` ({self._columns_sql(target_columns)})
+            SELECT {select_list}, %s, %s FROM `{self.staging_table}` s
+            WHERE {segment_where}
+            ORDER BY s.id
+        """
+        inserted = 0
+        for start in range(0, max_id, self.segment_rows):
+            bounds = [start, start + self.segment_rows]
+            # 写入前统计本段将写入的行；实际写入行数不一致（段内指纹重复、并发写入）时增量未知
+            delta = None
+            if self.coverage_fields is not None:
+                histogram, field_counts = coverage_histogram(
+                    cursor, self.staging_table, self.coverage_fields, segment_where, bounds
+                )
+            count = cursor.execute(sql, select_params + [created_by, created_by] + bounds)
+            if self.coverage_fields is not None and sum(histogram.values()) == count:
+                delta = CoverageDelta()
+                delta.add_histogram(histogram, field_counts)
+            if before_commit:
+                before_commit(cursor, count, delta)
+            conn.commit()
+            inserted += count
+            if on_segment:
+                on_segment(inserted)
+        return inserted
+
+    # ========== 入口 ==========
+
+    def run(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        created_by: str,
+        before_load: Optional[Callable[[Dict[str, int]], None]] = None,
+        before_commit: Optional[Callable[[Any, int, Optional[CoverageDelta]], None]] = None,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        执行导入（阻塞调用）
+
+        Args:
+            chunks: DataFrame 块序列（UploadReader.iter_chunks）
+            created_by: 导入者
+            before_load: 规范化完成、创建暂存表之前调用 before_load(各字段非空值的最大长度)，
+                用于加宽容纳不下新值的 VARCHAR 列（暂存表按加宽后的数据表结构创建）
+            before_commit: 每段提交前调用 before_commit(cursor, 写入行数, 覆盖率增量)，
+                用于维护行数、覆盖率统计；覆盖率增量未知时为None
+            on_progress: 进度变化时调用 on_progress(累计统计)，可抛出异常中止导入
+                （已提交的段保留，暂存表和临时文件照常删除）
+
+        Returns:
+            导入统计信息（与 stream_import 相同的字段，另有 engine、warnings：
+            LOAD DATA 警告数，对应的行已写入）
+        """
+        result = {
+            "engine": ENGINE_LOAD_DATA, "phase": "normalize",
+            "success": 0, "duplicates": 0, "failed": 0, "warnings": 0, "total": 0, "file_duplicates": 0,
+            "errors": []
+        }
+
+        def report(**changes):
+            result.update(changes)
+            if on_progress:
+                on_progress(result)
+
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="load_", suffix=".tsv", dir=settings.UPLOAD_DIR)
+        os.close(fd)
+        conn = None
+        try:
+            stats = self.normalize(
+                chunks, path,
+                on_chunk=lambda s: report(
+                    total=s["total"], file_duplicates=s["file_duplicates"], failed=s["failed"], errors=s["errors"]
+                )
+            )
+            if before_load:
+                before_load(stats["max_lengths"])
+
+            conn = connect_direct(local_infile=True)
+            cursor = conn.cursor()
+            self._create_staging_table(cursor)
+            loaded = self._load(cursor, path)
+            conn.commit()
+            report(
+                phase="insert", warnings=loaded["warnings"],
+                errors=(stats["errors"] + loaded["errors"])[:10]
+            )
+
+            inserted = self._insert_segments(
+                conn, created_by, before_commit,
+                on_segment=lambda count: report(success=count)
+            )
+            result.update(success=inserted, duplicates=stats["staged"] - inserted, phase="done")
+            return result
+        finally:
+            if conn is not None:
+                try:
+                    conn.rollback()
+                    conn.cursor().execute(f"DROP TABLE IF EXISTS `{self.staging_table}`")
+                    conn.commit()
+                except Exception as e:
+                    logger.error(f"✗ 删除暂存表 {self.staging_table} 失败: {str(e)}")
+                finally:
+                    conn.close()
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,92 @@
+"""全文检索 - 基于 MySQL FULLTEXT（ngram 分词）的数据集搜索索引
+
+原搜索对每个数据字段执行 LIKE '%kw%' 并用 OR 连接，必然全表扫描，
+且每行要计算几十个 LIKE。现在每个数据表维护一个检索列：
+
+- search_text：所有数据字段值拼接成的文本，由写操作在同一事务内维护；
+  新增、更新、导入和回填统一由 search_text_sql 在MySQL中按列中存储的值计算，
+  数值、日期的文本形式与查询时看到的一致
+- ft_search_text：search_text 上的 FULLTEXT 索引，使用 ngram 分词器（支持中文）
+
+查询方式（BaseExperimentalDataService.search 按顺序选择）：
+- fulltext: MATCH ... AGAINST 布尔模式短语查询，走全文索引，可按相关度排序
+- like: 关键词短于 ngram 分词长度时，对 search_text 单列执行 LIKE
+- scan: 表尚未迁移（没有检索列）时，退回原来的多字段 LIKE
+
+历史表通过 scripts/migrate_datasets.py --step search_index 补齐检索列并建立索引。
+"""
+from typing import Iterable, List, Optional
+
+from backend.config import Settings
+
+settings = Settings()
+
+# 检索列与全文索引名称
+SEARCH_COLUMN = "search_text"
+FULLTEXT_INDEX = "ft_search_text"
+
+# MySQL ngram 分词长度（须与服务器参数 ngram_token_size 一致，见 settings.SEARCH_NGRAM_TOKEN_SIZE）
+NGRAM_TOKEN_SIZE = settings.SEARCH_NGRAM_TOKEN_SIZE
+
+# 布尔模式下有特殊含义的字符，构造查询时替换为空格
+BOOLEAN_OPERATORS = '+-<>()~*"@'
+
+# 查询方式
+ENGINE_FULLTEXT = "fulltext"
+ENGINE_LIKE = "like"
+ENGINE_SCAN = "scan"
+
+
+def search_text_sql(fields: Iterable[str]) -> str:
+    """
+    在MySQL中拼接检索文本的表达式（写入、更新和回填共用，NULL值被跳过）
+
+    返回的表达式用于参数化查询，列名中的%已转义为%%。
+    """
+    columns = ", ".join(
+        "`" + field.replace("`", "``").replace("%", "%%") + "`" for field in fields
+    )
+    return f"CONCAT_WS(' ', {columns})"
+
+
+def fulltext_query(keyword: str) -> Optional[str]:
+    """
+    把搜索关键词转换为布尔模式的全文查询
+
+    以空白分隔的每个词都必须出现（+"词"）；使用短语查询，ngram 分词下
+    等价于子串匹配，与原 LIKE 搜索的语义一致。
+
+    Returns:
+        查询字符串；有词短于 ngram 分词长度（无法用全文索引匹配）时返回None
+    """
+    cleaned = keyword
+    for char in BOOLEAN_OPERATORS:
+        cleaned = cleaned.replace(char, " ")
+    terms = cleaned.split()
+    if not terms or any(len(term) < NGRAM_TOKEN_SIZE for term in terms):
+        return None
+    return " ".join(f'+"{term}"' for term in terms)
+
+
+def search_condition(keyword: str, has_search_column: bool, fields: List[str]):
+    """
+    构建搜索条件
+
+    Args:
+        keyword: 搜索关键词
+        has_search_column: 数据表是否已有检索列
+        fields: 可搜索字段（没有检索列时逐字段LIKE）
+
+    Returns:
+        (查询方式, WHERE子句, 参数列表)
+    """
+    if has_search_column:
+        query = fulltext_query(keyword)
+        if query is not None:
+            return ENGINE_FULLTEXT, f"MATCH(`{SEARCH_COLUMN}`) AGAINST(%s IN BOOLEAN MODE)", [query]
+        return ENGINE_LIKE, f"`{SEARCH_COLUMN}` LIKE %s", [f"%{keyword}%"]
+
+    clauses = [
+        "`" + field.replace("`", "``").replace("%", "%%") + "` LIKE %s" for field in fields
+    ]
+    return ENGINE_SCAN, " OR ".join(clauses), [f"%{keyword}%"] * len(fields)
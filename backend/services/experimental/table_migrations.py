@@ -0,0 +1,493 @@
+"""数据表结构迁移 - 为已有的 exp_data_* 表补齐索引、辅助列和列类型
+
+新建的数据表由 DatasetCreator.create_database_table 直接生成完整结构；
+此模块负责把历史数据表升级到相同结构，由 scripts/migrate_datasets.py 调用。
+每个迁移步骤都是幂等的，可重复执行。
+"""
+from typing import Callable, Dict, List
+
+from backend.config import settings
+from backend.models.experimental.metadata import DatasetMetadata
+from backend.services.experimental.count_service import row_counter
+from backend.services.experimental.coverage_state import (
+    COVERAGE_COLUMN, COVERAGE_INDEX, coverage_fields, coverage_state, filled_count_sql
+)
+from backend.services.experimental.fingerprint import (
+    FINGERPRINT_COLUMN, FINGERPRINT_INDEX, compute_fingerprint, is_duplicate_key_error
+)
+from backend.services.experimental.search_index import FULLTEXT_INDEX, SEARCH_COLUMN, search_text_sql
+from backend.services.experimental.type_inference import (
+    DATE_PATTERN, DEFAULT_COLUMN_TYPE, INT_PATTERN, NUMBER_PATTERN,
+    decide_column_type, empty_profile, fit_row_size, text_column_type, varchar_length
+)
+from backend.utils.logger import get_logger
+from backend.utils.null_values import NULL_TOKENS
+from backend.utils.schema_registry import quote_column
+
+
+logger = get_logger(__name__)
+
+# 分页索引：支撑 ORDER BY created_at DESC, id DESC 的游标分页
+PAGINATION_INDEX = "idx_created_at_id"
+
+
+def index_exists(cursor, table_name: str, index_name: str) -> bool:
+    """检查表上是否已存在指定索引"""
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+        """,
+        (table_name, index_name)
+    )
+    return cursor.fetchone() is not None
+
+
+def column_exists(cursor, table_name: str, column_name: str) -> bool:
+    """检查表上是否已存在指定列"""
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        LIMIT 1
+        """,
+        (table_name, column_name)
+    )
+    return cursor.fetchone() is not None
+
+
+def ensure_pagination_index(cursor, metadata: DatasetMetadata) -> bool:
+    """
+    确保 (created_at, id) 分页索引存在
+
+    Returns:
+        是否修改了表结构
+    """
+    table_name = metadata.get_table_name()
+    if index_exists(cursor, table_name, PAGINATION_INDEX):
+        return False
+    cursor.execute(f"ALTER TABLE `{table_name}` ADD INDEX `{PAGINATION_INDEX}` (`created_at`, `id`)")
+    logger.info(f"✓ {table_name}: 已创建分页索引 {PAGINATION_INDEX}")
+    return True
+
+
+def rebuild_row_count(cursor, metadata: DatasetMetadata) -> bool:
+    """重新统计数据集总行数（修复 sys_dataset_stats 中的计数偏差）"""
+    row_counter.ensure_stats_table(cursor)
+    row_counter.rebuild(cursor, metadata.dataset_id, metadata.get_table_name())
+    return False
+
+
+# 回填检索文本时每批处理的行数（按id区间分批，避免单个大事务）
+SEARCH_BACKFILL_BATCH = 5000
+
+
+def ensure_search_index(cursor, metadata: DatasetMetadata) -> bool:
+    """
+    确保检索列 search_text 及其全文索引存在
+
+    先添加列并按id区间分批回填，最后一次性建立FULLTEXT索引（比逐行维护索引快）。
+
+    Returns:
+        是否修改了表结构
+    """
+    table_name = metadata.get_table_name()
+    changed = False
+
+    if not column_exists(cursor, table_name, SEARCH_COLUMN):
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN `{SEARCH_COLUMN}` MEDIUMTEXT DEFAULT NULL")
+        changed = True
+
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM `{table_name}`")
+        max_id = int(cursor.fetchone()['max_id'])
+        expression = search_text_sql(metadata.get_all_field_names())
+        for start in range(0, max_id, SEARCH_BACKFILL_BATCH):
+            cursor.execute(
+                f"UPDATE `{table_name}` SET `{SEARCH_COLUMN}` = {expression} WHERE id > %s AND id <= %s",
+                (start, start + SEARCH_BACKFILL_BATCH)
+            )
+            cursor.connection.commit()
+        logger.info(f"✓ {table_name}: 已添加并回填检索列 {SEARCH_COLUMN}")
+
+    if not index_exists(cursor, table_name, FULLTEXT_INDEX):
+        cursor.execute(
+            f"ALTER TABLE `{table_name}` ADD FULLTEXT INDEX `{FULLTEXT_INDEX}` (`{SEARCH_COLUMN}`) WITH PARSER ngram"
+        )
+        changed = True
+        logger.info(f"✓ {table_name}: 已创建全文索引 {FULLTEXT_INDEX}")
+
+    return changed
+
+
+# 回填行指纹时每批处理的行数
+FINGERPRINT_BACKFILL_BATCH = 2000
+
+
+def ensure_row_fingerprint(cursor, metadata: DatasetMetadata) -> bool:
+    """
+    确保行指纹列 row_fingerprint 及其索引存在
+
+    指纹的规范化规则在Python端实现（见 fingerprint.normalize_value），
+    因此按id区间读出数据、计算指纹后批量写回；只处理指纹为空的行，中断后可重复执行。
+    历史数据中已有完全相同的记录时无法建立唯一索引，退化为普通索引并给出警告，
+    清理重复数据后再次执行本步骤即可升级为唯一索引。
+
+    Returns:
+        是否修改了表结构
+    """
+    table_name = metadata.get_table_name()
+    fields = metadata.get_all_field_names()
+    null_tokens = NULL_TOKENS
+    changed = False
+
+    if not column_exists(cursor, table_name, FINGERPRINT_COLUMN):
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN `{FINGERPRINT_COLUMN}` CHAR(32) DEFAULT NULL")
+        changed = True
+
+    columns = ", ".join(quote_column(field) for field in fields)
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM `{table_name}`")
+    max_id = int(cursor.fetchone()['max_id'])
+    filled = 0
+    for start in range(0, max_id, FINGERPRINT_BACKFILL_BATCH):
+        cursor.execute(
+            f"SELECT id, {columns} FROM `{table_name}` "
+            f"WHERE id > %s AND id <= %s AND `{FINGERPRINT_COLUMN}` IS NULL",
+            (start, start + FINGERPRINT_BACKFILL_BATCH)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            continue
+        cursor.executemany(
+            f"UPDATE `{table_name}` SET `{FINGERPRINT_COLUMN}` = %s WHERE id = %s",
+            [(compute_fingerprint(row, fields, null_tokens), row['id']) for row in rows]
+        )
+        cursor.connection.commit()
+        filled += len(rows)
+    if filled:
+        logger.info(f"✓ {table_name}: 已回填 {filled} 行的行指纹")
+
+    if index_exists(cursor, table_name, FINGERPRINT_INDEX):
+        return changed
+
+    plain_index = f"idx_{FINGERPRINT_COLUMN}"
+    try:
+        cursor.execute(
+            f"ALTER TABLE `{table_name}` ADD UNIQUE INDEX `{FINGERPRINT_INDEX}` (`{FINGERPRINT_COLUMN}`)"
+        )
+    except Exception as e:
+        if not is_duplicate_key_error(e):
+            raise
+        cursor.execute(
+            f"SELECT COUNT(*) AS dup_groups FROM (SELECT 1 FROM `{table_name}` "
+            f"GROUP BY `{FINGERPRINT_COLUMN}` HAVING COUNT(*) > 1) AS d"
+        )
+        groups = cursor.fetchone()['dup_groups']
+        logger.warning(
+            f"⚠ {table_name}: 存在 {groups} 组完全相同的记录，无法建立唯一索引，已改用普通索引 {plain_index}"
+        )
+        if not index_exists(cursor, table_name, plain_index):
+            cursor.execute(f"ALTER TABLE `{table_name}` ADD INDEX `{plain_index}` (`{FINGERPRINT_COLUMN}`)")
+            changed = True
+        return changed
+
+    if index_exists(cursor, table_name, plain_index):
+        cursor.execute(f"ALTER TABLE `{table_name}` DROP INDEX `{plain_index}`")
+    logger.info(f"✓ {table_name}: 已创建行指纹唯一索引 {FINGERPRINT_INDEX}")
+    return True
+
+
+# 回填非空字段数时每批处理的行数
+COVERAGE_BACKFILL_BATCH = 5000
+
+
+def rebuild_coverage_stats(cursor, metadata: DatasetMetadata) -> bool:
+    """
+    确保非空字段数列 coverage_filled 及其索引存在，重新计算全部行的值并重建覆盖率统计
+
+    用于初始化历史表，以及修复 sys_coverage_stats / sys_coverage_field_stats 的偏差
+    （覆盖率计算字段变化后也需执行）。按id区间分批更新，可重复执行。
+
+    Returns:
+        是否修改了表结构
+    """
+    table_name = metadata.get_table_name()
+    changed = False
+    coverage_state.ensure_stats_tables(cursor)
+
+    if not column_exists(cursor, table_name, COVERAGE_COLUMN):
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN `{COVERAGE_COLUMN}` SMALLINT UNSIGNED DEFAULT NULL")
+        changed = True
+
+    fields = coverage_fields(metadata, table_name)
+    filled_sql, params = filled_count_sql(fields)
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM `{table_name}`")
+    max_id = int(cursor.fetchone()['max_id'])
+    for start in range(0, max_id, COVERAGE_BACKFILL_BATCH):
+        cursor.execute(
+            f"UPDATE `{table_name}` SET `{COVERAGE_COLUMN}` = {filled_sql} WHERE id > %s AND id <= %s",
+            tuple(params) + (start, start + COVERAGE_BACKFILL_BATCH)
+        )
+        cursor.connection.commit()
+
+    if not index_exists(cursor, table_name, COVERAGE_INDEX):
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD INDEX `{COVERAGE_INDEX}` (`{COVERAGE_COLUMN}`, `id`)")
+        changed = True
+        logger.info(f"✓ {table_name}: 已创建非空字段数索引 {COVERAGE_INDEX}")
+
+    coverage_state.rebuild(cursor, metadata.dataset_id, table_name, fields)
+    return changed
+
+
+# 可按内容转换类型的列（历史表的数据列均为TEXT）
+TEXT_DATA_TYPES = ("tinytext", "text", "mediumtext", "longtext")
+
+
+def _column_sql_types(cursor, table_name: str) -> Dict[str, str]:
+    """数据表全部列的类型 {列名: COLUMN_TYPE}"""
+    cursor.execute(
+        """
+        SELECT COLUMN_NAME AS column_name, COLUMN_TYPE AS column_type
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table_name,)
+    )
+    return {row['column_name']: row['column_type'] for row in cursor.fetchall()}
+
+
+def _invalid_conversions(cursor, table_name: str, targets: Dict[str, Dict[str, str]]) -> Dict[str, int]:
+    """统计规范化后仍无法转换为目标类型的值 {列名: 行数}（只返回有问题的列）"""
+    checks, params = [], []
+    for idx, (column, column_type) in enumerate(targets.items()):
+        quoted = quote_column(column)
+        sql_type = column_type["sql_type"]
+        length = varchar_length(sql_type)
+        if length:
+            checks.append(f"SUM(CHAR_LENGTH({quoted}) > %s) AS bad_{idx}")
+            params.append(length)
+        else:
+            pattern = {"INT": INT_PATTERN, "BIGINT": INT_PATTERN, "DATE": DATE_PATTERN}.get(sql_type, NUMBER_PATTERN)
+            checks.append(f"SUM({quoted} IS NOT NULL AND NOT {quoted} REGEXP %s) AS bad_{idx}")
+            params.append(pattern)
+    cursor.execute(f"SELECT {', '.join(checks)} FROM `{table_name}`", tuple(params))
+    row = cursor.fetchone()
+    return {
+        column: int(row[f"bad_{idx}"] or 0)
+        for idx, column in enumerate(targets) if int(row[f"bad_{idx}"] or 0)
+    }
+
+
+def _text_columns(cursor, table_name: str, fields: List[str]) -> List[str]:
+    """返回仍为TEXT类型的数据列（已转换过的列不再处理，保证可重复执行）"""
+    cursor.execute(
+        """
+        SELECT COLUMN_NAME AS column_name, DATA_TYPE AS data_type
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table_name,)
+    )
+    text_columns = {
+        row['column_name'] for row in cursor.fetchall()
+        if row['data_type'].lower() in TEXT_DATA_TYPES
+    }
+    return [field for field in fields if field in text_columns]
+
+
+def _profile_columns(cursor, table_name: str, columns: List[str]) -> Dict[str, Dict]:
+    """
+    在MySQL中一次扫描统计各列特征（与 type_inference.profile_series 的统计项一致）
+
+    空值标记（settings.NULL_VALUES）在派生表中先转换为NULL，不参与类型判断。
+    """
+    null_values = list(settings.NULL_VALUES)
+    null_placeholders = ", ".join(["%s"] * len(null_values))
+
+    derived_parts, aggregate_parts = [], []
+    derived_params, aggregate_params = [], []
+    for idx, column in enumerate(columns):
+        quoted = quote_column(column)
+        derived_parts.append(
+            f"CASE WHEN TRIM({quoted}) IN ({null_placeholders}) THEN NULL ELSE TRIM({quoted}) END AS c{idx}"
+        )
+        derived_params.extend(null_values)
+
+        value = f"c{idx}"
+        aggregate_parts.extend([
+            f"COUNT({value}) AS non_null_{idx}",
+            f"SUM({value} REGEXP %s) AS ints_{idx}",
+            f"SUM({value} REGEXP %s) AS numbers_{idx}",
+            f"SUM({value} REGEXP %s) AS dates_{idx}",
+            f"MAX(CHAR_LENGTH({value})) AS max_length_{idx}",
+            f"MIN(CASE WHEN {value} REGEXP %s THEN CAST({value} AS DECIMAL(65, 0)) END) AS int_min_{idx}",
+            f"MAX(CASE WHEN {value} REGEXP %s THEN CAST({value} AS DECIMAL(65, 0)) END) AS int_max_{idx}",
+        ])
+        aggregate_params.extend([INT_PATTERN, NUMBER_PATTERN, DATE_PATTERN, INT_PATTERN, INT_PATTERN])
+
+    sql = (
+        f"SELECT {', '.join(aggregate_parts)} "
+        f"FROM (SELECT {', '.join(derived_parts)} FROM `{table_name}`) AS normalized"
+    )
+    cursor.execute(sql, tuple(aggregate_params + derived_params))
+    row = cursor.fetchone()
+
+    profiles = {}
+    for idx, column in enumerate(columns):
+        profile = empty_profile()
+        for key in ("non_null", "ints", "numbers", "dates", "max_length"):
+            profile[key] = int(row[f"{key}_{idx}"] or 0)
+        for key in ("int_min", "int_max"):
+            if row[f"{key}_{idx}"] is not None:
+                profile[key] = str(row[f"{key}_{idx}"])
+        profiles[column] = profile
+    return profiles
+
+
+def migrate_column_types(cursor, metadata: DatasetMetadata) -> bool:
+    """
+    按已有数据推断列类型，将TEXT列原地转换为 INT/BIGINT/DOUBLE/DATE/VARCHAR(n)
+
+    1. 一次扫描统计所有TEXT数据列的特征，用 type_inference 的规则决定类型；
+       整行超过 InnoDB 行大小上限时最宽的 VARCHAR 列保持TEXT（见 fit_row_size）
+    2. 需要转换的列：空值标记置为NULL、去除首尾空白（单条UPDATE），提交前在同一事务内
+       检查规范化后的值都能转换为目标类型，否则回滚，数据不被改写
+    3. 单条 ALTER TABLE ... MODIFY 完成所有列的类型转换（只重建一次表）
+    4. 更新元数据中的 type / sql_type
+
+    ALTER TABLE 会隐式提交，无法与 UPDATE 放在同一事务中；ALTER 仍失败时已规范化的值
+    （空值标记→NULL、去除首尾空白）与原值语义相同，修正原因后重新执行即可。
+
+    Returns:
+        是否修改了表结构
+    """
+    table_name = metadata.get_table_name()
+    columns = _text_columns(cursor, table_name, metadata.get_all_field_names())
+    if not columns:
+        return False
+
+    profiles = _profile_columns(cursor, table_name, columns)
+    other_types = [sql_type for column, sql_type in _column_sql_types(cursor, table_name).items()
+                   if column not in profiles]
+    column_types = fit_row_size(
+        {column: decide_column_type(profile) for column, profile in profiles.items()}, other_types
+    )
+    targets = {
+        column: column_type for column, column_type in column_types.items()
+        if column_type["sql_type"] != DEFAULT_COLUMN_TYPE["sql_type"]
+    }
+
+    if targets:
+        null_values = list(settings.NULL_VALUES)
+        null_placeholders = ", ".join(["%s"] * len(null_values))
+        set_parts, params = [], []
+        for column, column_type in targets.items():
+            quoted = quote_column(column)
+            # DATE列的值可能带有零点时间（"2024-01-01 00:00:00"），只保留日期部分
+            value = f"LEFT(TRIM({quoted}), 10)" if column_type["sql_type"] == "DATE" else f"TRIM({quoted})"
+            set_parts.append(
+                f"{quoted} = CASE WHEN TRIM({quoted}) IN ({null_placeholders}) THEN NULL ELSE {value} END"
+            )
+            params.extend(null_values)
+        cursor.execute(f"UPDATE `{table_name}` SET {', '.join(set_parts)}", tuple(params))
+        invalid = _invalid_conversions(cursor, table_name, targets)
+        if invalid:
+            cursor.connection.rollback()
+            raise ValueError(
+                f"{table_name}: 以下列的值无法转换为目标类型，未做修改: "
+                + ", ".join(f"{c}={targets[c]['sql_type']}（{n}行）" for c, n in invalid.items())
+            )
+        cursor.connection.commit()
+
+        modify_parts = [
+            f"MODIFY {quote_column(column, parameterized=False)} {column_type['sql_type']} DEFAULT NULL"
+            for column, column_type in targets.items()
+        ]
+        cursor.execute(f"ALTER TABLE `{table_name}` {', '.join(modify_parts)}")
+        logger.info(
+            f"✓ {table_name}: 已转换 {len(targets)} 列的类型 "
+            + ", ".join(f"{c}={t['sql_type']}" for c, t in targets.items())
+        )
+
+    _save_field_types(metadata, column_types)
+    return bool(targets)
+
+
+def _save_field_types(metadata: DatasetMetadata, column_types: Dict[str, Dict[str, str]]):
+    """把推断出的类型写回元数据配置（只合并这些字段的类型，见 DatasetCreator.update_field_types）"""
+    # 延迟导入：dataset_creator 依赖本模块的 PAGINATION_INDEX
+    from backend.services.experimental.dataset_creator import DatasetCreator
+
+    DatasetCreator().update_field_types(metadata.dataset_id, column_types)
+    for field in metadata.config['fields']['data_fields']:
+        if field['name'] in column_types:
+            field['type'] = column_types[field['name']]['type']
+            field['sql_type'] = column_types[field['name']]['sql_type']
+    DatasetMetadata.reload_metadata()
+
+
+def widen_text_columns(cursor, metadata: DatasetMetadata, table_name: str,
+                       max_lengths: Dict[str, int], save_metadata: bool = True) -> Dict[str, str]:
+    """
+    加宽容纳不下新值的 VARCHAR 列（写入前调用；ALTER TABLE 会隐式提交，不能在写事务中调用）
+
+    类型推断按首个文件的最大长度选择 VARCHAR 档位，之后追加的更长值原本会写入失败
+    （TEXT 时可以写入）。以数据表的实际列长度为准（其他进程或替换导入可能已加宽），
+    按新值的最大长度重新选择档位（text_column_type），超过最大档位时改为 TEXT。
+
+    Args:
+        table_name: 写入的数据表（替换导入时为影子表）
+        max_lengths: 待写入值的最大长度 {列名: 字符数}
+        save_metadata: 是否把列类型写回元数据（影子表在替换完成前不更新元数据）
+
+    Returns:
+        {列名: 当前列类型}（包括已经足够宽、只需同步元数据的列）
+    """
+    if not max_lengths:
+        return {}
+    sql_types = _column_sql_types(cursor, table_name)
+    column_types: Dict[str, Dict[str, str]] = {}
+    targets: Dict[str, Dict[str, str]] = {}
+    for name, max_length in max_lengths.items():
+        if name not in sql_types:
+            continue
+        length = varchar_length(sql_types[name])
+        if not length:
+            column_types[name] = dict(DEFAULT_COLUMN_TYPE)
+        elif length >= max_length:
+            column_types[name] = {"type": "string", "sql_type": f"VARCHAR({length})"}
+        else:
+            targets[name] = text_column_type(max_length)
+
+    if targets:
+        # 加宽后整行不能超过 InnoDB 行大小上限，超过时改为TEXT
+        targets = fit_row_size(targets, [t for c, t in sql_types.items() if c not in targets])
+        column_types.update(targets)
+        modify_parts = [
+            f"MODIFY {quote_column(column, parameterized=False)} {column_type['sql_type']} DEFAULT NULL"
+            for column, column_type in targets.items()
+        ]
+        cursor.execute(f"ALTER TABLE `{table_name}` {', '.join(modify_parts)}")
+        logger.info(
+            f"✓ {table_name}: 已加宽 {len(targets)} 列 "
+            + ", ".join(f"{c}={t['sql_type']}" for c, t in targets.items())
+        )
+    if save_metadata and column_types:
+        _save_field_types(metadata, column_types)
+    return {column: column_type["sql_type"] for column, column_type in column_types.items()}
+
+
+# 迁移步骤（按执行顺序），签名: step(cursor, metadata) -> 是否修改了表结构
+MIGRATIONS: Dict[str, Callable] = {
+    "pagination_index": ensure_pagination_index,
+    "row_count": rebuild_row_count,
+    "search_index": ensure_search_index,
+    "column_types": migrate_column_types,
+    "row_fingerprint": ensure_row_fingerprint,
+    "coverage_stats": rebuild_coverage_stats,
+}
+
+
+def list_migrations() -> List[str]:
+    """列出所有迁移步骤名称"""
+    return list(MIGRATIONS.keys())
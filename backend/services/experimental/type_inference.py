@@ -0,0 +1,328 @@
+"""列类型推断 - 根据导入数据推断数据库列类型
+
+导入文件建表时不再把所有列都声明为 TEXT：数值列使用 INT/BIGINT/DOUBLE，
+短文本使用 VARCHAR(n)，纯日期使用 DATE，只有长文本才使用 TEXT。
+推断时忽略 settings.NULL_VALUES 中的空值标记（如 N/A、-、null）。
+
+推断分两步：
+1. 统计列特征（profile）：非空值数量、整数/数值/日期格式的值数量、最大长度、整数范围
+2. 根据特征决定类型（decide_column_type）
+
+文件导入（infer_chunked_column_types）与历史表迁移（table_migrations.migrate_column_types，
+在MySQL中计算同样的特征）共用第2步，保证两条路径的判定规则一致。
+"""
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from backend.utils.null_values import null_mask, null_token_set
+
+
+# 整数：不允许前导零（如编号 "007" 应保持为字符串）
+INT_PATTERN = r'^[+-]?(0|[1-9][0-9]*)$'
+# 十进制数：整数部分同样不允许前导零
+NUMBER_PATTERN = r'^[+-]?(0|[1-9][0-9]*)(\.[0-9]+)?$|^[+-]?\.[0-9]+$'
+# 纯日期（可带零点时间，Excel日期单元格转字符串后的形式）
+DATE_PATTERN = r'^[0-9]{4}-[0-9]{2}-[0-9]{2}( 00:00:00)?$'
+
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+INT64_DIGITS = 18
+
+# 写入时接受的值（比推断宽松：允许前导零、科学计数法，日期可带时间，与MySQL的转换规则一致）
+_WRITE_NUMBER_RE = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+_WRITE_DATE_RE = re.compile(r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})( \d{1,2}:\d{2}(:\d{2})?)?$')
+
+# VARCHAR 长度档位（预留约2倍余量），超过最大档位使用 TEXT；
+# 之后写入的值超过列长度时按同样的规则加宽列（见 table_migrations.widen_text_columns）
+VARCHAR_BUCKETS = (32, 64, 128, 255)
+_VARCHAR_RE = re.compile(r'^VARCHAR\((\d+)\)$', re.IGNORECASE)
+_CHAR_RE = re.compile(r'^(?:VAR)?CHAR\((\d+)\)$', re.IGNORECASE)
+
+# InnoDB 行大小上限（除 TEXT/BLOB 外所有列的最大字节数之和，utf8mb4 每字符按4字节计）
+MAX_ROW_BYTES = 65535
+# 数据表的内部列：id、审计列、检索列、行指纹、非空字段数（见 DatasetCreator.create_database_table）
+INTERNAL_COLUMN_TYPES = (
+    "INT", "TIMESTAMP", "TIMESTAMP", "VARCHAR(50)", "VARCHAR(50)", "MEDIUMTEXT", "CHAR(32)", "SMALLINT"
+)
+# 各列类型在行内占用的字节数（TEXT 类只在行内保存指针）
+_FIXED_COLUMN_BYTES = {
+    "tinyint": 1, "smallint": 2, "mediumint": 3, "int": 4, "bigint": 8,
+    "float": 4, "double": 8, "date": 3, "timestamp": 4, "datetime": 8,
+    "tinytext": 12, "text": 12, "mediumtext": 12, "longtext": 12, "json": 12,
+}
+
+# 抽象类型（与 scripts/generate_metadata.py 的 infer_type 一致）
+TYPE_INTEGER = "integer"
+TYPE_FLOAT = "float"
+TYPE_DATETIME = "datetime"
+TYPE_STRING = "string"
+
+# 未进行类型推断（或无法判断）的列：字符串类型，TEXT可存储任意长度
+DEFAULT_COLUMN_TYPE = {"type": TYPE_STRING, "sql_type": "TEXT"}
+
+
+def empty_profile() -> Dict[str, Any]:
+    """空的列特征统计"""
+    return {
+        "non_null": 0,
+        "ints": 0,
+        "numbers": 0,
+        "dates": 0,
+        "max_length": 0,
+        "int_min": None,
+        "int_max": None
+    }
+
+
+def merge_profiles(target: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    合并两份列特征统计（分块读取文件时逐块统计后合并）
+
+    Returns:
+        合并后的 target
+    """
+    for key in ("non_null", "ints", "numbers", "dates"):
+        target[key] += profile[key]
+    target["max_length"] = max(target["max_length"], profile["max_length"])
+    if profile["int_min"] is not None:
+        if target["int_min"] is None or int(profile["int_min"]) < int(target["int_min"]):
+            target["int_min"] = profile["int_min"]
+        if target["int_max"] is None or int(profile["int_max"]) > int(target["int_max"]):
+            target["int_max"] = profile["int_max"]
+    return target
+
+
+def decide_column_type(profile: Dict[str, Any]) -> Dict[str, str]:
+    """
+    根据列特征决定列类型
+
+    Args:
+        profile: 列特征统计（见 empty_profile）
+
+    Returns:
+        {"type": 抽象类型, "sql_type": MySQL列类型}
+    """
+    non_null = profile["non_null"]
+
+    # 全为空的列无法判断内容，保持TEXT
+    if non_null == 0:
+        return dict(DEFAULT_COLUMN_TYPE)
+
+    if profile["ints"] == non_null:
+        int_min = Decimal(profile["int_min"])
+        int_max = Decimal(profile["int_max"])
+        if INT32_MIN <= int_min and int_max <= INT32_MAX:
+            return {"type": TYPE_INTEGER, "sql_type": "INT"}
+        if max(len(str(abs(int_min))), len(str(abs(int_max)))) <= INT64_DIGITS:
+            return {"type": TYPE_INTEGER, "sql_type": "BIGINT"}
+        return {"type": TYPE_FLOAT, "sql_type": "DOUBLE"}
+
+    if profile["numbers"] == non_null:
+        return {"type": TYPE_FLOAT, "sql_type": "DOUBLE"}
+
+    if profile["dates"] == non_null:
+        return {"type": TYPE_DATETIME, "sql_type": "DATE"}
+
+    return text_column_type(profile["max_length"])
+
+
+def text_column_type(max_length: int) -> Dict[str, str]:
+    """按最大长度选择 VARCHAR 档位（预留约2倍余量），超过最大档位使用 TEXT"""
+    for bucket in VARCHAR_BUCKETS:
+        if max_length * 2 <= bucket:
+            return {"type": TYPE_STRING, "sql_type": f"VARCHAR({bucket})"}
+    return dict(DEFAULT_COLUMN_TYPE)
+
+
+def column_bytes(sql_type: str) -> int:
+    """列在 InnoDB 行大小限制中占用的最大字节数（utf8mb4）"""
+    match = _CHAR_RE.match(sql_type.strip())
+    if match:
+        data_bytes = int(match.group(1)) * 4
+        return data_bytes + (2 if data_bytes > 255 else 1)
+    base = sql_type.strip().split("(")[0].split()[0].lower() if sql_type.strip() else ""
+    return _FIXED_COLUMN_BYTES.get(base, 8)
+
+
+def fit_row_size(column_types: Dict[str, Dict[str, str]],
+                 fixed_sql_types: Iterable[str] = INTERNAL_COLUMN_TYPES) -> Dict[str, Dict[str, str]]:
+    """
+    保证整行不超过 InnoDB 的行大小上限（MAX_ROW_BYTES）
+
+    列数较多时，多个 utf8mb4 的 VARCHAR(255)（每列约1KB）相加可能超过上限，建表或 ALTER 失败；
+    超过时依次把其中最宽的 VARCHAR 列改为 TEXT。
+
+    Args:
+        column_types: 待确定的列类型 {列名: {"type", "sql_type"}}
+        fixed_sql_types: 表中其他不变的列类型（默认只有内部列）
+
+    Returns:
+        调整后的列类型（新字典）
+    """
+    column_types = {column: dict(column_type) for column, column_type in column_types.items()}
+    total = sum(column_bytes(sql_type) for sql_type in fixed_sql_types)
+    total += sum(column_bytes(column_type["sql_type"]) for column_type in column_types.values())
+    varchar_columns = sorted(
+        (column for column, column_type in column_types.items() if varchar_length(column_type["sql_type"])),
+        key=lambda column: varchar_length(column_types[column]["sql_type"]),
+        reverse=True
+    )
+    for column in varchar_columns:
+        if total <= MAX_ROW_BYTES:
+            break
+        total -= column_bytes(column_types[column]["sql_type"]) - column_bytes(DEFAULT_COLUMN_TYPE["sql_type"])
+        column_types[column] = dict(DEFAULT_COLUMN_TYPE)
+    return column_types
+
+
+def varchar_length(sql_type: Optional[str]) -> Optional[int]:
+    """VARCHAR(n) 列的长度上限，其他列类型返回None"""
+    match = _VARCHAR_RE.match(sql_type or "")
+    return int(match.group(1)) if match else None
+
+
+def profile_series(series: pd.Series, null_values: Iterable[str]) -> Dict[str, Any]:
+    """
+    统计一列数据的特征（向量化实现）
+
+    Args:
+        series: 列数据
+        null_values: 空值标记列表（settings.NULL_VALUES）
+    """
+    profile = empty_profile()
+    mask = ~null_mask(series, null_token_set(null_values))
+    values = series[mask]
+    text = values.astype(str).str.strip()
+
+    profile["non_null"] = int(mask.sum())
+    if profile["non_null"] == 0:
+        return profile
+
+    profile["max_length"] = int(text.str.len().max())
+
+    if pd.api.types.is_bool_dtype(values):
+        return profile
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        is_date = (values.dt.normalize() == values)
+        profile["dates"] = int(is_date.sum())
+        return profile
+
+    if pd.api.types.is_numeric_dtype(values):
+        # 数值列（含NaN的整数列会被pandas读成float，整值仍按整数处理）
+        numeric = values.astype(float)
+        is_int = (numeric % 1 == 0)
+        profile["numbers"] = profile["non_null"]
+        profile["ints"] = int(is_int.sum())
+        if profile["ints"]:
+            int_values = numeric[is_int]
+            profile["int_min"] = str(int(int_values.min()))
+            profile["int_max"] = str(int(int_values.max()))
+        return profile
+
+    # object列：混合了字符串、数字、日期对象，统一按字符串格式判断
+    text = values.map(_to_text)
+    is_int = text.str.fullmatch(INT_PATTERN)
+    profile["ints"] = int(is_int.sum())
+    profile["numbers"] = int(text.str.fullmatch(NUMBER_PATTERN).sum())
+    profile["dates"] = int(text.str.fullmatch(DATE_PATTERN).sum())
+    if profile["ints"]:
+        int_values = text[is_int].map(int)
+        profile["int_min"] = str(int_values.min())
+        profile["int_max"] = str(int_values.max())
+    return profile
+
+
+def _to_text(value: Any) -> str:
+    """object列中的单元格转为用于格式判断的字符串"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value).strip()
+
+
+def infer_chunked_column_types(chunks: Iterable[pd.DataFrame],
+                               null_values: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """
+    分块推断列类型（流式导入时逐块统计特征并合并，不需要整个文件在内存中）
+
+    Args:
+        chunks: 同一文件的各块数据（列相同）
+        null_values: 空值标记列表（settings.NULL_VALUES）
+
+    Returns:
+        {列名: {"type": 抽象类型, "sql_type": MySQL列类型}}
+    """
+    null_values = list(null_values)
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for chunk in chunks:
+        for column in chunk.columns:
+            profile = profile_series(chunk[column], null_values)
+            merge_profiles(profiles.setdefault(column, empty_profile()), profile)
+    return fit_row_size({column: decide_column_type(profile) for column, profile in profiles.items()})
+
+
+def is_typed(field_type: Optional[str]) -> bool:
+    """是否为非字符串类型（写入前需要把空值标记转换为NULL）"""
+    return field_type in (TYPE_INTEGER, TYPE_FLOAT, TYPE_DATETIME)
+
+
+def check_value(value: Any, field_type: Optional[str], sql_type: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+    """
+    检查写入 INT/BIGINT/DOUBLE/DATE 列的非空值（空值标记需先转换为None）
+
+    整数列的数字文本（如 "2000.0"）转换为 int，其余值原样写入。
+
+    Args:
+        value: 字段值
+        field_type: 元数据类型（integer/float/datetime/string）
+        sql_type: 列类型，用于检查 INT/BIGINT 的范围
+
+    Returns:
+        (写入的值, 错误原因)；值有效时错误原因为None
+    """
+    if value is None or not is_typed(field_type):
+        return value, None
+
+    if field_type == TYPE_DATETIME:
+        if isinstance(value, (datetime, date)):
+            return value, None
+        match = _WRITE_DATE_RE.match(str(value).strip())
+        if match:
+            try:
+                date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+                return value, None
+            except ValueError:
+                pass
+        return value, "不是有效的日期（YYYY-MM-DD）"
+
+    if isinstance(value, bool):
+        return value, "不是数字"
+    if isinstance(value, (int, float, Decimal)):
+        number = value
+    else:
+        text = str(value).strip()
+        if not _WRITE_NUMBER_RE.match(text):
+            return value, "不是数字"
+        number = text
+    try:
+        number = Decimal(repr(number) if isinstance(number, float) else number)
+    except InvalidOperation:
+        return value, "不是数字"
+    if not number.is_finite():
+        return value, "不是有限的数字"
+
+    if field_type == TYPE_INTEGER:
+        if number != number.to_integral_value():
+            return value, "不是整数"
+        number = int(number)
+        low, high = (INT32_MIN, INT32_MAX) if (sql_type or "").upper() == "INT" else (INT64_MIN, INT64_MAX)
+        if not low <= number <= high:
+            return value, f"超出{sql_type or 'BIGINT'}列的范围"
+        return number, None
+    return value, None
@@ -0,0 +1,319 @@
+"""上传文件流式读取 - 落盘、编码探测、分块解析
+
+原导入流程 `contents = await file.read()` 把整个上传读入内存，再整体解析为一个
+DataFrame；CSV 编码回退（utf-8 → gbk → gb2312）每次失败都要重新解析整个缓冲区。
+本模块：
+
+- spool_upload：把上传内容按块写入 settings.UPLOAD_DIR 下的临时文件，
+  超过 settings.MAX_UPLOAD_SIZE 时中止
+- sniff_encoding：只读取文件开头 settings.IMPORT_SNIFF_BYTES 字节判断编码
+- UploadReader：按 settings.IMPORT_PARSE_CHUNK_ROWS 行分块解析，各块的索引在整个文件内连续。
+  CSV 使用 read_csv(chunksize=..., dtype=str)，所有块的值都是文件中的原文；.xlsx 使用 openpyxl 只读模式逐行迭代
+  （不构建整个工作簿的单元格对象），单元格保留 openpyxl 解析出的类型
+  （数字、日期、文本），空值规则与 pd.read_excel 一致
+
+峰值内存与块大小成正比，与文件大小无关（旧版 .xls 仍由 pd.read_excel 整体解析后再分块）。
+
+使用示例：
+    path = await spool_upload(file, "csv")
+    try:
+        reader = UploadReader.open(path, "csv")
+        for chunk in reader.iter_chunks():
+            ...
+    finally:
+        remove_spooled(path)
+"""
+import codecs
+import os
+import tempfile
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import anyio
+import pandas as pd
+from openpyxl import load_workbook
+from pandas._libs.parsers import STR_NA_VALUES
+
+from backend.config import Settings
+
+
+settings = Settings()
+
+# CSV 编码候选（按顺序尝试）
+ENCODING_CANDIDATES = ("utf-8", "gbk", "gb2312")
+
+# 落盘时每次读取的字节数
+SPOOL_BUFFER_SIZE = 1024 * 1024
+
+# openpyxl 只读模式支持的格式（.xls 需要 xlrd，仍整体解析）
+STREAMING_EXCEL_EXTS = ("xlsx", "xlsm")
+
+
+class UploadTooLargeError(Exception):
+    """上传文件超过 settings.MAX_UPLOAD_SIZE"""
+
+
+class FileParseError(ValueError):
+    """文件无法解析（编码无法识别、格式错误等）"""
+
+
+async def spool_upload(upload, file_ext: str, max_size: Optional[int] = None) -> str:
+    """
+    把上传文件按块写入临时文件
+
+    Args:
+        upload: FastAPI UploadFile
+        file_ext: 文件扩展名（csv/xlsx/xls），作为临时文件后缀
+        max_size: 文件大小上限（字节），默认 settings.MAX_UPLOAD_SIZE
+
+    Returns:
+        临时文件路径（调用方负责用 remove_spooled 删除）
+
+    Raises:
+        UploadTooLargeError: 文件超过大小上限
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="import_", suffix=f".{file_ext}", dir=settings.UPLOAD_DIR)
+    os.close(fd)
+
+    size = 0
+    try:
+        async with await anyio.open_file(path, "wb") as out:
+            while True:
+                block = await upload.read(SPOOL_BUFFER_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_size:
+                    raise UploadTooLargeError(
+                        f"文件超过大小上限 {max_size // (1024 * 1024)} MB"
+                    )
+                await out.write(block)
+    except BaseException:
+        remove_spooled(path)
+        raise
+    return path
+
+
+def remove_spooled(path: Optional[str]):
+    """删除落盘的临时文件（不存在时忽略）"""
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def sniff_encoding(path: str, sample_bytes: Optional[int] = None,
+                   candidates: Sequence[str] = ENCODING_CANDIDATES) -> str:
+    """
+    根据文件开头的有限字节判断CSV编码
+
+    样本末尾可能截断一个多字节字符，因此使用增量解码器，
+    只有样本即为整个文件时才要求完整解码。
+
+    Raises:
+        FileParseError: 所有候选编码都无法解码样本
+    """
+    sample_bytes = sample_bytes or settings.IMPORT_SNIFF_BYTES
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes + 1)
+    final = len(sample) <= sample_bytes
+    sample = sample[:sample_bytes]
+
+    for encoding in candidates:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=final)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise FileParseError(f"无法识别文件编码（已尝试 {', '.join(candidates)}）")
+
+
+class UploadReader:
+    """分块读取落盘的CSV/Excel文件"""
+
+    def __init__(self, path: str, file_ext: str, encoding: Optional[str] = None,
+                 chunk_rows: Optional[int] = None):
+        """
+        Args:
+            path: 文件路径
+            file_ext: 文件扩展名（csv/xlsx/xls）
+            encoding: CSV编码（None时调用 sniff_encoding 探测）
+            chunk_rows: 每块行数，默认 settings.IMPORT_PARSE_CHUNK_ROWS
+        """
+        self.path = path
+        self.file_ext = file_ext
+        self.is_csv = file_ext == "csv"
+        self.is_streaming_excel = file_ext in STREAMING_EXCEL_EXTS
+        self.encoding = encoding or (sniff_encoding(path) if self.is_csv else None)
+        self.chunk_rows = max(1, chunk_rows or settings.IMPORT_PARSE_CHUNK_ROWS)
+        self.columns: List[str] = []
+        self.empty = True
+
+    @classmethod
+    def open(cls, path: str, file_ext: str, **kwargs) -> "UploadReader":
+        """
+        打开文件：探测编码并读取表头和第一行（阻塞调用，需在线程池中执行）
+
+        Raises:
+            FileParseError: 文件无法解析
+        """
+        reader = cls(path, file_ext, **kwargs)
+        if reader.is_streaming_excel:
+            chunks = reader.iter_chunks(chunk_rows=1)
+            try:
+                reader.empty = next(chunks, None) is None
+            finally:
+                chunks.close()
+            return reader
+        head = reader._read(nrows=1)
+        reader.columns = head.columns.tolist()
+        reader.empty = head.empty
+        return reader
+
+    def _read(self, **kwargs) -> Any:
+        """调用 pandas 读取文件，解析错误统一转换为 FileParseError"""
+        try:
+            if self.is_csv:
+                # 全部按文本读取：分块时各块独立推断类型，同一列可能在一块为int64、另一块为
+                # float64/object，存储文本（2000 / 2000.0）、文件内去重和 LOAD DATA 编码都会
+                # 随分块位置变化。空值规则（NaN 标记）不变，列类型由 type_inference 按文本判断
+                return pd.read_csv(self.path, encoding=self.encoding, dtype=str, **kwargs)
+            return pd.read_excel(self.path, **kwargs)
+        except UnicodeDecodeError as e:
+            raise FileParseError(f"文件编码与探测结果（{self.encoding}）不一致: {e}")
+        except (ValueError, pd.errors.ParserError) as e:
+            raise FileParseError(str(e))
+
+    def count_rows(self) -> int:
+        """
+        数据行数（用于进度显示）
+
+        CSV 按块统计换行符数量（不解析，带引号的多行单元格会使结果偏大）；
+        Excel 读取工作表的行数范围。
+        """
+        if not self.is_csv:
+            try:
+                workbook = load_workbook(self.path, read_only=True)
+                try:
+                    return max(0, (workbook.active.max_row or 1) - 1)
+                finally:
+                    workbook.close()
+            except Exception:
+                return 0
+
+        lines = 0
+        last = b"\n"
+        with open(self.path, "rb") as f:
+            while True:
+                block = f.read(SPOOL_BUFFER_SIZE)
+                if not block:
+                    break
+                lines += block.count(b"\n")
+                last = block[-1:]
+        if last != b"\n":
+            lines += 1
+        return max(0, lines - 1)
+
+    def iter_chunks(self, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        逐块产出数据（索引为数据行在文件中的序号，从0开始，跨块连续）
+
+        Args:
+            chunk_rows: 每块行数，默认为构造时的 chunk_rows
+
+        Raises:
+            FileParseError: 某一块解析失败（此前产出的块已被调用方处理）
+        """
+        chunk_rows = chunk_rows or self.chunk_rows
+        if self.is_streaming_excel:
+            yield from self._iter_excel_chunks(chunk_rows)
+            return
+        if not self.is_csv:
+            # .xls 只能整体解析，解析后按块切分，保证下游处理逐块进行
+            df = self._read()
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start:start + chunk_rows]
+            return
+
+        chunks = self._read(chunksize=chunk_rows)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as e:
+                raise FileParseError(f"文件编码与探测结果（{self.encoding}）不一致: {e}")
+            except pd.errors.ParserError as e:
+                raise FileParseError(str(e))
+            yield chunk
+
+    def _iter_excel_chunks(self, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """openpyxl 只读模式逐行读取活动工作表，第一行为表头（同时设置 self.columns）"""
+        try:
+            workbook = load_workbook(self.path, read_only=True, data_only=True)
+        except Exception as e:
+            raise FileParseError(f"Excel文件无法打开: {e}")
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            self.columns = excel_header(header)
+            width = len(self.columns)
+            position = 0
+            while True:
+                batch = []
+                read = 0
+                for row in islice(rows, chunk_rows):
+                    read += 1
+                    values = [excel_value(value) for value in row[:width]]
+                    # 与 pd.read_excel 一致：跳过全空的行（只读模式下带格式的空行也会被迭代出来）
+                    if any(value is not None for value in values):
+                        batch.append(values + [None] * (width - len(values)))
+                if batch:
+                    yield pd.DataFrame(batch, columns=self.columns,
+                                       index=pd.RangeIndex(position, position + len(batch)))
+                    position += len(batch)
+                if read < chunk_rows:
+                    return
+        except FileParseError:
+            raise
+        except Exception as e:
+            raise FileParseError(f"Excel文件解析失败: {e}")
+        finally:
+            workbook.close()
+
+
+def excel_header(header: Tuple) -> List[str]:
+    """表头单元格 → 列名（与 pd.read_excel 一致：空单元格为 Unnamed: i，重名列追加 .1、.2）"""
+    columns: List[str] = []
+    counts: Dict[str, int] = {}
+    for i, cell in enumerate(header):
+        if isinstance(cell, float) and cell.is_integer():
+            cell = int(cell)
+        name = f"Unnamed: {i}" if cell is None else str(cell)
+        if name in counts:
+            counts[name] += 1
+            name = f"{name}.{counts[name]}"
+        counts.setdefault(name, 0)
+        columns.append(name)
+    return columns
+
+
+def excel_value(value: Any) -> Any:
+    """
+    单元格值（与 pd.read_excel 一致）
+
+    - 整数值的浮点数转换为 int（Excel 中所有数字都以浮点数存储）
+    - pandas 默认的空值文本（空串、N/A、NULL、nan 等）转换为 None
+    """
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in STR_NA_VALUES:
+        return None
+    return value
+
+
+def dataframe_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """将 NaN / NaT / pd.NA 替换为 None（MySQL 的 NULL）后转换为字典列表（一次按列掩码，不逐值替换）"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
@@ -0,0 +1,78 @@
+"""
+阻塞调用卸载模块
+
+服务层基于同步的pymysql/pandas实现，直接在 async 路由中调用会阻塞事件循环，
+一个慢请求就会拖住同一worker上的所有请求。本模块把阻塞调用放到线程中执行，
+并按路由类别分别限流，保证重负载请求（覆盖率计算、文件导入）无法占满
+全部线程和数据库连接，登录、列表查询等轻量请求始终有可用容量。
+
+路由类别（容量见 settings.THREADPOOL_LIMITS）：
+- auth:  登录、用户管理
+- read:  列表、搜索、详情、结构查询
+- write: 单条/批量增删改
+- heavy: 覆盖率统计、文件解析与导入
+
+使用示例：
+    from backend.utils.concurrency import run_blocking
+
+    data_list, total = await run_blocking("read", service.list_data, page, page_size)
+"""
+
+import functools
+from typing import Any, Callable, Dict
+
+import anyio
+from anyio import CapacityLimiter
+
+from backend.config import Settings
+
+
+settings = Settings()
+
+# 类别 -> 限流器（需在事件循环内创建，因此延迟初始化）
+_limiters: Dict[str, CapacityLimiter] = {}
+
+
+def get_limiter(route_class: str) -> CapacityLimiter:
+    """
+    获取指定路由类别的限流器
+
+    Raises:
+        ValueError: 未配置的路由类别
+    """
+    limiter = _limiters.get(route_class)
+    if limiter is None:
+        if route_class not in settings.THREADPOOL_LIMITS:
+            raise ValueError(f"未配置的路由类别: {route_class}")
+        limiter = CapacityLimiter(settings.THREADPOOL_LIMITS[route_class])
+        _limiters[route_class] = limiter
+    return limiter
+
+
+async def run_blocking(route_class: str, func: Callable, *args, **kwargs) -> Any:
+    """
+    在指定类别的线程池中执行阻塞函数，并等待其结果
+
+    Args:
+        route_class: 路由类别（auth/read/write/heavy）
+        func: 阻塞函数
+        *args, **kwargs: 传给 func 的参数
+
+    Returns:
+        func 的返回值；func 抛出的异常会原样抛出
+    """
+    call = functools.partial(func, *args, **kwargs)
+    return await anyio.to_thread.run_sync(call, limiter=get_limiter(route_class))
+
+
+def get_limiter_stats() -> Dict[str, Dict[str, float]]:
+    """获取各类别限流器的容量和占用情况"""
+    stats = {}
+    for route_class, total in settings.THREADPOOL_LIMITS.items():
+        limiter = _limiters.get(route_class)
+        stats[route_class] = {
+            "total": total,
+            "borrowed": limiter.borrowed_tokens if limiter else 0,
+            "waiting": limiter.statistics().tasks_waiting if limiter else 0
+        }
+    return stats
@@ -3,7 +3,7 @@
 提供MySQL和MongoDB的连接管理
 """
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from pymongo import MongoClient
@@ -11,26 +11,11 @@ from typing import Generator
 import sys
 import os
 
-# 添加父目录到路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import settings
-
-# MySQL连接URL
-MYSQL_URL = (
-    f"mysql+pymysql://{settings.MYSQL_USER}:{settings.MYSQL_PASSWORD}"
-    f"@{settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DATABASE}"
-    f"?charset=utf8mb4"
-)
-
-# 创建数据库引擎
-engine = create_engine(
-    MYSQL_URL,
-    pool_size=settings.MYSQL_POOL_SIZE,
-    max_overflow=settings.MYSQL_MAX_OVERFLOW,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=settings.DEBUG
-)
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from backend.config import settings
+# 与各服务共享同一个进程级连接池（见 db_pool.py）
+from backend.utils.db_pool import engine, MYSQL_URL
 
 # 创建Session工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
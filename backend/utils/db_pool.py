@@ -0,0 +1,198 @@
+"""
+MySQL连接池模块
+
+为所有基于pymysql的服务提供进程级共享的连接池，避免每次操作都重新
+建立TCP连接并完成MySQL握手认证。
+
+功能：
+1. 连接池大小由 MYSQL_POOL_SIZE / MYSQL_MAX_OVERFLOW 控制
+2. 借出前预检（pre-ping），自动剔除失效连接
+3. 超过 MYSQL_POOL_RECYCLE 秒的连接自动回收重建
+4. 统计连接借出等待时间，便于判断连接池是否过小
+
+使用示例：
+    from backend.utils.db_pool import get_connection
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+    finally:
+        conn.close()  # 归还连接池，而非真正断开
+"""
+
+import threading
+import time
+from typing import Dict
+
+import pymysql
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from backend.config import Settings
+from backend.utils.logger import get_logger
+
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# 借出等待超过该阈值（秒）时记录警告日志
+SLOW_CHECKOUT_SECONDS = 0.5
+
+MYSQL_URL = (
+    f"mysql+pymysql://{settings.MYSQL_USER}:{settings.MYSQL_PASSWORD}"
+    f"@{settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DATABASE}"
+    f"?charset=utf8mb4"
+)
+
+# 进程级共享引擎（services 通过 raw_connection 使用其连接池）
+engine = create_engine(
+    MYSQL_URL,
+    pool_size=settings.MYSQL_POOL_SIZE,
+    max_overflow=settings.MYSQL_MAX_OVERFLOW,
+    pool_timeout=settings.MYSQL_POOL_TIMEOUT,
+    pool_recycle=settings.MYSQL_POOL_RECYCLE,
+    pool_pre_ping=True,
+    echo=settings.DEBUG
+)
+
+
+class PoolMetrics:
+    """连接借出等待时间统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait_seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait_seconds
+            self.max_wait = max(self.max_wait, wait_seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+
+metrics = PoolMetrics()
+
+
+class PooledConnection:
+    """
+    连接池中借出的pymysql连接
+
+    与 pymysql.Connection 用法一致：cursor() 默认返回 DictCursor，
+    close() 将连接归还连接池（未提交的事务会被回滚）。
+    """
+
+    def __init__(self, fairy, cursorclass):
+        self._fairy = fairy
+        self._cursorclass = cursorclass
+
+    def cursor(self, cursor=None):
+        return self._fairy.cursor(cursor or self._cursorclass)
+
+    def close(self):
+        if self._fairy is not None:
+            self._fairy.close()
+            self._fairy = None
+
+    def __getattr__(self, name):
+        # commit / rollback / ping 等直接转发给底层连接
+        return getattr(self._fairy, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def get_connection(cursorclass=pymysql.cursors.DictCursor) -> PooledConnection:
+    """
+    从连接池借出一个连接
+
+    Args:
+        cursorclass: cursor() 默认使用的游标类型，默认DictCursor
+
+    Returns:
+        PooledConnection: 用完后必须调用 close() 归还
+
+    Raises:
+        PoolTimeoutError: 等待超过 MYSQL_POOL_TIMEOUT 秒仍无可用连接
+    """
+    start = time.perf_counter()
+    try:
+        fairy = engine.raw_connection()
+    except PoolTimeoutError:
+        metrics.record_timeout()
+        logger.error(f"✗ 等待数据库连接超时（{settings.MYSQL_POOL_TIMEOUT}秒），连接池状态: {engine.pool.status()}")
+        raise
+    wait = time.perf_counter() - start
+    metrics.record(wait)
+
+    if wait > SLOW_CHECKOUT_SECONDS:
+        logger.warning(f"⚠ 获取数据库连接耗时 {wait*1000:.2f}ms，连接池状态: {engine.pool.status()}")
+
+    return PooledConnection(fairy, cursorclass)
+
+
+def get_pool_stats() -> Dict:
+    """
+    获取连接池状态和借出等待统计
+
+    Returns:
+        dict: 连接池容量、当前借出数、溢出数以及等待时间统计
+    """
+    pool = engine.pool
+    stats = {
+        "pool_size": pool.size(),
+        "max_overflow": settings.MYSQL_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow()
+    }
+    stats.update(metrics.snapshot())
+    return stats
+
+
+def dispose_pool():
+    """释放连接池中的所有连接（应用关闭时调用）"""
+    engine.dispose()
+
+
+def connect_direct(cursorclass=pymysql.cursors.DictCursor, **kwargs) -> pymysql.connections.Connection:
+    """
+    建立一个不经过连接池的连接（需要特殊连接参数时使用，如 local_infile=True）
+
+    Args:
+        cursorclass: cursor() 默认使用的游标类型，默认DictCursor
+        **kwargs: 其他 pymysql.connect 参数
+
+    Returns:
+        pymysql连接，用完后调用 close() 断开
+    """
+    return pymysql.connect(
+        host=settings.MYSQL_HOST,
+        port=settings.MYSQL_PORT,
+        user=settings.MYSQL_USER,
+        password=settings.MYSQL_PASSWORD,
+        database=settings.MYSQL_DATABASE,
+        charset="utf8mb4",
+        cursorclass=cursorclass,
+        **kwargs
+    )
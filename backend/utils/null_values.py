@@ -0,0 +1,144 @@
+"""
+空值规范化模块
+
+空值的判断原本分散在多处，各自逐个单元格 strip() 后在列表中查找：
+导入脚本的 clean_value、导入时 NaN → None 的 replace + where、
+覆盖率统计的 CoverageService.is_empty_value。本模块统一由 settings.NULL_VALUES 驱动：
+
+- None、NaN / NaT / pd.NA 为空
+- 文本去除首尾空白后为空串，或属于 settings.NULL_VALUES 为空
+- 数字、日期等其他类型的值不为空
+
+按列的函数使用 pandas 字符串操作和 frozenset 成员判断，整列一次完成，
+不再为每个单元格执行 Python 代码（见 scripts/bench_null_values.py）。
+sql_filled_expression 生成同一规则的 SQL 表达式，供在数据库中聚合（如覆盖率统计）。
+
+使用示例：
+    from backend.utils.null_values import NULL_TOKENS, clean_frame, is_null_value, null_mask
+
+    is_null_value(" N/A ")                # True
+    null_mask(df["焊丝"])                 # 布尔Series
+    df = clean_frame(df)                  # 空值 → None，文本去除首尾空白
+"""
+
+import math
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from backend.config import Settings
+
+
+settings = Settings()
+
+
+def null_token_set(null_values: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+    """
+    空值标记集合（文本去除首尾空白后与之比较，因此包含空串）
+
+    Args:
+        null_values: 空值标记，默认 settings.NULL_VALUES
+    """
+    tokens = settings.NULL_VALUES if null_values is None else null_values
+    return frozenset(token.strip() for token in tokens) | {""}
+
+
+# 默认空值标记集合（settings.NULL_VALUES）
+NULL_TOKENS = null_token_set()
+
+
+def is_null_value(value: Any, tokens: FrozenSet[str] = NULL_TOKENS) -> bool:
+    """判断单个值是否为空（逐条处理时使用，如单条记录写入、单行覆盖率）"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip() in tokens
+    if isinstance(value, float):
+        return math.isnan(value)
+    return value is pd.NaT or value is pd.NA
+
+
+def _strip_text(series: pd.Series) -> Optional[pd.Series]:
+    """文本列去除首尾空白（非文本元素为 NaN）；列中没有文本时返回None"""
+    if series.dtype != object and not isinstance(series.dtype, pd.StringDtype):
+        return None
+    try:
+        return series.str.strip()
+    except AttributeError:
+        # object 列中没有任何文本（如全部为 None、Decimal 或日期）
+        return None
+
+
+def null_mask(series: pd.Series, tokens: FrozenSet[str] = NULL_TOKENS) -> pd.Series:
+    """
+    一列数据的空值掩码（向量化）
+
+    Returns:
+        与 series 索引相同的布尔Series，True 表示空
+    """
+    mask = series.isna()
+    stripped = _strip_text(series)
+    if stripped is not None:
+        mask = mask | stripped.isin(tokens)
+    return mask
+
+
+def frame_null_mask(df: pd.DataFrame, tokens: FrozenSet[str] = NULL_TOKENS) -> pd.DataFrame:
+    """DataFrame 的空值掩码（逐列计算）"""
+    return pd.DataFrame(
+        {column: null_mask(df[column], tokens) for column in df.columns},
+        index=df.index,
+        columns=df.columns
+    )
+
+
+def clean_frame(
+    df: pd.DataFrame,
+    tokens: FrozenSet[str] = NULL_TOKENS,
+    columns: Optional[Iterable[str]] = None,
+    strip_text: bool = True
+) -> pd.DataFrame:
+    """
+    清洗DataFrame：空值统一为 None（不修改原数据）
+
+    Args:
+        df: 数据
+        tokens: 空值标记集合
+        columns: 只清洗这些列，默认全部列
+        strip_text: 是否同时去除文本的首尾空白
+
+    Returns:
+        清洗后的DataFrame（索引不变；含空值的列转换为 object 类型）
+    """
+    targets = set(df.columns) if columns is None else set(columns)
+    cleaned = {}
+    for column in df.columns:
+        series = df[column]
+        if column in targets:
+            stripped = _strip_text(series)
+            mask = series.isna()
+            if stripped is not None:
+                mask = mask | stripped.isin(tokens)
+                if strip_text:
+                    series = stripped.where(stripped.notna(), series)
+            if mask.any():
+                series = series.astype(object).where(~mask, None)
+        cleaned[column] = series
+    return pd.DataFrame(cleaned, index=df.index)
+
+
+def sql_filled_expression(column: str, tokens: FrozenSet[str] = NULL_TOKENS) -> Tuple[str, List[str]]:
+    """
+    一列非空的SQL表达式（非空为1，空为0），规则与 null_mask 相同
+
+    BINARY 比较与 Python 的集合成员判断一致：区分大小写，不受排序规则影响。
+    （TRIM 只去除空格，制表符、换行等首尾空白不去除）
+
+    Returns:
+        (表达式, 参数列表)；列名中的 % 已转义为 %%（参数化查询）
+    """
+    quoted = "`" + column.replace("`", "``").replace("%", "%%") + "`"
+    ordered = sorted(tokens)
+    placeholders = ", ".join(["%s"] * len(ordered))
+    sql = f"(CASE WHEN {quoted} IS NULL OR BINARY TRIM({quoted}) IN ({placeholders}) THEN 0 ELSE 1 END)"
+    return sql, ordered
@@ -0,0 +1,208 @@
+"""
+响应缓存与数据版本
+
+列表、搜索、结构查询的结果只会被写操作改变（create / update / delete /
+batch_delete / import）。本模块提供：
+
+- DataVersions: 每个数据集一个版本号，写操作提交后递增
+- ResponseCache: 进程内 LRU + TTL 响应缓存，按条目数和响应体总字节数限制内存，
+  统计命中/未命中/淘汰次数
+- ETag: 由 (进程启动标识, 数据集版本, 请求) 计算，客户端携带 If-None-Match
+  且版本未变时直接返回304，不查询数据库也不读取缓存
+
+缓存键包含数据集版本，写操作后旧条目自然失效；版本递增时同时删除该数据集
+的全部条目以释放内存。其他进程的写入（如导入脚本）无法通知本进程，
+由 TTL（settings.RESPONSE_CACHE_TTL）兜底。
+
+使用示例：
+    from backend.utils.response_cache import data_versions, response_cache
+
+    key = response_cache.make_key(dataset_id, data_versions.get(dataset_id), "list", query)
+    entry = response_cache.get(key)
+    ...
+    data_versions.bump(dataset_id)   # 写操作提交后
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from backend.config import Settings
+
+
+settings = Settings()
+
+# 进程启动标识：重启后版本号从0开始，ETag中带上启动标识避免与重启前的ETag混淆
+_PROCESS_EPOCH = format(int(time.time() * 1000), "x")
+
+
+class DataVersions:
+    """数据集版本号（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def get(self, dataset_id: str) -> int:
+        return self._versions.get(dataset_id, 0)
+
+    def bump(self, dataset_id: str) -> int:
+        """递增版本号（写操作提交后调用），并删除该数据集的缓存条目"""
+        with self._lock:
+            version = self._versions.get(dataset_id, 0) + 1
+            self._versions[dataset_id] = version
+        response_cache.invalidate(dataset_id)
+        return version
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+
+class CacheEntry:
+    """缓存条目：序列化后的响应体"""
+
+    __slots__ = ("body", "etag", "stored_at", "hits")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+        self.stored_at = time.monotonic()
+        self.hits = 0
+
+
+class ResponseCache:
+    """响应缓存（LRU + TTL，限制条目数和总字节数）"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def make_key(dataset_id: str, version: int, endpoint: str, query: str) -> Tuple:
+        """缓存键：数据集ID必须是第一个元素（按数据集失效）"""
+        return (dataset_id, version, endpoint, query)
+
+    def make_etag(self, key: Tuple) -> str:
+        """
+        计算ETag
+
+        包含TTL时间窗口：其他进程的写入不会递增本进程的版本号，
+        ETag 每个TTL周期更换一次，保证客户端最终能取到新数据。
+        """
+        window = int(time.time() // self.ttl_seconds) if self.ttl_seconds else 0
+        digest = hashlib.sha1(repr((key, window)).encode("utf-8")).hexdigest()[:16]
+        return f'"{_PROCESS_EPOCH}-{key[1]}-{digest}"'
+
+    def _remove(self, key: Tuple) -> CacheEntry:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+        return entry
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.monotonic() - entry.stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, body: bytes, etag: str):
+        """写入缓存（单个响应超过总容量的1/8时不缓存）"""
+        if len(body) > self.max_bytes // 8:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(body, etag)
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, dataset_id: Optional[str] = None) -> int:
+        """
+        删除缓存条目
+
+        Args:
+            dataset_id: 指定数据集，None则清空全部
+
+        Returns:
+            删除的条目数
+        """
+        with self._lock:
+            keys = [k for k in self._entries if dataset_id is None or k[0] == dataset_id]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def inspect(self, limit: int = 100) -> List[Dict]:
+        """列出最近使用的缓存条目（不含响应体）"""
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._entries.items())[-limit:]
+        return [
+            {
+                "dataset_id": key[0],
+                "version": key[1],
+                "endpoint": key[2],
+                "query": key[3],
+                "bytes": len(entry.body),
+                "age_seconds": round(now - entry.stored_at, 1),
+                "hits": entry.hits
+            }
+            for key, entry in reversed(items)
+        ]
+
+
+# 进程级单例
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL
+)
+data_versions = DataVersions()
@@ -0,0 +1,162 @@
+"""
+数据表结构注册表
+
+进程级缓存所有 exp_data_* 表及其列，替代每次请求前执行的
+SHOW TABLES LIKE ... 检查。应用启动时一次性从 information_schema
+加载，之后的表存在性检查和列查询均在内存中完成。
+
+缓存失效：
+- DatasetCreator.create_new_dataset 创建新表后调用 invalidate()
+- 查询未命中时会回源数据库确认一次（兼容其他进程创建的表）
+- 加载超过 settings.SCHEMA_REGISTRY_TTL 秒后重新加载（兼容其他进程执行的迁移，
+  如 scripts/migrate_datasets.py 补齐的检索列、行指纹列）；DELETE /cache 立即重新加载
+
+使用示例：
+    from backend.utils.schema_registry import schema_registry
+
+    if not schema_registry.table_exists("exp_data_batch_1"):
+        raise ValueError("表不存在")
+    columns = schema_registry.get_columns("exp_data_batch_1")
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from backend.config import Settings
+from backend.utils.db_pool import get_connection
+from backend.utils.logger import get_logger
+
+
+settings = Settings()
+logger = get_logger(__name__)
+
+# 受注册表管理的数据表前缀
+TABLE_PREFIX = "exp_data_"
+
+# 系统内部维护的辅助列（检索文本、行指纹、非空字段数），不返回给客户端
+INTERNAL_COLUMNS = frozenset({"search_text", "row_fingerprint", "coverage_filled"})
+
+
+def quote_column(column: str, parameterized: bool = True) -> str:
+    """列名加反引号（转义反引号；参数化查询中的%需写成%%）"""
+    quoted = "`" + column.replace("`", "``") + "`"
+    return quoted.replace("%", "%%") if parameterized else quoted
+
+
+class SchemaRegistry:
+    """数据表结构注册表（线程安全）"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self._lock = threading.RLock()
+        self._tables: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._loaded_at = 0.0
+        self.ttl_seconds = ttl_seconds
+
+    def _fetch_columns(self, table_name: Optional[str] = None) -> Dict[str, List[str]]:
+        """从information_schema读取表和列（按列定义顺序）"""
+        if table_name:
+            condition, param = "TABLE_NAME = %s", table_name
+        else:
+            condition, param = "TABLE_NAME LIKE %s", TABLE_PREFIX.replace("_", "\\_") + "%"
+        sql = f"""
+            SELECT TABLE_NAME AS table_name, COLUMN_NAME AS column_name
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND {condition}
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """
+
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, (param,))
+            tables: Dict[str, List[str]] = {}
+            for row in cursor.fetchall():
+                tables.setdefault(row['table_name'], []).append(row['column_name'])
+            return tables
+        finally:
+            conn.close()
+
+    def load(self) -> int:
+        """
+        从数据库加载所有数据表结构（应用启动时调用）
+
+        Returns:
+            加载的表数量
+        """
+        tables = self._fetch_columns()
+        with self._lock:
+            self._tables = tables
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+        logger.info(f"✓ 表结构注册表加载完成: {len(tables)} 个数据表")
+        return len(tables)
+
+    def _expired(self) -> bool:
+        if not self._loaded:
+            return True
+        return self.ttl_seconds is not None and time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def _ensure_loaded(self):
+        if self._expired():
+            with self._lock:
+                if self._expired():
+                    self.load()
+
+    def _refresh_table(self, table_name: str) -> Optional[List[str]]:
+        """回源数据库确认单个表，存在则写入缓存"""
+        columns = self._fetch_columns(table_name).get(table_name)
+        if columns:
+            with self._lock:
+                self._tables[table_name] = columns
+        return columns
+
+    def table_exists(self, table_name: str) -> bool:
+        """检查表是否存在（未命中时回源确认一次）"""
+        self._ensure_loaded()
+        if table_name in self._tables:
+            return True
+        return self._refresh_table(table_name) is not None
+
+    def get_columns(self, table_name: str) -> List[str]:
+        """
+        获取表的所有列名（按定义顺序）
+
+        Raises:
+            ValueError: 表不存在
+        """
+        self._ensure_loaded()
+        columns = self._tables.get(table_name) or self._refresh_table(table_name)
+        if not columns:
+            raise ValueError(f"数据集对应的数据库表不存在: {table_name}")
+        return list(columns)
+
+    def get_public_columns(self, table_name: str) -> List[str]:
+        """获取对外返回的列（排除内部辅助列）"""
+        return [c for c in self.get_columns(table_name) if c not in INTERNAL_COLUMNS]
+
+    def has_column(self, table_name: str, column_name: str) -> bool:
+        """检查表是否包含指定列"""
+        try:
+            return column_name in self.get_columns(table_name)
+        except ValueError:
+            return False
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        使缓存失效
+
+        Args:
+            table_name: 指定表名则只移除该表，None则全部重新加载
+        """
+        with self._lock:
+            if table_name is None:
+                self._tables = {}
+                self._loaded = False
+            else:
+                self._tables.pop(table_name, None)
+
+
+# 进程级单例
+schema_registry = SchemaRegistry(ttl_seconds=settings.SCHEMA_REGISTRY_TTL)
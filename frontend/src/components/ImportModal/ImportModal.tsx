@@ -3,7 +3,7 @@
  * 支持文件上传、数据集选择、导入预览
  */
 
-import React, { useState, useMemo, useEffect } from 'react';
+import React, { useState, useMemo, useEffect, useRef } from 'react';
 import {
   Modal,
   Upload,
@@ -18,9 +18,9 @@ import {
 } from 'antd';
 import { InboxOutlined, FileExcelOutlined } from '@ant-design/icons';
 import type { UploadFile } from 'antd';
-import { importFile } from '@/services/data';
+import { importFile, getImportTask, cancelImportTask } from '@/services/data';
 import { UPLOAD_CONFIG } from '@/config/constants';
-import type { Dataset, BatchImportResponse } from '@/types';
+import type { Dataset, BatchImportResponse, ImportTask } from '@/types';
 import './ImportModal.css';
 
 const { Title, Text } = Typography;
@@ -29,7 +29,7 @@ const { Dragger } = Upload;
 /**
  * 导入模式
  */
-type ImportMode = 'new' | 'append';
+type ImportMode = 'new' | 'append' | 'replace';
 
 /**
  * 导入弹窗 Props
@@ -58,6 +58,15 @@ const ImportModal: React.FC<ImportModalProps> = ({
   const [selectedDatasetId, setSelectedDatasetId] = useState<string>('');
   const [loading, setLoading] = useState(false);
   const [importResult, setImportResult] = useState<BatchImportResponse | null>(null);
+  const [task, setTask] = useState<ImportTask | null>(null);
+  const pollTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  // 卸载时停止轮询
+  useEffect(() => {
+    return () => {
+      if (pollTimer.current) clearTimeout(pollTimer.current);
+    };
+  }, []);
 
   // 当弹窗打开且有当前数据集时，默认选中
   useEffect(() => {
@@ -89,6 +98,7 @@ const ImportModal: React.FC<ImportModalProps> = ({
     setNewDatasetName('');
     setSelectedDatasetId(currentDatasetId || '');
     setImportResult(null);
+    setTask(null);
   };
 
   /**
@@ -142,8 +152,8 @@ const ImportModal: React.FC<ImportModalProps> = ({
       return;
     }
 
-    if (importMode === 'append' && !selectedDatasetId) {
-      message.warning('请选择要追加的数据集');
+    if (importMode !== 'new' && !selectedDatasetId) {
+      message.warning(importMode === 'append' ? '请选择要追加的数据集' : '请选择要替换的数据集');
       return;
     }
 
@@ -151,30 +161,81 @@ const ImportModal: React.FC<ImportModalProps> = ({
 
     setLoading(true);
     try {
-      const result = await importFile(targetDatasetId, fileObj as File);
-      setImportResult(result);
-      message.success('文件导入成功！');
-      
-      // 延迟关闭，显示导入结果
-      setTimeout(() => {
-        onSuccess();
-        resetForm();
-      }, 2000);
+      const submitted = await importFile(
+        targetDatasetId,
+        fileObj as File,
+        importMode === 'replace' ? 'replace' : 'append'
+      );
+      setTask(submitted);
+      pollTask(submitted.task_id);
     } catch (error) {
       console.error('导入失败:', error);
-    } finally {
       setLoading(false);
     }
   };
 
+  /**
+   * 轮询导入任务，直到任务结束
+   */
+  const pollTask = (taskId: string) => {
+    pollTimer.current = setTimeout(async () => {
+      let current: ImportTask;
+      try {
+        current = await getImportTask(taskId);
+      } catch (error) {
+        console.error('查询导入任务失败:', error);
+        setLoading(false);
+        return;
+      }
+      setTask(current);
+
+      if (current.status === 'pending' || current.status === 'processing') {
+        pollTask(taskId);
+        return;
+      }
+
+      setLoading(false);
+      if (current.status === 'completed' && current.result) {
+        setImportResult(current.result);
+        message.success('文件导入成功！');
+
+        // 延迟关闭，显示导入结果
+        setTimeout(() => {
+          onSuccess();
+          resetForm();
+        }, 2000);
+      } else if (current.status === 'cancelled') {
+        message.warning(`导入已取消，已导入 ${current.success_count ?? 0} 条`);
+        onSuccess();
+      } else {
+        message.error(`导入失败: ${current.error_message || '未知错误'}`);
+      }
+    }, UPLOAD_CONFIG.TASK_POLL_INTERVAL);
+  };
+
+  /**
+   * 取消正在执行的导入任务
+   */
+  const handleCancelTask = async () => {
+    if (!task) return;
+    try {
+      setTask(await cancelImportTask(task.task_id));
+    } catch (error) {
+      console.error('取消导入失败:', error);
+    }
+  };
+
   /**
    * 处理弹窗关闭
    */
   const handleClose = () => {
-    if (!loading) {
-      resetForm();
-      onClose();
+    if (loading) {
+      // 导入进行中：取消按钮用于取消后台任务
+      handleCancelTask();
+      return;
     }
+    resetForm();
+    onClose();
   };
 
   /**
@@ -198,7 +259,7 @@ const ImportModal: React.FC<ImportModalProps> = ({
       confirmLoading={loading}
       width={600}
       okText="确认导入"
-      cancelText="取消"
+      cancelText={loading && task ? '取消导入' : '取消'}
       className="import-modal"
       destroyOnClose
     >
@@ -269,12 +330,30 @@ const ImportModal: React.FC<ImportModalProps> = ({
                   options={datasetOptions}
                 />
               )}
+
+              <Radio value="replace">
+                <Text strong>替换现有数据集 (Replace)</Text>
+              </Radio>
+              {importMode === 'replace' && (
+                <>
+                  <Select
+                    placeholder="选择数据集"
+                    value={selectedDatasetId}
+                    onChange={setSelectedDatasetId}
+                    style={{ marginLeft: 24, width: 'calc(100% - 24px)' }}
+                    options={datasetOptions}
+                  />
+                  <Text type="warning" style={{ marginLeft: 24 }}>
+                    导入完成后该数据集的全部现有数据将被文件内容替换
+                  </Text>
+                </>
+              )}
             </Space>
           </Radio.Group>
         </div>
 
         {/* 提示信息 */}
-        {!importResult && (
+        {!importResult && !task && (
           <Alert
             message="ℹ️ 预览分析"
             description="系统将自动检测 CSV 表头，识别字段分类（物性、工艺、状态、性能），并验证数据完整性。"
@@ -283,6 +362,19 @@ const ImportModal: React.FC<ImportModalProps> = ({
           />
         )}
 
+        {/* 导入进度 */}
+        {loading && task && (
+          <div>
+            <Text strong>导入进度</Text>
+            <Progress percent={task.progress} status="active" />
+            <Text type="secondary">
+              {task.status === 'pending'
+                ? '排队中...'
+                : `已处理 ${task.current_row ?? 0} / ${task.total_rows ?? '?'} 行，成功 ${task.success_count ?? 0} 条`}
+            </Text>
+          </div>
+        )}
+
         {/* 导入结果 */}
         {importResult && (
           <Alert
@@ -294,6 +386,9 @@ const ImportModal: React.FC<ImportModalProps> = ({
                 {importResult.duplicates > 0 && (
                   <Text type="warning">重复: {importResult.duplicates} 条</Text>
                 )}
+                {!!importResult.file_duplicates && (
+                  <Text type="warning">文件内重复: {importResult.file_duplicates} 条</Text>
+                )}
                 {importResult.failed > 0 && (
                   <Text type="danger">失败: {importResult.failed} 条</Text>
                 )}
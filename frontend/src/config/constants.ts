@@ -34,7 +34,11 @@ export const API_ENDPOINTS = {
     BATCH_DELETE: (datasetId: string) => `/api/experimental-data/${datasetId}/batch-delete`,
     DATA_SEARCH: (datasetId: string) => `/api/experimental-data/${datasetId}/search`,
     DATA_IMPORT: (datasetId: string) => `/api/experimental-data/${datasetId}/import`,
+    DATA_IMPORT_PREVIEW: (datasetId: string) => `/api/experimental-data/${datasetId}/import/preview`,
+    IMPORT_TASK: (taskId: string) => `/api/experimental-data/import-tasks/${taskId}`,
+    IMPORT_TASK_CANCEL: (taskId: string) => `/api/experimental-data/import-tasks/${taskId}/cancel`,
     COVERAGE: (datasetId: string) => `/api/experimental-data/${datasetId}/coverage`,
+    COVERAGE_LOW_RECORDS: (datasetId: string) => `/api/experimental-data/${datasetId}/coverage/low-records`,
     ALL_COVERAGE: '/api/experimental-data/coverage/all',
   },
   
@@ -131,8 +135,9 @@ export const MESSAGE_DURATION = 3;
  * 文件上传限制
  */
 export const UPLOAD_CONFIG = {
-  MAX_SIZE: 10 * 1024 * 1024, // 10MB
+  MAX_SIZE: 1024 * 1024 * 1024, // 1GB（与后端 MAX_UPLOAD_SIZE 一致）
   ACCEPTED_TYPES: ['.csv', '.xlsx', '.xls'],
+  TASK_POLL_INTERVAL: 1000, // 导入任务进度轮询间隔（毫秒）
   ACCEPTED_MIME_TYPES: [
     'text/csv',
     'application/vnd.ms-excel',
@@ -14,11 +14,12 @@ import {
   PieChartOutlined,
   FieldNumberOutlined,
   SettingOutlined,
+  ReloadOutlined,
 } from '@ant-design/icons';
 import { useNavigate } from 'react-router-dom';
-import { getAllCoverage } from '@/services/coverage';
+import { getAllCoverage, getLowCoverageRecords } from '@/services/coverage';
 import { getDatasetSchema } from '@/services/dataset';
-import type { AllCoverageResponse, DatasetSchemaResponse } from '@/types';
+import type { AllCoverageResponse, DatasetSchemaResponse, LowCoverageRecordsResponse } from '@/types';
 import './CoverageOverview.css';
 
 const { Title, Text } = Typography;
@@ -31,15 +32,17 @@ const CoverageOverview: React.FC = () => {
   const [expandedDataset, setExpandedDataset] = useState<string | null>(null);
   const [schemas, setSchemas] = useState<Record<string, DatasetSchemaResponse>>({});
   const [visibleColumns, setVisibleColumns] = useState<Record<string, string[]>>({});
+  const [lowRecords, setLowRecords] = useState<Record<string, LowCoverageRecordsResponse>>({});
+  const [lowRecordsLoading, setLowRecordsLoading] = useState(false);
 
   useEffect(() => {
     loadData();
   }, []);
 
-  const loadData = async () => {
+  const loadData = async (refresh = false) => {
     setLoading(true);
     try {
-      const response = await getAllCoverage();
+      const response = await getAllCoverage(refresh);
       console.log('Coverage data:', response);
       setData(response);
     } catch (error) {
@@ -63,6 +66,29 @@ const CoverageOverview: React.FC = () => {
       }
     } catch (error) {
       console.error(`加载数据集 ${datasetId} 结构失败:`, error);
+      // 没有结构信息时低覆盖率记录返回全部字段
+      setVisibleColumns(prev => (prev[datasetId] ? prev : { ...prev, [datasetId]: [] }));
+    }
+  };
+
+  /**
+   * 分页加载低覆盖率记录（只请求当前展示的列）
+   */
+  const loadLowRecords = async (datasetId: string, page: number, pageSize: number) => {
+    const cols = visibleColumns[datasetId];
+    setLowRecordsLoading(true);
+    try {
+      const response = await getLowCoverageRecords(datasetId, {
+        page,
+        page_size: pageSize,
+        fields: cols && cols.length > 0 ? cols.join(',') : undefined,
+      });
+      setLowRecords(prev => ({ ...prev, [datasetId]: response }));
+    } catch (error) {
+      console.error(`加载数据集 ${datasetId} 低覆盖率记录失败:`, error);
+      message.error('加载低覆盖率记录失败');
+    } finally {
+      setLowRecordsLoading(false);
     }
   };
 
@@ -72,6 +98,14 @@ const CoverageOverview: React.FC = () => {
     }
   }, [expandedDataset]);
 
+  // 展开数据集（确定展示列后）或切换展示列时重新加载第一页
+  const expandedColumns = expandedDataset ? visibleColumns[expandedDataset] : undefined;
+  useEffect(() => {
+    if (expandedDataset && expandedColumns) {
+      loadLowRecords(expandedDataset, 1, lowRecords[expandedDataset]?.page_size || 10);
+    }
+  }, [expandedDataset, expandedColumns]);
+
   /**
    * 渲染字段覆盖率表格
    */
@@ -312,7 +346,22 @@ const CoverageOverview: React.FC = () => {
         </Col>
       </Row>
 
-      <Card title="各数据集覆盖率详情" style={{ marginTop: 24 }}>
+      <Card
+        title="各数据集覆盖率详情"
+        style={{ marginTop: 24 }}
+        extra={
+          <Space>
+            {data.cache_age_seconds !== undefined && (
+              <Text type="secondary">
+                {data.stale ? '结果更新中，当前为' : '统计结果缓存于'} {Math.round(data.cache_age_seconds)} 秒前
+              </Text>
+            )}
+            <Button icon={<ReloadOutlined />} size="small" loading={loading} onClick={() => loadData(true)}>
+              重新计算
+            </Button>
+          </Space>
+        }
+      >
         <Table
           loading={loading}
           dataSource={data.datasets}
@@ -328,6 +377,7 @@ const CoverageOverview: React.FC = () => {
               const datasetId = record.dataset_id;
               const schema = schemas[datasetId];
               const selectedCols = visibleColumns[datasetId] || [];
+              const lowPage = lowRecords[datasetId];
               
               // 构建低覆盖率记录表格的列
               const lowCoverageColumns = [
@@ -344,7 +394,6 @@ const CoverageOverview: React.FC = () => {
                   title: '覆盖率', 
                   dataIndex: 'coverage', 
                   key: 'coverage',
-                  sorter: (a: any, b: any) => a.coverage - b.coverage,
                   render: (val: number) => (
                     <Space>
                       <Progress 
@@ -395,18 +444,22 @@ const CoverageOverview: React.FC = () => {
                   </Col>
                   <Col span={24}>
                     <Card 
-                      title="⚠️ 低覆盖率记录" 
+                      title={`⚠️ 低覆盖率记录（${record.low_coverage_count} 条）`}
                       size="small"
                       extra={columnSelector}
                     >
                       <Table
-                        dataSource={record.low_coverage_records.sort((a: any, b: any) => b.coverage - a.coverage)}
+                        loading={lowRecordsLoading}
+                        dataSource={lowPage?.data || []}
                         rowKey="id"
                         size="small"
                         pagination={{
-                          pageSize: 10,
+                          current: lowPage?.page || 1,
+                          pageSize: lowPage?.page_size || 10,
+                          total: lowPage?.total ?? record.low_coverage_count,
                           showSizeChanger: true,
                           pageSizeOptions: ['10', '20', '50'],
+                          onChange: (page, pageSize) => loadLowRecords(datasetId, page, pageSize),
                         }}
                         columns={lowCoverageColumns}
                       />
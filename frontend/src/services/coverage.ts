@@ -5,18 +5,39 @@
 
 import { get } from '@/utils/request';
 import { API_ENDPOINTS } from '@/config/constants';
-import type { CoverageResponse, AllCoverageResponse } from '@/types';
+import type {
+  CoverageResponse,
+  AllCoverageResponse,
+  LowCoverageRecordsParams,
+  LowCoverageRecordsResponse,
+} from '@/types';
 
 /**
  * 获取单个数据集的覆盖率统计
+ * @param refresh 忽略服务端缓存，等待重新计算的结果
  */
-export const getDatasetCoverage = async (datasetId: string): Promise<CoverageResponse> => {
-  return get<CoverageResponse>(API_ENDPOINTS.EXPERIMENTAL.COVERAGE(datasetId));
+export const getDatasetCoverage = async (datasetId: string, refresh = false): Promise<CoverageResponse> => {
+  return get<CoverageResponse>(API_ENDPOINTS.EXPERIMENTAL.COVERAGE(datasetId), {
+    params: refresh ? { refresh } : undefined,
+  });
+};
+
+/**
+ * 分页获取数据集的低覆盖率记录（覆盖率最低的排在前面）
+ */
+export const getLowCoverageRecords = async (
+  datasetId: string,
+  params: LowCoverageRecordsParams
+): Promise<LowCoverageRecordsResponse> => {
+  return get<LowCoverageRecordsResponse>(API_ENDPOINTS.EXPERIMENTAL.COVERAGE_LOW_RECORDS(datasetId), { params });
 };
 
 /**
  * 获取所有数据集的覆盖率汇总
+ * @param refresh 忽略服务端缓存，等待重新计算的结果
  */
-export const getAllCoverage = async (): Promise<AllCoverageResponse> => {
-  return get<AllCoverageResponse>(API_ENDPOINTS.EXPERIMENTAL.ALL_COVERAGE);
+export const getAllCoverage = async (refresh = false): Promise<AllCoverageResponse> => {
+  return get<AllCoverageResponse>(API_ENDPOINTS.EXPERIMENTAL.ALL_COVERAGE, {
+    params: refresh ? { refresh } : undefined,
+  });
 };
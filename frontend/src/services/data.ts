@@ -11,16 +11,18 @@ import type {
   ExperimentalData,
   DataMutationRequest,
   DataMutationResponse,
-  BatchImportResponse,
+  ImportTask,
+  ImportPreviewResponse,
   PaginationParams,
+  DataListParams,
 } from '@/types';
 
 /**
- * 获取数据列表（分页）
+ * 获取数据列表（分页，可选服务端过滤）
  */
 export const getDataList = async (
   datasetId: string,
-  params: PaginationParams
+  params: DataListParams
 ): Promise<DataListResponse> => {
   return get<DataListResponse>(API_ENDPOINTS.EXPERIMENTAL.DATA_LIST(datasetId), { params });
 };
@@ -93,14 +95,53 @@ export const batchDeleteData = async (
 };
 
 /**
- * 导入 CSV/Excel 文件
+ * 导入 CSV/Excel 文件（返回后台导入任务）
+ * mode=replace 时导入完成后原子替换数据集的全部数据
+ * engine=load_data 时大CSV走 LOAD DATA 快速导入（前提不满足时后端回退到分块INSERT）
  */
 export const importFile = async (
   datasetId: string,
-  file: File
-): Promise<BatchImportResponse> => {
+  file: File,
+  mode: 'append' | 'replace' = 'append',
+  engine: 'rows' | 'load_data' = 'rows'
+): Promise<ImportTask> => {
+  const formData = new FormData();
+  formData.append('file', file);
+
+  return upload<ImportTask>(
+    `${API_ENDPOINTS.EXPERIMENTAL.DATA_IMPORT(datasetId)}?mode=${mode}&engine=${engine}`,
+    formData
+  );
+};
+
+/**
+ * 导入预检：分析文件的列名、重复行、空值和类型错误，不写入数据
+ */
+export const previewImport = async (
+  datasetId: string,
+  file: File,
+  sample?: number
+): Promise<ImportPreviewResponse> => {
   const formData = new FormData();
   formData.append('file', file);
+  const query = sample === undefined ? '' : `?sample=${sample}`;
 
-  return upload<BatchImportResponse>(API_ENDPOINTS.EXPERIMENTAL.DATA_IMPORT(datasetId), formData);
+  return upload<ImportPreviewResponse>(
+    `${API_ENDPOINTS.EXPERIMENTAL.DATA_IMPORT_PREVIEW(datasetId)}${query}`,
+    formData
+  );
+};
+
+/**
+ * 查询导入任务状态与进度
+ */
+export const getImportTask = async (taskId: string): Promise<ImportTask> => {
+  return get<ImportTask>(API_ENDPOINTS.EXPERIMENTAL.IMPORT_TASK(taskId));
+};
+
+/**
+ * 取消导入任务
+ */
+export const cancelImportTask = async (taskId: string): Promise<ImportTask> => {
+  return post<ImportTask>(API_ENDPOINTS.EXPERIMENTAL.IMPORT_TASK_CANCEL(taskId));
 };
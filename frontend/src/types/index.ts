@@ -89,6 +89,9 @@ export interface DatasetSchemaResponse {
   };
   searchable_fields: string[];
   required_fields: string[];
+  projections?: {
+    [name: string]: string[];  // 命名投影（传给 view 参数）
+  };
   total_fields: number;
 }
 
@@ -114,6 +117,15 @@ export interface PaginationParams {
   page_size: number;
 }
 
+/**
+ * 数据列表查询参数
+ */
+export interface DataListParams extends PaginationParams {
+  filter?: string;  // 过滤条件，如 "工艺_激光功率>=2000 AND 物性_材料 IN (304, 316)"
+  fields?: string;  // 只返回这些字段（逗号分隔）
+  view?: string;    // 命名投影，如 "summary"
+}
+
 /**
  * 数据列表响应
  */
@@ -123,6 +135,7 @@ export interface DataListResponse {
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor?: string | null;  // 下一页游标（传给 cursor 参数），null 表示已到末尾
 }
 
 /**
@@ -130,6 +143,9 @@ export interface DataListResponse {
  */
 export interface SearchResponse extends DataListResponse {
   keyword: string;
+  hits?: number | null;     // 命中数（count=none 时为 null）
+  took_ms?: number;         // 搜索耗时（毫秒）
+  engine?: 'fulltext' | 'like' | 'scan';  // 查询方式
 }
 
 /**
@@ -159,10 +175,79 @@ export interface BatchImportResponse {
   success: number;
   duplicates: number;
   failed: number;
+  file_duplicates?: number;
   dataset_created?: boolean;
   table_name?: string;
   fields_count?: number;
   creation_message?: string;
+  engine?: string;
+  engine_note?: string;
+}
+
+/**
+ * 导入任务状态
+ */
+export type ImportTaskStatus = 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled';
+
+/**
+ * 导入任务（上传后立即返回，导入在后台执行）
+ */
+export interface ImportTask {
+  task_id: string;
+  dataset_id: string;
+  filename: string;
+  mode: string;
+  engine?: string;
+  status: ImportTaskStatus;
+  progress: number;
+  total_rows?: number;
+  current_row?: number;
+  success_count?: number;
+  failed_count?: number;
+  errors?: string[] | null;
+  error_message?: string | null;
+  result?: BatchImportResponse | null;
+  created_at?: string;
+  started_at?: string | null;
+  completed_at?: string | null;
+  created_by?: string;
+}
+
+/**
+ * 导入预检（只分析文件，不写入数据）
+ */
+export interface ImportPreviewColumn {
+  name: string;
+  type?: string | null;
+  inferred_type: string;
+  non_null: number;
+  nulls: number;
+  null_ratio: number;
+  type_errors: number;
+}
+
+export interface ImportPreviewProblemRow {
+  row: number;
+  issue: 'file_duplicate' | 'existing_duplicate' | 'type_error';
+  detail: string;
+  data: Record<string, any>;
+}
+
+export interface ImportPreviewResponse {
+  dataset_id: string;
+  filename: string;
+  dataset_exists: boolean;
+  columns_valid: boolean;
+  column_error?: string | null;
+  total_rows: number;
+  file_duplicates: number;
+  existing_duplicates: number;
+  type_error_rows: number;
+  new_rows: number;
+  columns: ImportPreviewColumn[];
+  problem_rows: ImportPreviewProblemRow[];
+  notes: string[];
+  elapsed_ms: number;
 }
 
 // ==================== 覆盖率统计相关类型 ====================
@@ -192,6 +277,11 @@ export interface FieldCoverage {
   [field: string]: number;
 }
 
+/**
+ * 覆盖率缓存状态：hit 新鲜缓存 / stale 旧结果（后台刷新中）/ miss 本次计算 / shared 等待同一计算
+ */
+export type CoverageCacheStatus = 'hit' | 'stale' | 'miss' | 'shared';
+
 /**
  * 覆盖率统计响应
  */
@@ -199,22 +289,53 @@ export interface CoverageResponse {
   comprehensive_coverage: number;
   average_coverage: number;
   coverage_distribution: CoverageDistribution;
-  low_coverage_records: LowCoverageRecord[];
+  low_coverage_count: number;
   field_coverage: FieldCoverage;
   meets_threshold: boolean;
   threshold: number;
+  cache_status?: CoverageCacheStatus;
+  stale?: boolean;
+  cache_age_seconds?: number;
+  computed_at?: string;
   message?: string;
   warning?: string;
 }
 
+/**
+ * 低覆盖率记录分页响应（覆盖率最低的排在前面）
+ */
+export interface LowCoverageRecordsResponse {
+  data: LowCoverageRecord[];
+  total: number;
+  page: number;
+  page_size: number;
+  total_pages: number;
+  threshold: number;
+}
+
+/**
+ * 低覆盖率记录查询参数
+ */
+export interface LowCoverageRecordsParams {
+  page?: number;
+  page_size?: number;
+  fields?: string;
+  view?: string;
+}
+
 /**
  * 所有数据集覆盖率汇总
  */
 export interface AllCoverageResponse {
   overall_coverage: number;
   total_records: number;
+  total_cells?: number;
+  non_empty_cells?: number;
   total_datasets: number;
   meets_threshold: boolean;
+  stale?: boolean;
+  cache_age_seconds?: number;
+  elapsed_ms?: number;
   message?: string;
   warning?: string;
   datasets: Array<{
@@ -224,8 +345,17 @@ export interface AllCoverageResponse {
     comprehensive_coverage: number;
     average_coverage: number;
     meets_threshold: boolean;
+    low_coverage_count: number;
+    total_cells?: number;
+    non_empty_cells?: number;
+    elapsed_ms?: number;
+    cache_status?: CoverageCacheStatus;
+    stale?: boolean;
+    cache_age_seconds?: number;
+    computed_at?: string;
     [key: string]: any;
   }>;
+  failed_datasets?: Array<{ dataset_id: string; error: string }>;
 }
 
 // ==================== API 响应类型 ====================
@@ -42,13 +42,18 @@ CREATE TABLE IF NOT EXISTS sys_import_tasks (
     filename VARCHAR(255) NOT NULL COMMENT '上传的文件名',
     file_path VARCHAR(500) COMMENT '文件存储路径',
     mode ENUM('append', 'replace') NOT NULL DEFAULT 'append' COMMENT '导入模式',
-    status ENUM('pending', 'processing', 'completed', 'failed') NOT NULL DEFAULT 'pending' COMMENT '任务状态',
+    engine ENUM('rows', 'load_data') NOT NULL DEFAULT 'rows' COMMENT '导入引擎',
+    status ENUM('pending', 'processing', 'completed', 'failed', 'cancelled') NOT NULL DEFAULT 'pending' COMMENT '任务状态',
     progress INT NOT NULL DEFAULT 0 COMMENT '进度百分比',
     total_rows INT DEFAULT 0 COMMENT '总行数',
     current_row INT DEFAULT 0 COMMENT '当前处理行',
     success_count INT DEFAULT 0 COMMENT '成功导入数量',
     failed_count INT DEFAULT 0 COMMENT '失败数量',
     failed_rows JSON COMMENT '失败行详情',
+    result JSON COMMENT '导入结果',
+    checkpoint JSON COMMENT '断点续传检查点',
+    attempts INT NOT NULL DEFAULT 0 COMMENT '执行次数',
+    heartbeat_at DATETIME COMMENT '最近心跳时间',
     error_message TEXT COMMENT '错误信息',
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '任务创建时间',
     started_at DATETIME COMMENT '开始处理时间',
@@ -86,6 +91,38 @@ CREATE TABLE IF NOT EXISTS sys_operation_logs (
     INDEX idx_status (status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='操作日志表';
 
+-- =====================================================
+-- 4. 创建数据集统计表（由写操作在同一事务内维护）
+-- =====================================================
+CREATE TABLE IF NOT EXISTS sys_dataset_stats (
+    dataset_id VARCHAR(100) PRIMARY KEY COMMENT '数据集ID',
+    row_count BIGINT NOT NULL DEFAULT 0 COMMENT '数据行数',
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='数据集统计表';
+
+-- =====================================================
+-- 5. 创建覆盖率统计表（由写操作在同一事务内维护）
+-- =====================================================
+CREATE TABLE IF NOT EXISTS sys_coverage_stats (
+    dataset_id VARCHAR(100) NOT NULL COMMENT '数据集ID',
+    filled INT NOT NULL COMMENT '非空字段数',
+    records BIGINT NOT NULL DEFAULT 0 COMMENT '记录数',
+    PRIMARY KEY (dataset_id, filled)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='覆盖率分布统计表';
+
+CREATE TABLE IF NOT EXISTS sys_coverage_field_stats (
+    dataset_id VARCHAR(100) NOT NULL COMMENT '数据集ID',
+    field_name VARCHAR(255) NOT NULL COMMENT '字段名',
+    non_empty BIGINT NOT NULL DEFAULT 0 COMMENT '非空记录数',
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (dataset_id, field_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='字段覆盖率统计表';
+
+CREATE TABLE IF NOT EXISTS sys_coverage_state (
+    dataset_id VARCHAR(100) PRIMARY KEY COMMENT '数据集ID',
+    rebuilt_at DATETIME DEFAULT NULL COMMENT '最近重建时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='覆盖率统计状态表';
+
 -- =====================================================
 -- 完成
 -- =====================================================